@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# asyncio execution backend: one event loop drives every ssh child process.
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from audit_log import ExecutionTimer, new_run_id
+from config import Config
+from output_spool import (
+    OutputSpool,
+    collect_capture_file,
+    discard_capture_file,
+    open_capture_file,
+)
+from retry_policy import RetryQueue
+from ssh_executor import SSHExecutor
+
+
+class AsyncSSHExecutor(SSHExecutor):
+    # SSHExecutor variant that runs batches on asyncio instead of a thread pool
+
+    @staticmethod
+    def resolve_max_workers(max_workers: Optional[int] = None) -> int:
+        # Clamp concurrency to 1..VALIDATION["max_async_connections"]
+        if max_workers is None:
+            max_workers = Config.SSH_PARALLEL_WORKERS
+        limit = Config.VALIDATION["max_async_connections"]
+        return max(1, min(int(max_workers), limit))
+
+    async def execute_command_async(
+        self,
+        hostname: str,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        # Async counterpart of execute_command, same result shape
+        effective_timeout = timeout if timeout is not None else self.command_timeout
+        process = None
+        captures = []
+        if self.rate_limiter is not None:
+            # Wait for a connection slot without blocking the event loop
+            delay = self.rate_limiter.reserve(hostname)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        timer = self._start_timer(hostname)
+
+        try:
+            ssh_cmd = timer.wrap(self.build_ssh_command(hostname, command))
+
+            # Output goes to capture files so memory stays flat (see output_spool)
+            captures = [
+                open_capture_file(hostname, "stdout"),
+                open_capture_file(hostname, "stderr"),
+            ]
+            (stdout_file, stdout_path), (stderr_file, stderr_path) = captures
+
+            # Spawning should be instant; a stuck fork must not hold a slot forever
+            process = await asyncio.wait_for(
+                asyncio.create_subprocess_exec(
+                    *ssh_cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=stdout_file,
+                    stderr=stderr_file,
+                ),
+                timeout=self.connect_timeout,
+            )
+
+            # ssh enforces ConnectTimeout itself; the overall deadline is ours
+            await asyncio.wait_for(process.wait(), timeout=effective_timeout)
+
+            captures = []
+            output = collect_capture_file(stdout_file, stdout_path)
+            error = collect_capture_file(stderr_file, stderr_path)
+            result = self.make_result(
+                hostname,
+                command,
+                success=process.returncode == 0,
+                output=output["text"],
+                error=error["text"],
+                return_code=process.returncode,
+                output_file=output["path"],
+                error_file=error["path"],
+                output_bytes=output["bytes"],
+                error_bytes=error["bytes"],
+            )
+
+        except asyncio.TimeoutError:
+            await self._kill_process(process)
+            if process is None:
+                error = f"SSH process start timeout ({self.connect_timeout}s)"
+            else:
+                error = f"Command execution timeout ({effective_timeout}s)"
+            result = self.make_result(hostname, command, error=error, timed_out=True)
+
+        except asyncio.CancelledError:
+            await self._kill_process(process)
+            raise
+
+        except FileNotFoundError:
+            result = self.make_result(
+                hostname,
+                command,
+                error="SSH client not found. Make sure OpenSSH is installed.",
+            )
+
+        except Exception as e:
+            await self._kill_process(process)
+            result = self.make_result(
+                hostname, command, error=f"Unexpected error: {str(e)}"
+            )
+
+        finally:
+            for fileobj, path in captures:
+                discard_capture_file(fileobj, path)
+
+        return self._finish_result(result, timer, run_id)
+
+    async def execute_command_streaming_async(
+        self,
+        hostname: str,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        # Async counterpart of execute_command_streaming: the pipes are read
+        # on the event loop and on_line is called from it (so it must not
+        # block), with the same line events as stream_command
+        effective_timeout = timeout if timeout is not None else self.command_timeout
+        spools = {
+            "stdout": OutputSpool(hostname, "stdout"),
+            "stderr": OutputSpool(hostname, "stderr"),
+        }
+        process = None
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(hostname)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        timer = self._start_timer(hostname)
+
+        async def read_lines(stream_name: str, pipe) -> None:
+            # Split on newlines ourselves: StreamReader.readline fails on
+            # lines longer than its buffer limit
+            buffer = bytearray()
+            while True:
+                chunk = await pipe.read(65536)
+                if chunk:
+                    buffer += chunk
+                elif not buffer:
+                    return
+                start = 0
+                while True:
+                    end = buffer.find(b"\n", start)
+                    if end < 0:
+                        if chunk:
+                            break
+                        end = len(buffer)  # Last line without a newline
+                    line = buffer[start:end].decode("utf-8", errors="replace")
+                    line = line.rstrip("\r")
+                    spools[stream_name].write(line + "\n")
+                    if on_line is not None:
+                        on_line(
+                            {"hostname": hostname, "stream": stream_name, "line": line}
+                        )
+                    start = end + 1
+                    if start >= len(buffer):
+                        break
+                del buffer[:start]
+
+        try:
+            ssh_cmd = timer.wrap(self.build_ssh_command(hostname, command))
+            process = await asyncio.wait_for(
+                asyncio.create_subprocess_exec(
+                    *ssh_cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                ),
+                timeout=self.connect_timeout,
+            )
+            timed_out = False
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        read_lines("stdout", process.stdout),
+                        read_lines("stderr", process.stderr),
+                        process.wait(),
+                    ),
+                    timeout=effective_timeout,
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+                await self._kill_process(process)
+
+            output = spools["stdout"].finish()
+            error = spools["stderr"].finish()
+            if timed_out:
+                # Keep what was printed before the deadline
+                result = self.make_result(
+                    hostname,
+                    command,
+                    output=output["text"],
+                    error=f"Command execution timeout ({effective_timeout}s)",
+                    output_file=output["path"],
+                    error_file=error["path"],
+                    output_bytes=output["bytes"],
+                    error_bytes=error["bytes"],
+                    timed_out=True,
+                )
+            else:
+                result = self.make_result(
+                    hostname,
+                    command,
+                    success=process.returncode == 0,
+                    output=output["text"],
+                    error=error["text"],
+                    return_code=process.returncode,
+                    output_file=output["path"],
+                    error_file=error["path"],
+                    output_bytes=output["bytes"],
+                    error_bytes=error["bytes"],
+                )
+            spools = {}
+
+        except asyncio.TimeoutError:
+            # Only the spawn itself can time out here
+            await self._kill_process(process)
+            result = self.make_result(
+                hostname,
+                command,
+                error=f"SSH process start timeout ({self.connect_timeout}s)",
+                timed_out=True,
+            )
+
+        except asyncio.CancelledError:
+            await self._kill_process(process)
+            raise
+
+        except FileNotFoundError:
+            result = self.make_result(
+                hostname,
+                command,
+                error="SSH client not found. Make sure OpenSSH is installed.",
+            )
+
+        except Exception as e:
+            await self._kill_process(process)
+            result = self.make_result(
+                hostname, command, error=f"Unexpected error: {str(e)}"
+            )
+
+        finally:
+            for spool in spools.values():
+                spool.discard()
+
+        return self._finish_result(result, timer, run_id)
+
+    @staticmethod
+    async def _kill_process(process) -> None:
+        # Kill a straggling ssh child and reap it so no zombie is left behind
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.kill()
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+
+    async def iter_command_batch_async(
+        self,
+        hostnames: List[str],
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_workers: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Execute command on hosts, yielding each result as soon as it completes.
+        # Args:
+        #     hostnames: Host aliases to run on.
+        #     command: Command to execute.
+        #     timeout: Command timeout override.
+        #     max_workers: Concurrency override (capped by max_async_connections).
+        #     stop_event: When set, no new hosts are started; running ones finish.
+        #     on_line: Receives stream_command line events live (on the loop).
+        #     run_id: Audit log id shared by the batch's hosts (default: new).
+        run_id = run_id or new_run_id()
+        workers = (
+            self.resolve_max_workers(max_workers)
+            if max_workers is not None
+            else self.max_workers
+        )
+        if self.preflight is not None and hostnames:
+            # Probed on this loop; unreachable hosts fail before any ssh starts
+            timer = ExecutionTimer()
+            unreachable = await self.preflight.probe_async(hostnames)
+            for result in self._preflight_failures(unreachable, command, timer, run_id):
+                yield result
+            hostnames = [host for host in hostnames if host not in unreachable]
+        queue_iter = iter(hostnames)
+        in_flight = {}
+        # Hosts waiting for a retry do not hold a concurrency slot meanwhile
+        retries = RetryQueue(self.retry_policy)
+
+        async def run_one(hostname: str, attempt: int) -> Dict[str, Any]:
+            if on_line is not None:
+                result = await self.execute_command_streaming_async(
+                    hostname, command, timeout, on_line=on_line, run_id=run_id
+                )
+            else:
+                result = await self.execute_command_async(
+                    hostname, command, timeout, run_id=run_id
+                )
+            result["attempts"] = attempt
+            return result
+
+        def submit_next() -> bool:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            ready = retries.pop_ready()
+            if ready is None:
+                hostname = next(queue_iter, None)
+                if hostname is None:
+                    return False
+                ready = (hostname, 1)
+            in_flight[asyncio.ensure_future(run_one(*ready))] = ready
+            return True
+
+        try:
+            # Tasks are created lazily so thousands of hosts cost `workers` tasks
+            while True:
+                while len(in_flight) < workers and submit_next():
+                    pass
+                if not in_flight:
+                    if not retries:
+                        break
+                    if stop_event is not None and stop_event.is_set():
+                        # Report the failures the pending retries would replace
+                        for result in retries.drain():
+                            yield result
+                        break
+                    # Short naps so a stop request is noticed
+                    await asyncio.sleep(min(retries.next_delay(), 0.5))
+                    continue
+
+                done, _ = await asyncio.wait(
+                    in_flight,
+                    timeout=retries.next_delay(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    hostname, attempt = in_flight.pop(task)
+                    result = task.result()
+                    if not retries.schedule(hostname, attempt, result):
+                        yield result
+                    # After the yield: a stop set by the consumer is seen
+                    while len(in_flight) < workers and submit_next():
+                        pass
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def iter_command_batch(
+        self,
+        hostnames: List[str],
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_workers: Optional[int] = None,
+        delay: int = 0,
+        stop_event: Optional[threading.Event] = None,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        # Synchronous wrapper: runs the event loop in a helper thread so
+        # callers (CLI, GUI) keep their plain for-loops.
+        hostnames = list(hostnames)
+
+        if delay > 0 or len(hostnames) <= 1:
+            # Paced runs are serial anyway; reuse the blocking implementation
+            yield from super().iter_command_batch(
+                hostnames,
+                command,
+                timeout,
+                max_workers=max_workers,
+                delay=delay,
+                stop_event=stop_event,
+                on_line=on_line,
+                run_id=run_id,
+            )
+            return
+
+        results: "queue.Queue" = queue.Queue()
+        finished = object()
+        loop = asyncio.new_event_loop()
+        # Set once the caller asks for the next result: the batch only resumes
+        # (and refills) after that, so a stop the caller sets is seen in time
+        taken = asyncio.Event()
+
+        async def pump() -> None:
+            batch = self.iter_command_batch_async(
+                hostnames,
+                command,
+                timeout,
+                max_workers=max_workers,
+                stop_event=stop_event,
+                on_line=on_line,
+                run_id=run_id,
+            )
+            try:
+                async for result in batch:
+                    results.put(result)
+                    await taken.wait()
+                    taken.clear()
+            finally:
+                # Runs the generator cleanup (cancel + kill) on cancellation too
+                await batch.aclose()
+                results.put(finished)
+
+        task = loop.create_task(pump())
+
+        def run_loop() -> None:
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+
+        runner = threading.Thread(target=run_loop, name="ssh-async", daemon=True)
+        runner.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                yield item
+                loop.call_soon_threadsafe(taken.set)
+        finally:
+            # Closed early (Ctrl+C, break): cancel tasks and kill running ssh
+            if runner.is_alive():
+                try:
+                    loop.call_soon_threadsafe(task.cancel)
+                except RuntimeError:
+                    pass  # Loop already closed
+                runner.join()
+
+
+# Backend name -> executor class, used by --backend
+EXECUTOR_BACKENDS = {
+    "thread": SSHExecutor,
+    "async": AsyncSSHExecutor,
+}
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# Audit log: entry formats, per-run timing and a buffered writer that drains
+# a queue on one background thread.
+
+import atexit
+import datetime
+import json
+import os
+import queue
+import shlex
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from config import Config
+from output_spool import get_spill_dir
+
+_writer_lock = threading.Lock()
+_writer: Optional["AuditLogWriter"] = None
+
+
+class AuditLogWriter:
+    # Appends log lines to the daily file without blocking the caller.
+    #
+    # Callers only enqueue; the flusher thread writes entries in batches
+    # (at most one flush per LOG_FLUSH_INTERVAL), keeps the current day's
+    # file open between batches and switches files when an entry belongs to
+    # another date. Pending entries are written when the writer is closed
+    # (registered with atexit).
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else Config.LOG_FLUSH_INTERVAL
+        )
+        self._queue: "queue.Queue" = queue.Queue()
+        # Open files by path, with the date each one belongs to
+        self._files: Dict[str, Tuple[str, IO[str]]] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer")
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(
+        self,
+        line: str,
+        when: Optional[datetime.datetime] = None,
+        extension: str = "log",
+    ) -> None:
+        # Queue a line for the log file of when's date (default: now)
+        if self._closed:
+            return
+        self._queue.put((when or datetime.datetime.now(), line, extension))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # Block until everything queued so far is on disk
+        if self._closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Collect entries for up to flush_interval so they share one
+            # write + flush; flush() and close() markers end the wait early
+            deadline = time.monotonic() + self.flush_interval
+            while isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._write_batch(batch):
+                self._close_files()
+                return
+
+    def _write_batch(self, batch) -> bool:
+        # Returns False once the stop marker has been seen
+        running = True
+        waiters = []
+        for item in batch:
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                self._append(*item)
+        for _, fileobj in self._files.values():
+            try:
+                fileobj.flush()
+            except OSError as e:
+                print(f"Audit log flush failed: {e}", file=sys.stderr)
+        for waiter in waiters:
+            waiter.set()
+        return running
+
+    def _append(self, when: datetime.datetime, line: str, extension: str) -> None:
+        date_str = when.strftime(Config.LOG_DATE_FORMAT)
+        path = Config.get_log_file_path(date_str, extension)
+        try:
+            entry = self._files.get(path)
+            if entry is None:
+                # Date boundary: files of other days are done
+                self._close_files(keep_date=date_str)
+                Config.ensure_log_dir()
+                entry = (date_str, open(path, "a", encoding="utf-8"))
+                self._files[path] = entry
+            entry[1].write(line + "\n")
+        except OSError as e:
+            print(f"Audit log write failed: {e}", file=sys.stderr)
+
+    def _close_files(self, keep_date: Optional[str] = None) -> None:
+        for path, (date_str, fileobj) in list(self._files.items()):
+            if date_str == keep_date:
+                continue
+            try:
+                fileobj.close()
+            except OSError:
+                pass
+            del self._files[path]
+
+
+def get_audit_writer() -> AuditLogWriter:
+    # Process-wide writer shared by all executors
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer._closed:
+            _writer = AuditLogWriter()
+        return _writer
+
+
+def new_run_id() -> str:
+    # Groups the log entries of all hosts of one batch
+    return uuid.uuid4().hex[:12]
+
+
+class ExecutionTimer:
+    # Wall-clock timing of one ssh run for the audit log.
+    #
+    # ssh runs LocalCommand once the connection is authenticated; when
+    # measure_connect is set, it touches a marker file whose mtime splits
+    # the run into connect and exec time. connect_time stays None if ssh
+    # never connected, reused a multiplexed master (the client does not run
+    # LocalCommand) or the argv is not an ssh call.
+
+    def __init__(self, measure_connect: bool = False):
+        self.measure_connect = measure_connect and os.name != "nt"
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._marker: Optional[str] = None
+
+    def wrap(self, ssh_cmd: List[str]) -> List[str]:
+        # ssh argv with the connect marker options added
+        if not self.measure_connect or ssh_cmd[:1] != ["ssh"]:
+            return ssh_cmd
+        fd, self._marker = tempfile.mkstemp(prefix="connect_", dir=get_spill_dir())
+        os.close(fd)
+        os.unlink(self._marker)  # LocalCommand recreates it
+        # "%" starts an ssh token in LocalCommand
+        touch = f"touch {shlex.quote(self._marker)}".replace("%", "%%")
+        return (
+            ssh_cmd[:1]
+            + ["-o", "PermitLocalCommand=yes", "-o", f"LocalCommand={touch}"]
+            + ssh_cmd[1:]
+        )
+
+    def finish(self) -> Dict[str, Any]:
+        # Timing fields merged into the result dict
+        duration = time.monotonic() - self._start
+        connect_time = None
+        if self._marker is not None:
+            try:
+                connected_at = os.stat(self._marker).st_mtime
+                os.unlink(self._marker)
+            except OSError:
+                pass
+            else:
+                connect_time = min(max(connected_at - self.started_at, 0.0), duration)
+            self._marker = None
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.started_at + duration,
+            "duration": duration,
+            "connect_time": connect_time,
+        }
+
+
+def format_text_entry(
+    timestamp: datetime.datetime, hostname: str, command: str, result: Dict[str, Any]
+) -> str:
+    # Classic one-line text log entry
+    return (
+        f"[{timestamp.strftime(Config.LOG_TIMESTAMP_FORMAT)}] HOST: {hostname} | "
+        f"CMD: {command} | "
+        f"SUCCESS: {result['success']} | "
+        f"RC: {result['return_code']}"
+    )
+
+
+def isoformat_epoch(epoch: Optional[float]) -> Optional[str]:
+    # Local time with UTC offset, millisecond precision
+    if epoch is None:
+        return None
+    moment = datetime.datetime.fromtimestamp(epoch).astimezone()
+    return moment.isoformat(timespec="milliseconds")
+
+
+def _round(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds, 3)
+
+
+def format_json_entry(hostname: str, command: str, result: Dict[str, Any]) -> str:
+    # JSON Lines entry with timing and size metrics
+    duration = result.get("duration")
+    connect_time = result.get("connect_time")
+    exec_time = None
+    if duration is not None and connect_time is not None:
+        exec_time = duration - connect_time
+    entry = {
+        "run_id": result.get("run_id"),
+        "host": hostname,
+        "command": command,
+        "success": result["success"],
+        "return_code": result["return_code"],
+        "timed_out": result.get("timed_out", False),
+        "failure_class": result.get("failure_class"),
+        "start": isoformat_epoch(result.get("started_at")),
+        "end": isoformat_epoch(result.get("finished_at")),
+        "duration": _round(duration),
+        "connect_time": _round(connect_time),
+        "exec_time": _round(exec_time),
+        "stdout_bytes": result.get("output_bytes", 0),
+        "stderr_bytes": result.get("error_bytes", 0),
+        "output_file": result.get("output_file"),
+        "error_file": result.get("error_file"),
+    }
+    if not result["success"] and result.get("error"):
+        # First line only: stderr can be large and is in error_file if so
+        entry["error"] = result["error"].splitlines()[0][:500]
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Search the audit logs through an incrementally updated SQLite index.
+
+import glob
+import json
+import os
+import re
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+INDEX_SCHEMA_VERSION = 2
+
+# With LOG_FORMAT "both" a run is in the text and the JSON Lines log. The text
+# entry is left out of results when a JSON Lines entry of the same host,
+# command and outcome ended within this many seconds of it being logged.
+DUPLICATE_WINDOW = 2
+_DUPLICATE_TEXT_ENTRY = f"""
+    e.kind = 'log' AND EXISTS (
+        SELECT 1 FROM entries AS j
+        WHERE j.kind = 'jsonl' AND j.host = e.host AND j.date = e.date
+        AND j.command = e.command AND j.success = e.success
+        AND j.return_code IS e.return_code
+        AND abs(strftime('%s', j.logged) - strftime('%s', e.logged))
+            <= {DUPLICATE_WINDOW}
+    )"""
+
+# One text log entry; CMD is greedy because commands may contain " | "
+# and, for multiline commands, newlines
+_TEXT_ENTRY_RE = re.compile(
+    r"\[(?P<ts>[^\]]*)\] HOST: (?P<host>.*?) \| CMD: (?P<command>.*)"
+    r" \| SUCCESS: (?P<success>True|False) \| RC: (?P<rc>-?\d+)\n\Z",
+    re.DOTALL,
+)
+_TEXT_ENTRY_START_RE = re.compile(r"\[[^\]]*\] HOST: ")
+
+
+def _log_files() -> List[Tuple[str, str, str]]:
+    # (path, date, kind) of every daily log, text and JSON Lines alike; runs
+    # logged in both formats are deduplicated when querying
+    prefix = os.path.join(glob.escape(Config.LOG_DIR), Config.LOG_FILE_PREFIX)
+    files = []
+    for extension in ("log", "jsonl"):
+        for path in glob.glob(f"{prefix}_*.{extension}"):
+            name = os.path.basename(path)
+            date = name[len(Config.LOG_FILE_PREFIX) + 1 : -len(extension) - 1]
+            files.append((path, date, extension))
+    return sorted(files, key=lambda item: (item[1], item[2]))
+
+
+class AuditLogIndex:
+    # SQLite index over ssh_commands_YYYY-MM-DD.{log,jsonl}.
+    #
+    # Each file's indexed byte offset is stored, so an update only parses
+    # what was appended since the last query; a file that shrank is
+    # reindexed from the start. Entries are only indexed once complete, so
+    # a partially written multiline entry is picked up on the next update.
+
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path or os.path.join(
+            Config.LOG_DIR, Config.LOG_INDEX_FILE
+        )
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        self.db = sqlite3.connect(self.index_path)
+        self._create_schema()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _create_schema(self) -> None:
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_SCHEMA_VERSION:
+            self.db.executescript("""
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS entries;
+                """)
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                date TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                logged TEXT NOT NULL,
+                host TEXT NOT NULL,
+                command TEXT NOT NULL,
+                success INTEGER NOT NULL,
+                return_code INTEGER,
+                run_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_date ON entries (date, ts);
+            CREATE INDEX IF NOT EXISTS entries_host ON entries (host, date);
+            CREATE INDEX IF NOT EXISTS entries_path ON entries (path);
+            PRAGMA user_version = {INDEX_SCHEMA_VERSION};
+            """)
+
+    def update(self) -> int:
+        # Index whatever was appended to the logs; returns new entry count
+        added = 0
+        offsets = dict(self.db.execute("SELECT path, offset FROM files"))
+        with self.db:
+            for path, date, kind in _log_files():
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                offset = offsets.get(path, 0)
+                if size == offset:
+                    continue
+                if size < offset:
+                    # Truncated or replaced: start over
+                    self.db.execute("DELETE FROM entries WHERE path = ?", (path,))
+                    offset = 0
+                rows, offset = self._read_entries(path, date, kind, offset)
+                self.db.executemany(
+                    "INSERT INTO entries (path, kind, date, ts, logged, host,"
+                    " command, success, return_code, run_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO files (path, offset) VALUES (?, ?)",
+                    (path, offset),
+                )
+                added += len(rows)
+        return added
+
+    @staticmethod
+    def _read_entries(
+        path: str, date: str, kind: str, offset: int
+    ) -> Tuple[List[tuple], int]:
+        # Parse complete entries after offset; returns rows and the new offset
+        rows = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            pending: List[str] = []
+            pending_start = offset
+            position = offset
+            for raw_line in f:
+                position += len(raw_line)
+                if not raw_line.endswith(b"\n"):
+                    break  # Still being written
+                line = raw_line.decode("utf-8", errors="replace")
+
+                if kind == "jsonl":
+                    offset = position
+                    row = _json_row(line, path, date)
+                    if row is not None:
+                        rows.append(row)
+                    continue
+
+                if pending and _TEXT_ENTRY_START_RE.match(line):
+                    # Previous entry never completed; drop it
+                    pending = []
+                if not pending:
+                    pending_start = position - len(raw_line)
+                pending.append(line)
+                match = _TEXT_ENTRY_RE.match("".join(pending))
+                if match:
+                    rows.append(
+                        (
+                            path,
+                            kind,
+                            date,
+                            match["ts"],
+                            match["ts"],
+                            match["host"],
+                            match["command"],
+                            int(match["success"] == "True"),
+                            int(match["rc"]),
+                            None,
+                        )
+                    )
+                    pending = []
+                    offset = position
+            if pending:
+                # Resume at the incomplete entry next time
+                offset = pending_start
+        return rows, offset
+
+    def query(
+        self,
+        *,
+        host: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        command: Optional[str] = None,
+        success: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        # Matching entries, oldest first.
+        # Args:
+        #     host: Host alias; "*" and "?" wildcards are allowed.
+        #     since/until: Inclusive dates (YYYY-MM-DD).
+        #     command: Substring of the command.
+        #     success: Only successful (True) or failed (False) runs.
+        #     limit: Return only the newest `limit` matches.
+        self.update()
+        clauses, params = [f"NOT ({_DUPLICATE_TEXT_ENTRY})"], []
+        if host:
+            clauses.append(
+                "host GLOB ?" if any(c in host for c in "*?") else "host = ?"
+            )
+            params.append(host)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("date <= ?")
+            params.append(until)
+        if command:
+            clauses.append("instr(command, ?) > 0")
+            params.append(command)
+        if success is not None:
+            clauses.append("success = ?")
+            params.append(int(success))
+
+        sql = (
+            "SELECT ts, host, command, success, return_code, run_id"
+            " FROM entries AS e WHERE " + " AND ".join(clauses)
+        )
+        sql += " ORDER BY date DESC, ts DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.db.execute(sql, params).fetchall()
+        return [
+            {
+                "timestamp": ts,
+                "host": host_name,
+                "command": cmd,
+                "success": bool(ok),
+                "return_code": rc,
+                "run_id": run_id,
+            }
+            for ts, host_name, cmd, ok, rc, run_id in reversed(rows)
+        ]
+
+
+def _json_row(line: str, path: str, date: str) -> Optional[tuple]:
+    # ts is the start of the run; logged, its end (about when the text log
+    # entry of the same run was written)
+    try:
+        entry = json.loads(line)
+        start = (entry.get("start") or "").replace("T", " ")[:19]
+        end = (entry.get("end") or "").replace("T", " ")[:19]
+        return (
+            path,
+            "jsonl",
+            date,
+            start,
+            end or start,
+            entry["host"],
+            entry["command"],
+            int(bool(entry["success"])),
+            entry.get("return_code"),
+            entry.get("run_id"),
+        )
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def iter_query_lines(entries: List[Dict[str, Any]]) -> Iterator[str]:
+    # Human-readable lines for --query-logs
+    for entry in entries:
+        status = (
+            "SUCCESS" if entry["success"] else f"FAILED (RC {entry['return_code']})"
+        )
+        command = entry["command"].replace("\n", "\\n")
+        yield f"{entry['timestamp']} | {entry['host']} | {status} | {command}"
@@ -3,9 +3,11 @@
 # Command Executor CLI Arguments
 
 import argparse
+import datetime
 import sys
 
 from config import Config
+from rollout import Rollout
 
 
 def create_parser():
@@ -23,6 +25,19 @@ Usage examples:
   {sys.argv[0]} --prefix web       # Filter hosts by prefix
   {sys.argv[0]} --config custom    # Use different SSH config
   {sys.argv[0]} --delay 5          # Add 5 second delay between hosts
+  {sys.argv[0]} --parallel 20      # Run on up to 20 hosts at once
+  {sys.argv[0]} --backend async -P 300  # asyncio backend for large fleets
+  {sys.argv[0]} --multiplex        # Reuse SSH connections between commands
+  {sys.argv[0]} -P 200 --connect-rate 20 --rate-per-jump  # Spare bastion MaxStartups
+  {sys.argv[0]} --retries 2 --retry-backoff 2   # Retry dropped connections
+  {sys.argv[0]} --preflight -P 100  # Fail unreachable hosts before ssh starts
+  {sys.argv[0]} --cli --stream     # Show output live (journalctl, tail)
+  {sys.argv[0]} --log-format both  # Also write a JSON Lines audit log
+  {sys.argv[0]} --query-logs --query-host 'web*' --since 2025-01-01 --query-status failed
+  {sys.argv[0]} --run "uptime" --hosts web-1,web-[2-9] --prefix db -P 50 --yes
+  {sys.argv[0]} --run "uname -r" --prefix web --output-format jsonl | jq .stdout
+  {sys.argv[0]} --run "uname -r" --prefix web --group-output  # Like dshbak -c
+  {sys.argv[0]} --run "systemctl reload nginx" --prefix web --batch-size 10% --batch-pause 30 --max-failures 2 --yes
   {sys.argv[0]} --version          # Show version
 
 Project files:
@@ -32,6 +47,20 @@ Project files:
     config.py                      - Configuration settings
     ssh_config_parser.py           - SSH configuration parser
     ssh_executor.py                - SSH command execution
+    async_ssh_executor.py          - asyncio execution backend
+    ssh_multiplexer.py             - ControlMaster connection pool
+    audit_log.py                   - Audit log formats and writer
+    audit_query.py                 - Indexed audit log search (--query-logs)
+    command_analyzer.py            - Token-aware command security checks
+    result_output.py               - JSONL/CSV result records (--output-format)
+    result_groups.py               - Identical result grouping (--group-output)
+    rollout.py                     - Rolling batches and failure thresholds
+    rate_limiter.py                - Connection start rate limiting
+    retry_policy.py                - Failure classes and transport retries
+    preflight.py                   - TCP reachability probe (--preflight)
+    connection_test.py             - Bulk connection test summary
+    host_facts.py                  - Host facts in one ssh session
+    facts_cache.py                 - On-disk host facts cache
 
 {Config.APP_NAME} v{Config.APP_VERSION}
         """.strip(),
@@ -93,6 +122,179 @@ Project files:
         help="Delay in seconds between executing commands on hosts (0-600, default: 0)",
     )
 
+    parser.add_argument(
+        "--parallel",
+        "-P",
+        type=int,
+        metavar="N",
+        default=Config.SSH_PARALLEL_WORKERS,
+        help=(
+            "Number of hosts to run on concurrently "
+            f"(1-{Config.VALIDATION['max_concurrent_connections']}, "
+            f"default: {Config.SSH_PARALLEL_WORKERS}; --delay forces 1; "
+            f"up to {Config.VALIDATION['max_async_connections']} with --backend async)"
+        ),
+    )
+
+    rollout_group = parser.add_argument_group("rolling execution")
+    rollout_group.add_argument(
+        "--batch-size",
+        metavar="N|N%",
+        default=Config.ROLLOUT_BATCH_SIZE,
+        help=(
+            "Run in batches of N hosts or N%% of the selection; each batch "
+            "finishes before the next starts (up to --parallel at a time)"
+        ),
+    )
+    rollout_group.add_argument(
+        "--batch-pause",
+        type=float,
+        metavar="SECONDS",
+        default=Config.ROLLOUT_BATCH_PAUSE,
+        help="Wait between batches (requires --batch-size)",
+    )
+    rollout_group.add_argument(
+        "--max-failures",
+        metavar="N|N%",
+        default=Config.ROLLOUT_MAX_FAILURES,
+        help=(
+            "Abort once more than N hosts (or N%% of the selection) failed; "
+            "no new hosts are started"
+        ),
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=("thread", "async"),
+        default=Config.SSH_EXECUTION_BACKEND,
+        help=(
+            "Execution backend: thread pool or asyncio subprocesses "
+            f"(default: {Config.SSH_EXECUTION_BACKEND})"
+        ),
+    )
+
+    parser.add_argument(
+        "--multiplex",
+        action="store_true",
+        default=Config.SSH_MULTIPLEX,
+        help=(
+            "Reuse one SSH master connection per host (ControlMaster, "
+            f"kept alive {Config.SSH_CONTROL_PERSIST}s; not on Windows)"
+        ),
+    )
+
+    parser.add_argument(
+        "--connect-rate",
+        type=float,
+        metavar="N",
+        default=Config.SSH_CONNECT_RATE,
+        help=(
+            "Start at most N new ssh connections per second (token bucket; "
+            "default: unlimited)"
+        ),
+    )
+
+    parser.add_argument(
+        "--connect-burst",
+        type=int,
+        metavar="N",
+        default=Config.SSH_CONNECT_BURST,
+        help=(
+            "Connections that may start at once before --connect-rate applies "
+            f"(default: {Config.SSH_CONNECT_BURST})"
+        ),
+    )
+
+    parser.add_argument(
+        "--rate-per-jump",
+        action="store_true",
+        default=Config.SSH_CONNECT_RATE_PER_JUMP,
+        help="Apply --connect-rate separately to each ProxyJump bastion",
+    )
+
+    parser.add_argument(
+        "--retries",
+        type=int,
+        metavar="N",
+        default=Config.SSH_RETRIES,
+        help=(
+            "Retry a host up to N times when ssh itself fails (exit 255: "
+            "connection reset, refused or timed out); failed commands and "
+            f"authentication errors are not retried (default: {Config.SSH_RETRIES})"
+        ),
+    )
+
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        metavar="SECONDS",
+        default=Config.SSH_RETRY_BACKOFF,
+        help=(
+            "Base wait before a retry; doubles per attempt with random jitter, "
+            f"at most {Config.SSH_RETRY_MAX_BACKOFF:g}s "
+            f"(default: {Config.SSH_RETRY_BACKOFF:g})"
+        ),
+    )
+
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        default=Config.SSH_PREFLIGHT,
+        help=(
+            "Probe every host's HostName:Port with a TCP connect, all at once, "
+            "and fail unreachable hosts before ssh is started (hosts behind "
+            "ProxyJump/ProxyCommand are not probed)"
+        ),
+    )
+
+    parser.add_argument(
+        "--preflight-timeout",
+        type=float,
+        metavar="SECONDS",
+        default=Config.SSH_PREFLIGHT_TIMEOUT,
+        help=(
+            "Pre-flight probe timeout, at most --connect-timeout "
+            f"(default: {Config.SSH_PREFLIGHT_TIMEOUT:g})"
+        ),
+    )
+
+    parser.add_argument(
+        "--log-format",
+        choices=Config.LOG_FORMATS,
+        default=Config.LOG_FORMAT,
+        help=(
+            "Audit log format: text lines, JSON Lines with timings and byte "
+            f"counts (.jsonl), or both (default: {Config.LOG_FORMAT})"
+        ),
+    )
+
+    parser.add_argument(
+        "--output-format",
+        choices=Config.OUTPUT_FORMATS,
+        default=Config.OUTPUT_FORMAT,
+        help=(
+            "Per-host results as decorated text or as JSON Lines / CSV records "
+            "written as each host completes (with --run, other messages go to "
+            f"stderr; default: {Config.OUTPUT_FORMAT})"
+        ),
+    )
+
+    parser.add_argument(
+        "--group-output",
+        action="store_true",
+        default=Config.GROUP_OUTPUT,
+        help=(
+            "Group hosts with identical output and return code and show each "
+            "distinct result once (records become one per group)"
+        ),
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print output lines live as hosts produce them, tagged with the host",
+    )
+
     # Debug and information
     parser.add_argument(
         "--verbose",
@@ -117,6 +319,67 @@ Project files:
 
     parser.add_argument("--list-hosts", action="store_true", help="Show host list")
 
+    # Non-interactive batch mode
+    batch_group = parser.add_argument_group("batch mode")
+    batch_group.add_argument(
+        "--run",
+        metavar="COMMAND",
+        help=(
+            "Run COMMAND on the selected hosts without prompts and exit "
+            "('-' reads it from stdin); exit status 1 if any host failed"
+        ),
+    )
+    batch_group.add_argument(
+        "--hosts",
+        metavar="LIST",
+        help=(
+            "Hosts for --run: aliases, ranges and wildcards, e.g. "
+            "web-1,web-[2-9],db-*,!db-3 (combined with --prefix)"
+        ),
+    )
+    batch_group.add_argument(
+        "--sudo", action="store_true", help="Run the --run command with sudo"
+    )
+    batch_group.add_argument(
+        "--yes",
+        "-y",
+        action="store_true",
+        help="Confirm commands that require confirmation (dangerous ones stay blocked)",
+    )
+
+    # Audit log search
+    query_group = parser.add_argument_group("audit log search")
+    query_group.add_argument(
+        "--query-logs",
+        action="store_true",
+        help="Search the audit logs (uses the filters below) and exit",
+    )
+    query_group.add_argument(
+        "--query-host",
+        metavar="HOST",
+        help="Host alias to search for (* and ? wildcards allowed)",
+    )
+    query_group.add_argument(
+        "--query-command", metavar="TEXT", help="Text the command must contain"
+    )
+    query_group.add_argument(
+        "--since", metavar="YYYY-MM-DD", help="First day to search (inclusive)"
+    )
+    query_group.add_argument(
+        "--until", metavar="YYYY-MM-DD", help="Last day to search (inclusive)"
+    )
+    query_group.add_argument(
+        "--query-status",
+        choices=("success", "failed"),
+        help="Only successful or only failed runs",
+    )
+    query_group.add_argument(
+        "--query-limit",
+        type=int,
+        metavar="N",
+        help="Show only the newest N matches",
+    )
+
     return parser
 
 
@@ -138,6 +401,62 @@ def parse_args(args=None):
     if parsed_args.connect_timeout <= 0:
         parser.error("Connection timeout must be a positive integer")
 
+    if parsed_args.backend == "async":
+        max_parallel = Config.VALIDATION["max_async_connections"]
+    else:
+        max_parallel = Config.VALIDATION["max_concurrent_connections"]
+    if not 1 <= parsed_args.parallel <= max_parallel:
+        parser.error(f"Parallel must be between 1 and {max_parallel}")
+
+    for name in ("since", "until"):
+        value = getattr(parsed_args, name)
+        if value:
+            try:
+                datetime.datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                parser.error(f"--{name} must be a date in YYYY-MM-DD format")
+
+    if parsed_args.query_limit is not None and parsed_args.query_limit <= 0:
+        parser.error("Query limit must be a positive integer")
+
+    if parsed_args.connect_rate is not None and parsed_args.connect_rate <= 0:
+        parser.error("Connection rate must be a positive number")
+    if parsed_args.connect_burst < 1:
+        parser.error("Connection burst must be at least 1")
+    if parsed_args.retries < 0:
+        parser.error("Retries cannot be negative")
+    if parsed_args.retry_backoff < 0:
+        parser.error("Retry backoff cannot be negative")
+    if parsed_args.preflight_timeout <= 0:
+        parser.error("Pre-flight timeout must be a positive number")
+    if parsed_args.rate_per_jump and parsed_args.connect_rate is None:
+        parser.error("--rate-per-jump requires --connect-rate")
+
+    try:
+        Rollout(parsed_args.batch_size, 0, parsed_args.max_failures)
+    except ValueError as e:
+        parser.error(str(e))
+    if parsed_args.batch_size is not None:
+        if parsed_args.delay > 0:
+            parser.error("--delay cannot be combined with --batch-size")
+    elif parsed_args.batch_pause:
+        parser.error("--batch-pause can only be used with --batch-size")
+    if parsed_args.batch_pause < 0:
+        parser.error("--batch-pause cannot be negative")
+
+    if parsed_args.run is None:
+        for name in ("hosts", "sudo", "yes"):
+            if getattr(parsed_args, name):
+                parser.error(f"--{name} can only be used with --run")
+    else:
+        if not parsed_args.run.strip():
+            parser.error("--run needs a command")
+        if parsed_args.gui:
+            parser.error("--run cannot be combined with --gui")
+        if not parsed_args.hosts and not parsed_args.prefix:
+            # Never default to the whole inventory; --hosts '*' does that
+            parser.error("--run needs --hosts or --prefix")
+
     return parsed_args
 
 
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# Token-aware analysis of shell commands against the SECURITY pattern lists.
+#
+# A command is split with shlex into simple commands (pipelines, && / || / ;
+# chains, subshells, command substitution and heredoc bodies) and each one
+# is classified on its own: a pattern starting with a word must match at
+# the command word ("sudo", "/sbin/mkfs.ext4") or anywhere after a wrapper
+# such as sudo, env or xargs, so quoted arguments and ordinary words like
+# "result" no longer match, while quoting tricks (r''m -rf) are undone by
+# the tokenizer. Findings are plain dicts:
+#     {"rule", "pattern", "segment", "index", "context"}
+# where segment is the simple command as parsed, index its 1-based position
+# in the command and context "command", "heredoc" or "nested" (the script
+# of sh -c, su -c, eval, an ssh remote command, or a quoted argument of
+# sudo/xargs). Piping into a shell (... | sh) is itself dangerous: what the
+# shell runs cannot be checked, so it gets a "| sh" finding.
+
+import re
+import shlex
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RULES = ("dangerous_commands", "require_confirmation")
+RULE_LABELS = {
+    "dangerous_commands": "dangerous",
+    "require_confirmation": "requires confirmation",
+}
+
+# Commands that run (part of) their arguments as another command
+WRAPPER_COMMANDS = frozenset(
+    {
+        "builtin",
+        "chroot",
+        "command",
+        "doas",
+        "env",
+        "exec",
+        "flock",
+        "ionice",
+        "nice",
+        "nohup",
+        "runuser",
+        "setsid",
+        "stdbuf",
+        "strace",
+        "sudo",
+        "time",
+        "timeout",
+        "unbuffer",
+        "watch",
+        "xargs",
+    }
+)
+# Commands whose -c argument is a shell script
+SCRIPT_COMMANDS = frozenset(
+    {"ash", "bash", "dash", "ksh", "runuser", "sh", "su", "zsh"}
+)
+# Shells that run a script read from stdin when no -c is given
+SHELLS = frozenset({"ash", "bash", "csh", "dash", "fish", "ksh", "sh", "tcsh", "zsh"})
+# Wrappers whose quoted arguments are re-split as a command ("sudo 'rm -rf /'")
+ARGUMENT_SCRIPT_COMMANDS = frozenset({"doas", "sudo", "xargs"})
+# ssh options that take a value; the remote command follows the destination
+SSH_VALUE_OPTIONS = frozenset("BbcDEeFIiJLlmOopQRSWw")
+EXEC_OPTIONS = frozenset({"-exec", "-execdir", "-ok", "-okdir"})
+# Shell keywords that may precede the command word
+KEYWORDS = frozenset(
+    {"!", "{", "}", "if", "then", "else", "elif", "fi", "do", "done", "while", "until"}
+)
+MAX_NESTING = 4
+
+_PUNCTUATION = "();<>|&`\n"
+_HEREDOC_RE = re.compile(r"(?<!<)<<(-?)[ \t]*(['\"]?)([\w.@-]+)\2")
+_ASSIGNMENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+_STEM_RE = re.compile(r"[\w-]*")
+_QUOTING_RE = re.compile(r"[\\'\"]")
+_OPERATOR_RE = re.compile(r"([();<>|&`])")
+_BIN_DIR_RE = re.compile(r"(^|/)s?bin$")
+_SHELL_PIPE_RE = re.compile(
+    r"\|[^|]*?(?<![\w-])(?:a|ba|c|da|k|tc|z)?sh(?![\w-])|\|[^|]*?(?<![\w-])fish(?![\w-])"
+)
+
+Rule = Tuple[str, str, Tuple[str, ...]]  # (rule, pattern, lowercased words)
+
+
+class _PatternTrie:
+    # Character trie of the SECURITY patterns, emitted as one regex.
+    #
+    # Alternatives that share a prefix share a branch and every branch starts
+    # with a literal, so the regex engine skips most positions of a long
+    # script after a single character test however many patterns there are.
+
+    WHITESPACE = " "
+
+    def __init__(self):
+        self.children = {}
+        self.index = None  # Pattern ending here
+
+    def add(self, pattern: str, index: int) -> None:
+        node = self
+        for char in " ".join(pattern.lower().split()):
+            node = node.children.setdefault(char, _PatternTrie())
+        if node.index is None:
+            node.index = index
+
+    def regex(self, chars: str = "") -> str:
+        # chars: the pattern text that leads to this node
+        parts = []
+        for char, child in self.children.items():
+            if char == self.WHITESPACE:
+                part = r"\s+"
+            else:
+                part = re.escape(char)
+                if not chars and re.match(r"\w", char):
+                    # Whole words only: "su" must not match "result".
+                    # Checked behind the first character so the branch
+                    # still starts with a literal.
+                    part += rf"(?<![\w-]{re.escape(char)})"
+            parts.append(part + child.regex(chars + char))
+        if self.index is not None:
+            # ... and "sudo"; a trailing option may have more flags
+            # appended ("rm -rf" matches "rm -rfv")
+            last_word = chars.rsplit(" ", 1)[-1]
+            end = ""
+            if re.search(r"\w$", last_word) and not last_word.startswith("-"):
+                end = r"(?![\w-])"
+            # Longer patterns are tried first, so the most specific wins
+            parts.append(f"{end}(?P<p{self.index}>)")
+        if len(parts) == 1:
+            return parts[0]
+        return "(?:" + "|".join(parts) + ")"
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(patterns: Tuple[str, ...]):
+    # One regex for the whole list, so a command is scanned once however
+    # many patterns there are; group p<i> belongs to patterns[i]
+    trie = _PatternTrie()
+    for i, pattern in enumerate(patterns):
+        if pattern.strip():
+            trie.add(pattern, i)
+    if not trie.children:
+        return None
+    return re.compile(trie.regex())
+
+
+def match_command_patterns(command: str, patterns) -> List[str]:
+    # Patterns found anywhere in the raw command text (case-insensitive), in
+    # order of first occurrence. Used for text shlex cannot tokenize.
+    regex = _compile_patterns(tuple(patterns))
+    if regex is None:
+        return []
+    found = []
+    for match in regex.finditer(command.lower()):
+        pattern = patterns[int(match.lastgroup[1:])]
+        if pattern not in found:
+            found.append(pattern)
+    return found
+
+
+def _could_match(command: str, patterns: Tuple[str, ...]) -> bool:
+    # Quick reject before tokenizing: every token match is also a match of
+    # the compiled regex once quoting is removed and operators are spaced
+    # out, so most commands never reach shlex
+    text = _OPERATOR_RE.sub(r" \1 ", _QUOTING_RE.sub("", command)).lower()
+    if "|" in text and _SHELL_PIPE_RE.search(text):
+        return True  # Possibly piped into a shell
+    regex = _compile_patterns(patterns)
+    return regex is not None and regex.search(text) is not None
+
+
+def _stem(token: str) -> str:
+    # Leading word part: "mkfs.ext4" -> "mkfs", "if=/dev/sda" -> "if"
+    return _STEM_RE.match(token).group()
+
+
+def _command_name(token: str, any_path: bool = True) -> str:
+    # "/usr/bin/sudo" -> "sudo"; with any_path False only programs under a
+    # bin directory are reduced, so "sudo cat /tmp/mkfs" is not "mkfs"
+    directory, _, name = token.rpartition("/")
+    if directory and not any_path and not _BIN_DIR_RE.search(directory):
+        return token.lower()
+    return name.lower()
+
+
+@lru_cache(maxsize=32)
+def _compile_rules(
+    dangerous: Tuple[str, ...], confirm: Tuple[str, ...]
+) -> Tuple[Dict[str, List[Rule]], List[Rule]]:
+    # Patterns starting with a word, indexed by the stem of that word (they
+    # are only tried at command positions), and all other patterns, which
+    # are tried at every token and against redirections
+    anchored: Dict[str, List[Rule]] = {}
+    floating: List[Rule] = []
+    for rule, patterns in zip(RULES, (dangerous, confirm)):
+        for pattern in patterns:
+            words = tuple(pattern.lower().split())
+            if not words:
+                continue
+            if re.match(r"\w", words[0]):
+                anchored.setdefault(_stem(words[0]), []).append((rule, pattern, words))
+            else:
+                floating.append((rule, pattern, words))
+    return anchored, floating
+
+
+def _last_word_matches(token: str, word: str) -> bool:
+    # The last pattern word may be the start of a token when the rest
+    # cannot extend the word: "mkfs" / "mkfs.ext4", "if=" / "if=/dev/sda",
+    # "-rf" / "-rfv", but not "su" / "sudo"
+    if token == word:
+        return True
+    if not token.startswith(word):
+        return False
+    return (
+        word.startswith("-")
+        or not re.match(r"\w", word[-1])
+        or not re.match(r"[\w-]", token[len(word)])
+    )
+
+
+def _matches_at(
+    tokens: List[str], start: int, words: Tuple[str, ...], primary: bool = False
+) -> bool:
+    # primary: tokens[start] is the command word itself
+    if start + len(words) > len(tokens):
+        return False
+    last = len(words) - 1
+    for offset, word in enumerate(words):
+        token = tokens[start + offset].lower()
+        if offset == 0 and re.match(r"\w", word):
+            token = _command_name(token, primary)
+        if offset < last:
+            if token != word:
+                return False
+        elif not _last_word_matches(token, word):
+            return False
+    return True
+
+
+def _extract_heredocs(script: str) -> Tuple[str, List[str]]:
+    # Split heredoc bodies off the script; shlex knows nothing about them
+    lines = script.split("\n")
+    kept, bodies = [], []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        kept.append(line)
+        i += 1
+        for match in _HEREDOC_RE.finditer(line):
+            strip_tabs, delimiter = match.group(1) == "-", match.group(3)
+            body = []
+            while i < len(lines):
+                body_line = lines[i]
+                i += 1
+                if (body_line.lstrip("\t") if strip_tabs else body_line) == delimiter:
+                    break
+                body.append(body_line)
+            bodies.append("\n".join(body))
+    return "\n".join(kept), bodies
+
+
+def _tokenize(script: str) -> List[str]:
+    lexer = shlex.shlex(script, posix=True, punctuation_chars=_PUNCTUATION)
+    lexer.whitespace = " \t\r"  # Newlines separate commands
+    lexer.whitespace_split = True
+    lexer.commenters = ""  # "#" only starts a comment at a word start
+    return list(lexer)
+
+
+def _split_segments(
+    tokens: List[str],
+) -> Iterator[Tuple[List[str], List[Tuple[str, str]], bool]]:
+    # (words, redirections, piped) of each simple command; piped: its stdin
+    # is the previous command's output
+    words: List[str] = []
+    redirects: List[Tuple[str, str]] = []
+    operator: Optional[str] = None
+    piped = False
+    for token in tokens:
+        if token and all(char in _PUNCTUATION for char in token):
+            if token[0] in "<>" or token in ("&>", "&>>"):
+                if words and words[-1].isdigit():
+                    token = words.pop() + token  # "2>"
+                operator = token
+                continue
+            # Separator: ; & && | || ( ) ` or a newline
+            if words and words[-1] == "$":
+                words.pop()  # "$(" command substitution
+            if words or redirects:
+                yield words, redirects, piped
+            words, redirects, operator = [], [], None
+            piped = token in ("|", "|&")
+            continue
+        if operator is not None:
+            redirects.append((operator, token))
+            operator = None
+        else:
+            words.append(token)
+    if words or redirects:
+        yield words, redirects, piped
+
+
+def _command_positions(words: List[str]) -> List[int]:
+    # Indexes of words that may be a command name; the first is the
+    # command word itself
+    i = 0
+    while i < len(words) and (words[i] in KEYWORDS or _ASSIGNMENT_RE.match(words[i])):
+        i += 1
+    if i == len(words):
+        return []
+    positions = {i}
+    if _command_name(words[i]) in WRAPPER_COMMANDS:
+        # Wrapper options are not told apart from the wrapped command
+        positions.update(range(i + 1, len(words)))
+    positions.update(
+        j + 1 for j in range(i, len(words) - 1) if words[j] in EXEC_OPTIONS
+    )
+    return [i] + sorted(positions - {i})
+
+
+def _script_option(words: List[str], i: int) -> Optional[int]:
+    # Index of the -c / --command script argument of the shell at words[i]
+    for j in range(i + 1, len(words) - 1):
+        word = words[j]
+        if word == "--command" or (
+            word.startswith("-") and not word.startswith("--") and "c" in word
+        ):
+            return j + 1
+    return None
+
+
+def _ssh_remote_command(words: List[str], i: int) -> Optional[str]:
+    # The command ssh runs remotely: the words after the destination, joined
+    # with spaces as ssh itself does
+    j = i + 1
+    while j < len(words) and words[j].startswith("-") and len(words[j]) > 1:
+        if words[j] == "--":
+            j += 1
+            break
+        flags = words[j][1:]
+        for k, flag in enumerate(flags):
+            if flag in SSH_VALUE_OPTIONS:
+                if k == len(flags) - 1:
+                    j += 1  # "-p 22": the value is the next word
+                break
+        j += 1
+    remote = words[j + 1 :]
+    return " ".join(remote) if remote else None
+
+
+def _nested_scripts(words: List[str], positions: List[int]) -> Iterator[str]:
+    # Scripts run by sh -c '...', su -c '...', eval and ssh host '...', and
+    # quoted arguments of sudo/xargs, which would run as a command
+    for i in positions:
+        name = _command_name(words[i], i == positions[0])
+        if name == "eval":
+            yield " ".join(words[i + 1 :])
+        elif name == "ssh":
+            remote = _ssh_remote_command(words, i)
+            if remote:
+                yield remote
+        elif name in SCRIPT_COMMANDS:
+            script = _script_option(words, i)
+            if script is not None:
+                yield words[script]
+        elif name in ARGUMENT_SCRIPT_COMMANDS and any(
+            " " in word or "\t" in word for word in words[i + 1 :]
+        ):
+            # Joined unquoted, so "rm -rf /" becomes a command again
+            yield " ".join(words[i:])
+
+
+def _segment_text(words: List[str], redirects: List[Tuple[str, str]]) -> str:
+    parts = [shlex.quote(word) for word in words]
+    parts += [f"{op}{shlex.quote(target)}" for op, target in redirects]
+    return " ".join(parts)
+
+
+class _Analysis:
+    # One analyze_command() run: walks the segments and collects findings
+
+    def __init__(
+        self,
+        dangerous: Tuple[str, ...],
+        confirm: Tuple[str, ...],
+        safe_targets: Tuple[str, ...],
+    ):
+        self.patterns = (dangerous, confirm)
+        self.anchored, self.floating = _compile_rules(dangerous, confirm)
+        self.safe_targets = frozenset(target.lower() for target in safe_targets)
+        self.findings: List[Dict[str, Any]] = []
+        self.index = 0
+
+    def add(self, rule: str, pattern: str, segment: str, context: str) -> None:
+        # The same pattern may be listed under both rules ("fdisk"): each
+        # rule keeps its own finding
+        for finding in self.findings:
+            if (
+                finding["index"] == self.index
+                and finding["rule"] == rule
+                and finding["pattern"] == pattern
+            ):
+                return
+        self.findings.append(
+            {
+                "rule": rule,
+                "pattern": pattern,
+                "segment": segment,
+                "index": self.index,
+                "context": context,
+            }
+        )
+
+    def script(self, script: str, context: str, depth: int = 0) -> None:
+        script, heredocs = _extract_heredocs(script)
+        try:
+            tokens = _tokenize(script)
+        except ValueError:
+            # Unbalanced quotes: fall back to matching the raw text
+            self.raw(script, context)
+        else:
+            for words, redirects, piped in _split_segments(tokens):
+                self.segment(words, redirects, context, depth, piped)
+        for body in heredocs:
+            # Bodies are often large data payloads: skip the clean ones
+            if _could_match(body, self.patterns[0] + self.patterns[1]):
+                self.script(body, "heredoc", depth)
+
+    def raw(self, text: str, context: str) -> None:
+        self.index += 1
+        segment = " ".join(text.split())
+        for rule, patterns in zip(RULES, self.patterns):
+            for pattern in match_command_patterns(text, patterns):
+                self.add(rule, pattern, segment, context)
+
+    def segment(
+        self,
+        words: List[str],
+        redirects: List[Tuple[str, str]],
+        context: str,
+        depth: int,
+        piped: bool = False,
+    ) -> None:
+        self.index += 1
+        text = _segment_text(words, redirects)
+        positions = _command_positions(words)
+
+        if piped:
+            for i in positions:
+                name = _command_name(words[i], i == positions[0])
+                if name in SHELLS and _script_option(words, i) is None:
+                    # The script comes from the pipe and cannot be checked
+                    self.add(RULES[0], f"| {name}", text, context)
+                    break
+
+        for i in positions:
+            primary = i == positions[0]
+            for rule, pattern, pattern_words in self.anchored.get(
+                _stem(_command_name(words[i], primary)), ()
+            ):
+                if _matches_at(words, i, pattern_words, primary):
+                    self.add(rule, pattern, text, context)
+
+        checked = [
+            [op.lstrip("0123456789"), target]
+            for op, target in redirects
+            if target.lower() not in self.safe_targets
+        ]
+        for rule, pattern, pattern_words in self.floating:
+            if any(
+                _matches_at(words, i, pattern_words) for i in range(len(words))
+            ) or any(_matches_at(pair, 0, pattern_words) for pair in checked):
+                self.add(rule, pattern, text, context)
+
+        if depth < MAX_NESTING:
+            for nested in _nested_scripts(words, positions):
+                self.script(nested, "nested", depth + 1)
+
+
+@lru_cache(maxsize=256)
+def _analyze(
+    command: str,
+    dangerous: Tuple[str, ...],
+    confirm: Tuple[str, ...],
+    safe_targets: Tuple[str, ...],
+) -> Tuple[Dict[str, Any], ...]:
+    if not _could_match(command, dangerous + confirm):
+        return ()
+    analysis = _Analysis(dangerous, confirm, safe_targets)
+    analysis.script(command, "command")
+    return tuple(analysis.findings)
+
+
+def analyze_command(command: str, security: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Findings for command under a SECURITY policy dict, in command order.
+    # Results are cached per command string and policy.
+    findings = _analyze(
+        command,
+        tuple(security.get("dangerous_commands", ())),
+        tuple(security.get("require_confirmation", ())),
+        tuple(security.get("safe_redirect_targets", ())),
+    )
+    return [dict(finding) for finding in findings]
+
+
+def format_finding(finding: Dict[str, Any]) -> str:
+    # One line for the GUI and CLI, e.g.
+    # "#2 rm -rf /tmp: dangerous ('rm -rf')"
+    context = "" if finding["context"] == "command" else f" ({finding['context']})"
+    label = RULE_LABELS.get(finding["rule"], finding["rule"])
+    return (
+        f"#{finding['index']}{context} {finding['segment']}: "
+        f"{label} ('{finding['pattern']}')"
+    )
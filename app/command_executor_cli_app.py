@@ -1,13 +1,36 @@
 #!/usr/bin/env python3
 # Console interface component for Command Executor.
 
-import time
-from typing import Dict, List
-
+import contextlib
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from async_ssh_executor import EXECUTOR_BACKENDS
+from cli_args import create_parser
+from command_analyzer import format_finding
 from config import Config
-from ssh_config_parser import SSHConfigParser, natural_sort_key
+from connection_test import (
+    REACHABLE,
+    ConnectionTestSummary,
+    format_connection_result,
+)
+from facts_cache import FactsRefresher, HostFactsCache
+from host_facts import HOST_FACTS
+from result_groups import ResultGrouper, format_group_header
+from result_output import make_result_writer
+from retry_policy import describe_failure
+from rollout import Rollout
+from ssh_config_parser import SSHConfigParser, fold_host_range
 from ssh_executor import SSHExecutor
 
+# Exit statuses of the non-interactive --run mode
+EXIT_OK = 0
+EXIT_FAILED = 1  # The command failed on at least one host
+EXIT_USAGE = 2  # No hosts selected or unknown hosts
+EXIT_REFUSED = 3  # Blocked or not confirmed by the security checks
+EXIT_INTERRUPTED = 130  # Ctrl+C
+
 
 def get_multiline_command():
     """Get command with multiline input support"""
@@ -47,27 +70,37 @@ def get_multiline_command():
 
 
 def main(args=None):
-    # CLI version entry point.
-    prefix = args.prefix if args and hasattr(args, "prefix") else ""
-    raw_config_path = args.config if args and hasattr(args, "config") else None
-    config_path = Config.get_ssh_config_path(raw_config_path)
-    timeout = (
-        args.timeout
-        if args and hasattr(args, "timeout")
-        else Config.SSH_COMMAND_TIMEOUT
-    )
-    connect_timeout = (
-        args.connect_timeout
-        if args and hasattr(args, "connect_timeout")
-        else Config.SSH_CONNECT_TIMEOUT
-    )
-    delay = args.delay if args and hasattr(args, "delay") else 0
-    debug = args.debug if args and hasattr(args, "debug") else False
+    # CLI version entry point. Without args, the parser defaults are used,
+    # so every option is always present.
+    if args is None:
+        args = create_parser().parse_args([])
+    prefix = args.prefix
+    config_path = Config.get_ssh_config_path(args.config)
+    timeout = args.timeout
+    connect_timeout = args.connect_timeout
+    delay = args.delay
+    parallel = args.parallel
+    backend = args.backend
+    multiplex = args.multiplex
+    log_format = args.log_format
+    connect_rate = args.connect_rate
+    connect_burst = args.connect_burst
+    rate_per_jump = args.rate_per_jump
+    retries = args.retries
+    retry_backoff = args.retry_backoff
+    preflight = args.preflight
+    preflight_timeout = args.preflight_timeout
+    stream = args.stream
+    group_output = args.group_output
+    output_format = args.output_format
+    rollout = make_rollout(args)
+    debug = args.debug
 
     if debug:
         print(
             f"[DEBUG] CLI args: prefix='{prefix}', config='{config_path}', "
-            f"timeout={timeout}, connect_timeout={connect_timeout}, delay={delay}"
+            f"timeout={timeout}, connect_timeout={connect_timeout}, delay={delay}, "
+            f"parallel={parallel}, backend={backend}, multiplex={multiplex}"
         )
 
     separator = "=" * Config.CLI_SEPARATOR_LENGTH
@@ -76,11 +109,22 @@ def main(args=None):
     print(separator)
 
     parser = SSHConfigParser(config_path)
-    executor = SSHExecutor(
+    executor = EXECUTOR_BACKENDS[backend](
         ssh_config_path=config_path,
         connect_timeout=connect_timeout,
         command_timeout=timeout,
+        max_workers=parallel,
+        multiplex=multiplex,
+        log_format=log_format,
+        connect_rate=connect_rate,
+        connect_burst=connect_burst,
+        rate_per_jump=rate_per_jump,
+        retries=retries,
+        retry_backoff=retry_backoff,
+        preflight=preflight,
+        preflight_timeout=preflight_timeout,
     )
+    facts_refresher = FactsRefresher(HostFactsCache(ssh_config_path=config_path))
 
     print(f"\n{Config.get_cli_symbol('folder')} Available host groups:")
     all_groups = parser.get_grouped_hosts_with_prefix("")
@@ -179,9 +223,17 @@ def main(args=None):
                 print(Config.get_message("goodbye"))
                 break
             elif choice == "1":
-                execute_command_on_hosts(host_index, executor, delay)
+                execute_command_on_hosts(
+                    host_index,
+                    executor,
+                    delay,
+                    stream=stream,
+                    output_format=output_format,
+                    group_output=group_output,
+                    rollout=rollout,
+                )
             elif choice == "2":
-                show_host_info(host_index, parser)
+                show_host_info(host_index, parser, executor, facts_refresher)
             elif choice == "3":
                 test_host_connection(host_index, executor)
             elif choice == "4":
@@ -198,6 +250,99 @@ def main(args=None):
         ) as exc:  # pragma: no cover - safeguard against unexpected CLI errors
             print(f"{Config.get_cli_symbol('error')} Error: {exc}")
 
+    # Close multiplexed master connections, if any
+    executor.close()
+
+
+def make_rollout(args) -> Optional[Rollout]:
+    """Rolling execution settings from the arguments; None when not used."""
+    if args.batch_size is None and args.max_failures is None:
+        return None
+    return Rollout(args.batch_size, args.batch_pause, args.max_failures)
+
+
+def run_batch(args) -> int:
+    """Non-interactive --run mode for cron and CI; returns the exit status."""
+    config_path = Config.get_ssh_config_path(args.config)
+    command = sys.stdin.read() if args.run == "-" else args.run
+    command = command.strip()
+    if not command:
+        print(f"{Config.get_cli_symbol('error')} Command not provided")
+        return EXIT_USAGE
+    if args.sudo and not command.startswith("sudo "):
+        command = f"sudo {command}"
+
+    parser = SSHConfigParser(config_path)
+    selected: Dict[str, None] = {}
+    if args.prefix:
+        selected.update(dict.fromkeys(parser.get_hosts_with_prefix(args.prefix)))
+    if args.hosts:
+        try:
+            hosts, unmatched = parser.select_hosts(args.hosts)
+        except ValueError as e:
+            print(f"{Config.get_cli_symbol('error')} {e}")
+            return EXIT_USAGE
+        if unmatched:
+            print(
+                f"{Config.get_cli_symbol('error')} No hosts in {config_path} "
+                f"match: {', '.join(unmatched)}"
+            )
+            return EXIT_USAGE
+        selected.update(dict.fromkeys(hosts))
+    selected_hosts = parser.sort_hosts(selected)
+    if not selected_hosts:
+        print(f"{Config.get_cli_symbol('error')} No hosts selected")
+        return EXIT_USAGE
+
+    # Records go to stdout; everything meant for people moves to stderr so
+    # the records can be piped straight into other tools
+    writer = make_result_writer(
+        args.output_format, sys.stdout, grouped=args.group_output
+    )
+    human_output = (
+        contextlib.redirect_stdout(sys.stderr)
+        if writer is not None
+        else contextlib.nullcontext()
+    )
+    with human_output:
+        if not check_command_safety(
+            command, selected_hosts, interactive=False, assume_yes=args.yes
+        ):
+            return EXIT_REFUSED
+
+        executor = EXECUTOR_BACKENDS[args.backend](
+            ssh_config_path=config_path,
+            connect_timeout=args.connect_timeout,
+            command_timeout=args.timeout,
+            max_workers=args.parallel,
+            multiplex=args.multiplex,
+            log_format=args.log_format,
+            connect_rate=args.connect_rate,
+            connect_burst=args.connect_burst,
+            rate_per_jump=args.rate_per_jump,
+            retries=args.retries,
+            retry_backoff=args.retry_backoff,
+            preflight=args.preflight,
+            preflight_timeout=args.preflight_timeout,
+        )
+        try:
+            stats = run_command_batch(
+                executor,
+                selected_hosts,
+                command,
+                args.delay,
+                stream=args.stream,
+                writer=writer,
+                group_output=args.group_output,
+                rollout=make_rollout(args),
+            )
+        finally:
+            executor.close()
+
+    if stats["interrupted"]:
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if stats["failed"] else EXIT_OK
+
 
 def parse_host_range(user_input: str, hosts_count: int) -> List[int]:
     """Parse a comma-separated list of host numbers such as "1,3,5-8"."""
@@ -256,8 +401,30 @@ def prompt_host_selection(
     return selected_numbers
 
 
+def make_line_printer() -> Callable[[Dict[str, Any]], None]:
+    """Return an on_line callback printing host-tagged lines as they arrive."""
+    lock = threading.Lock()
+
+    def print_line(event: Dict[str, Any]) -> None:
+        tag = f"[{event['hostname']}]"
+        if event["stream"] == "stderr":
+            tag += "[stderr]"
+        # Workers call this concurrently; keep lines from interleaving
+        with lock:
+            print(f"{tag} {event['line']}", flush=True)
+
+    return print_line
+
+
 def execute_command_on_hosts(
-    host_index: Dict[int, str], executor: SSHExecutor, delay: int = 0
+    host_index: Dict[int, str],
+    executor: SSHExecutor,
+    delay: int = 0,
+    *,
+    stream: bool = False,
+    output_format: str = "text",
+    group_output: bool = False,
+    rollout: Optional[Rollout] = None,
 ) -> None:
     print(f"\n{Config.get_cli_symbol('rocket')} Execute command on hosts")
     print("-" * 40)
@@ -271,10 +438,8 @@ def execute_command_on_hosts(
     if not selected_numbers:
         return
 
-    selected_hosts = [host_index[i] for i in selected_numbers]
-
-    # Sort hosts: alphabetically first, then numerically
-    selected_hosts = sorted(selected_hosts, key=natural_sort_key)
+    # Hosts are numbered in natural order, so sorting the numbers sorts them
+    selected_hosts = [host_index[i] for i in sorted(selected_numbers)]
 
     print(f"{Config.get_cli_symbol('success')} Selected hosts: {len(selected_hosts)}")
     for idx, host in enumerate(selected_hosts, 1):
@@ -292,7 +457,34 @@ def execute_command_on_hosts(
     if use_sudo and not command.startswith("sudo "):
         command = f"sudo {command}"
 
-    # Safety check for dangerous commands
+    if not check_command_safety(command, selected_hosts):
+        return
+
+    run_command_batch(
+        executor,
+        selected_hosts,
+        command,
+        delay,
+        stream=stream,
+        writer=make_result_writer(output_format, sys.stdout, grouped=group_output),
+        group_output=group_output,
+        rollout=rollout,
+    )
+
+
+def check_command_safety(
+    command: str,
+    selected_hosts: List[str],
+    *,
+    interactive: bool = True,
+    assume_yes: bool = False,
+) -> bool:
+    """Apply the security checks; True if the command may run.
+
+    Dangerous commands are always blocked. Commands that require
+    confirmation are confirmed by assume_yes, otherwise by a prompt when
+    interactive and refused when not.
+    """
     dangerous_result = Config.check_dangerous_command(command)
     if dangerous_result["is_dangerous"]:
         print(
@@ -300,25 +492,71 @@ def execute_command_on_hosts(
         )
         print(f"Command: {command}")
         print(f"Reason: {dangerous_result['reason']}")
+        for finding in dangerous_result["findings"]:
+            print(f"  {format_finding(finding)}")
         print("Execution of dangerous commands is prohibited for safety.")
-        return
+        return False
 
     # Additional confirmation for sensitive commands
-    if Config.requires_confirmation(command):
+    if Config.requires_confirmation(command) and not assume_yes:
         print(
             f"\n{Config.get_cli_symbol('warning')} NOTICE: Command requires confirmation!"
         )
         print(f"Command: {command}")
+        for finding in Config.analyze_command(command):
+            print(f"  {format_finding(finding)}")
         print(f"Hosts: {', '.join(selected_hosts)}")
+        if not interactive:
+            print(
+                f"{Config.get_cli_symbol('info')} Not confirmed; pass --yes to run it"
+            )
+            return False
         confirm = input("Continue execution? (y/N): ").strip().lower()
         if confirm != "y":
             print(f"{Config.get_cli_symbol('info')} Execution cancelled by user")
-            return
-
+            return False
+
+    return True
+
+
+def run_command_batch(
+    executor: SSHExecutor,
+    selected_hosts: List[str],
+    command: str,
+    delay: int = 0,
+    *,
+    stream: bool = False,
+    writer: Optional[Any] = None,
+    group_output: bool = False,
+    rollout: Optional[Rollout] = None,
+) -> Dict[str, Any]:
+    """Run command on the hosts, print each result and a summary.
+
+    With a writer (see result_output), each result is written as a record
+    the moment its host completes and only a status line is printed.
+    With group_output, hosts with identical results are grouped (see
+    result_groups): nothing is printed per host, the summary shows each
+    distinct result once and a writer receives one record per group.
+    With a rollout, hosts run in its batches and the run stops once its
+    failure limit is exceeded.
+    Returns counts for the caller: success, failed, completed, the failed
+    hosts, whether the run was interrupted with Ctrl+C or aborted by the
+    failure limit, and the hosts that were never started.
+    """
     print(f"\n{Config.get_cli_symbol('target')} Executing command: {command}")
     print(f"{Config.get_cli_symbol('satellite')} On hosts: {', '.join(selected_hosts)}")
     if delay > 0:
         print(f"{Config.get_cli_symbol('info')} Delay between hosts: {delay} sec")
+    elif executor.max_workers > 1 and len(selected_hosts) > 1:
+        print(
+            f"{Config.get_cli_symbol('info')} Parallel hosts: "
+            f"{min(executor.max_workers, len(selected_hosts))}"
+        )
+    if rollout is not None:
+        print(
+            f"{Config.get_cli_symbol('info')} Rolling execution: "
+            f"{rollout.describe(len(selected_hosts))}"
+        )
     print(f"{Config.get_cli_symbol('info')} Press Ctrl+C to stop execution")
     print("=" * Config.CLI_SEPARATOR_LENGTH)
 
@@ -326,16 +564,72 @@ def execute_command_on_hosts(
     success_count = 0
     error_count = 0
     error_hosts = []
+    completed = 0
+    interrupted = False
+    aborted = False
+    grouper = ResultGrouper() if group_output else None
+
+    def print_batch(number: int, count: int, hosts: List[str]) -> None:
+        if count > 1:
+            print(
+                f"\n{Config.get_cli_symbol('satellite')} Batch {number}/{count} "
+                f"({len(hosts)} hosts)"
+            )
+
+    # Results arrive in completion order when running in parallel
+    if rollout is not None:
+        batch = rollout.run(
+            executor,
+            selected_hosts,
+            command,
+            delay=delay,
+            on_line=make_line_printer() if stream else None,
+            on_batch=print_batch,
+        )
+    else:
+        batch = executor.iter_command_batch(
+            selected_hosts,
+            command,
+            delay=delay,
+            on_line=make_line_printer() if stream else None,
+        )
 
     try:
-        for idx, host in enumerate(selected_hosts, 1):
-            print(f"\n[{idx}/{len(selected_hosts)}]  {host}")
-            print("-" * 30)
-            try:
-                result = executor.execute_command(host, command)
+        for result in batch:
+            completed += 1
+            host = result["hostname"]
+            if result["success"]:
+                success_count += 1
+            else:
+                error_count += 1
+                error_hosts.append(host)
+
+            if grouper is not None:
+                # Only the first copy of each distinct output is kept; the
+                # groups are shown in the summary
+                grouper.add(result)
+            elif stream or writer is not None:
+                if writer is not None:
+                    writer.write(result)
+                # Output was already printed live or written as a record;
+                # report the status only
+                status = "success" if result["success"] else "error"
+                print(
+                    f"[{completed}/{len(selected_hosts)}]  {host}: "
+                    f"{Config.get_cli_symbol(status)} RC {result['return_code']}"
+                    f"{describe_failure(result)}"
+                )
+                # Local failures (timeout, missing ssh) never reached the stream
+                if result["return_code"] == -1 and result["error"]:
+                    print(f"Error: {result['error']}")
+            else:
+                print(f"\n[{completed}/{len(selected_hosts)}]  {host}")
+                print("-" * 30)
                 if result["success"]:
-                    success_count += 1
-                    print(f"{Config.get_cli_symbol('success')} Success ")
+                    print(
+                        f"{Config.get_cli_symbol('success')} Success"
+                        f"{describe_failure(result)}"
+                    )
                     if result["output"]:
                         print("Output:")
                         print(result["output"])
@@ -343,29 +637,26 @@ def execute_command_on_hosts(
                         print("Warnings:")
                         print(result["error"])
                 else:
-                    error_count += 1
-                    error_hosts.append(host)
-                    print(f"{Config.get_cli_symbol('error')} Error ")
+                    print(
+                        f"{Config.get_cli_symbol('error')} Error"
+                        f"{describe_failure(result)}"
+                    )
                     if result["error"]:
                         print("Error:")
                         print(result["error"])
-            except (
-                Exception
-            ) as exc:  # pragma: no cover - safeguard against unexpected CLI errors
-                error_count += 1
-                error_hosts.append(host)
-                print(f"{Config.get_cli_symbol('error')} Exception: {exc}")
 
-            # Add delay between hosts (but not after the last host)
-            if delay > 0 and idx < len(selected_hosts):
+            # The engine sleeps before the next host once we ask for it
+            if delay > 0 and completed < len(selected_hosts) and grouper is None:
                 print(
                     f"\n{Config.get_cli_symbol('scroll')} Waiting {delay} seconds before next host..."
                 )
-                time.sleep(delay)
+
+        aborted = rollout is not None and rollout.aborted
 
         # Summary report
         print("\n" + "=" * Config.CLI_SEPARATOR_LENGTH)
-        print(f"{Config.get_cli_symbol('clipboard')} EXECUTION SUMMARY")
+        title = "EXECUTION SUMMARY (Aborted)" if aborted else "EXECUTION SUMMARY"
+        print(f"{Config.get_cli_symbol('clipboard')} {title}")
         print("=" * Config.CLI_SEPARATOR_LENGTH)
         print(
             f"{Config.get_cli_symbol('success')} Successful: {success_count}/{len(selected_hosts)}"
@@ -373,8 +664,18 @@ def execute_command_on_hosts(
         print(
             f"{Config.get_cli_symbol('error')} Failed: {error_count}/{len(selected_hosts)}"
         )
+        if aborted:
+            print(
+                f"\n{Config.get_cli_symbol('warning')} Aborted: more than "
+                f"{rollout.failure_limit(len(selected_hosts)):g} hosts failed; "
+                f"{len(rollout.skipped)} hosts not started"
+            )
+            if rollout.skipped:
+                print(f"  Not started: {fold_host_range(rollout.skipped)}")
 
-        if error_hosts:
+        if grouper is not None:
+            print_result_groups(grouper)
+        elif error_hosts:
             print(f"\n{Config.get_cli_symbol('warning')} Hosts with errors:")
             for host in error_hosts:
                 print(f"  - {host}")
@@ -382,11 +683,14 @@ def execute_command_on_hosts(
         print("=" * Config.CLI_SEPARATOR_LENGTH)
 
     except KeyboardInterrupt:
+        interrupted = True
+        # Cancel hosts that have not started yet
+        batch.close()
         print(
             f"\n\n{Config.get_cli_symbol('error')} Execution stopped by user (Ctrl+C)"
         )
         print(
-            f"{Config.get_cli_symbol('info')} Completed: {idx}/{len(selected_hosts)} hosts"
+            f"{Config.get_cli_symbol('info')} Completed: {completed}/{len(selected_hosts)} hosts"
         )
 
         # Summary even on interrupt
@@ -396,16 +700,56 @@ def execute_command_on_hosts(
         print(f"{Config.get_cli_symbol('success')} Successful: {success_count}")
         print(f"{Config.get_cli_symbol('error')} Failed: {error_count}")
 
-        if error_hosts:
+        if grouper is not None:
+            print_result_groups(grouper)
+        elif error_hosts:
             print(f"\n{Config.get_cli_symbol('warning')} Hosts with errors:")
             for host in error_hosts:
                 print(f"  - {host}")
 
         print("=" * Config.CLI_SEPARATOR_LENGTH)
-        return
 
+    if grouper is not None and writer is not None:
+        for group in grouper.groups():
+            writer.write(group)
+
+    return {
+        "success": success_count,
+        "failed": error_count,
+        "completed": completed,
+        "error_hosts": error_hosts,
+        "interrupted": interrupted,
+        "aborted": aborted,
+        "skipped": rollout.skipped if rollout is not None else [],
+    }
+
+
+def print_result_groups(grouper: ResultGrouper) -> None:
+    """Print each distinct result once under the hosts that produced it."""
+    print(f"\n{Config.get_cli_symbol('clipboard')} Distinct results: {len(grouper)}")
+    for group in grouper.groups():
+        status = "success" if group["success"] else "error"
+        print("-" * 30)
+        print(f"{Config.get_cli_symbol(status)} {format_group_header(group)}")
+        if group["output"]:
+            print(group["output"])
+        if group["error"]:
+            print("Error:" if not group["success"] else "Warnings:")
+            print(group["error"])
+
+
+def show_host_info(
+    host_index: Dict[int, str],
+    parser: SSHConfigParser,
+    executor: Optional[SSHExecutor] = None,
+    refresher: Optional[FactsRefresher] = None,
+) -> None:
+    """Show the SSH options and the cached facts of the selected hosts.
 
-def show_host_info(host_index: Dict[int, str], parser: SSHConfigParser) -> None:
+    Facts are read from the on-disk cache. Hosts without any cached facts
+    are gathered in one parallel pass; stale facts are shown as they are and
+    refreshed in the background for the next lookup.
+    """
     print(f"\n{Config.get_cli_symbol('clipboard')} Host information")
     print("-" * 30)
 
@@ -413,6 +757,34 @@ def show_host_info(host_index: Dict[int, str], parser: SSHConfigParser) -> None:
     if not selected_numbers:
         return
 
+    facts: Dict[str, Dict[str, str]] = {}
+    refreshing = set()
+    if executor is not None and refresher is not None:
+        hostnames = [host_index[num] for num in selected_numbers if num in host_index]
+        missing = []
+        stale_facts = set()
+        for hostname in hostnames:
+            values, stale = refresher.cache.lookup(hostname)
+            if not values:
+                missing.append(hostname)
+                continue
+            facts[hostname] = values
+            if stale:
+                refreshing.add(hostname)
+                stale_facts.update(stale)
+        if missing:
+            print(
+                f"{Config.get_cli_symbol('search')} Gathering facts from "
+                f"{len(missing)} hosts..."
+            )
+            facts.update(refresher.fetch(executor, missing))
+        if refreshing:
+            refresher.refresh(
+                executor,
+                [host for host in hostnames if host in refreshing],
+                [fact for fact in HOST_FACTS if fact in stale_facts],
+            )
+
     for host_num in selected_numbers:
         hostname = host_index.get(host_num)
         if hostname is None:
@@ -430,8 +802,19 @@ def show_host_info(host_index: Dict[int, str], parser: SSHConfigParser) -> None:
         else:
             print("Host information not found")
 
+        if hostname in facts:
+            note = " (refreshing in background)" if hostname in refreshing else ""
+            print(f"-- Facts{note}")
+            for key, value in facts[hostname].items():
+                print(f"{key:15s}: {value}".replace("\n", "\n" + " " * 17))
+
 
 def test_host_connection(host_index: Dict[int, str], executor: SSHExecutor) -> None:
+    """Test the connection to the selected hosts concurrently.
+
+    Results are printed as they arrive, each with its latency, followed by
+    a reachable / unreachable / auth failed summary.
+    """
     print(f"\n{Config.get_cli_symbol('search')} Test connection")
     print("-" * 25)
 
@@ -439,26 +822,38 @@ def test_host_connection(host_index: Dict[int, str], executor: SSHExecutor) -> N
     if not selected_numbers:
         return
 
+    hostnames = []
     for host_num in selected_numbers:
         hostname = host_index.get(host_num)
         if hostname is None:
             print(f"{Config.get_cli_symbol('error')} Host #{host_num} not found")
-            continue
+        else:
+            hostnames.append(hostname)
+    if not hostnames:
+        return
 
-        print(f"{Config.get_cli_symbol('search')} Testing connection to {hostname}...")
+    workers = min(executor.max_workers, len(hostnames))
+    print(
+        f"{Config.get_cli_symbol('search')} Testing {len(hostnames)} hosts "
+        f"({workers} at a time)..."
+    )
 
-        result = executor.test_connection(hostname)
-        if result["success"]:
-            print(f"{Config.get_cli_symbol('success')} Connection successful")
-            if result["output"]:
-                print(f"Response: {result['output']}")
-        else:
-            print(f"{Config.get_cli_symbol('error')} Connection error")
-            if result["error"]:
-                print(f"Error: {result['error']}")
+    summary = ConnectionTestSummary()
+    try:
+        for completed, result in enumerate(
+            executor.iter_connection_tests(hostnames), 1
+        ):
+            status = summary.add(result)
+            symbol = "success" if status == REACHABLE else "error"
+            print(
+                f"[{completed}/{len(hostnames)}]  {Config.get_cli_symbol(symbol)} "
+                f"{format_connection_result(result)}"
+            )
+    except KeyboardInterrupt:
+        print(f"\n{Config.get_cli_symbol('warning')} Connection test interrupted")
 
-        if host_num != selected_numbers[-1]:
-            print("-" * 25)
+    print("-" * 25)
+    print(summary.format())
 
 
 def show_hosts_list(host_index: Dict[int, str], parser: SSHConfigParser) -> None:
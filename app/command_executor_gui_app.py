@@ -3,13 +3,22 @@
 # GUI application component for Command Executor.
 
 import threading
-import time
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 
+from async_ssh_executor import EXECUTOR_BACKENDS
+from command_analyzer import format_finding
 from config import Config
-from ssh_config_parser import SSHConfigParser, natural_sort_key
-from ssh_executor import SSHExecutor
+from connection_test import (
+    REACHABLE,
+    ConnectionTestSummary,
+    format_connection_result,
+)
+from facts_cache import FactsRefresher, HostFactsCache
+from result_groups import ResultGrouper, format_group_header
+from retry_policy import describe_failure
+from rollout import Rollout
+from ssh_config_parser import SSHConfigParser, fold_host_range
 
 
 class CommandExecutorApp:
@@ -26,12 +35,21 @@ class CommandExecutorApp:
         ssh_config_path = getattr(self.args, "config", Config.DEFAULT_SSH_CONFIG_PATH)
         self.ssh_config_path = ssh_config_path
         self.config_parser = SSHConfigParser(ssh_config_path)
-        self.ssh_executor = SSHExecutor(ssh_config_path)
+        self.executor_class = EXECUTOR_BACKENDS[
+            getattr(self.args, "backend", Config.SSH_EXECUTION_BACKEND)
+        ]
+        self.multiplex = getattr(self.args, "multiplex", Config.SSH_MULTIPLEX)
+        self.log_format = getattr(self.args, "log_format", Config.LOG_FORMAT)
+        self.ssh_executor = self.create_executor()
         self.selected_hosts = set()
+        self.facts_cache = HostFactsCache(ssh_config_path=ssh_config_path)
+        self.facts_refresher = FactsRefresher(self.facts_cache)
 
         # Control flags for execution
         self.stop_execution = threading.Event()  # Flag to stop command execution
         self.is_executing = False  # Track if commands are currently executing
+        self.connection_test_thread = None  # At most one bulk test at a time
+        self.executor_outdated = False  # SSH config changed; replace when idle
 
         # Create interface
         self.create_widgets()
@@ -114,6 +132,9 @@ class CommandExecutorApp:
         ttk.Button(buttons_frame, text="Refresh", command=self.refresh_hosts).pack(
             side=tk.LEFT, padx=Config.GUI_BUTTON_PADX
         )
+        ttk.Button(
+            buttons_frame, text="Test Selected", command=self.test_selected_connections
+        ).pack(side=tk.LEFT, padx=Config.GUI_BUTTON_PADX)
 
         # Host tree
         tree_frame = ttk.Frame(hosts_frame)
@@ -256,6 +277,26 @@ class CommandExecutorApp:
         )
         self.verbose_checkbox.pack(side=tk.LEFT, padx=(0, 10))
 
+        # Live output: lines appear as hosts produce them
+        self.live_output_var = tk.BooleanVar(value=getattr(self.args, "stream", False))
+        self.live_output_checkbox = ttk.Checkbutton(
+            options_frame,
+            text="Live Output",
+            variable=self.live_output_var,
+        )
+        self.live_output_checkbox.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Group output: hosts with identical results are shown once
+        self.group_output_var = tk.BooleanVar(
+            value=getattr(self.args, "group_output", Config.GROUP_OUTPUT)
+        )
+        self.group_output_checkbox = ttk.Checkbutton(
+            options_frame,
+            text="Group Output",
+            variable=self.group_output_var,
+        )
+        self.group_output_checkbox.pack(side=tk.LEFT, padx=(0, 10))
+
         # Delay between hosts (0-600 seconds = 10 minutes)
         ttk.Label(options_frame, text="Delay (sec):").pack(side=tk.LEFT, padx=(5, 2))
         self.delay_var = tk.IntVar(value=0)
@@ -268,6 +309,49 @@ class CommandExecutorApp:
         )
         self.delay_spinbox.pack(side=tk.LEFT)
 
+        # Hosts processed concurrently (ignored while a delay is set)
+        ttk.Label(options_frame, text="Parallel:").pack(side=tk.LEFT, padx=(10, 2))
+        self.parallel_var = tk.IntVar(
+            value=getattr(self.args, "parallel", Config.SSH_PARALLEL_WORKERS)
+        )
+        self.parallel_spinbox = ttk.Spinbox(
+            options_frame,
+            from_=1,
+            to=self.executor_class.resolve_max_workers(
+                Config.VALIDATION["max_async_connections"]
+            ),
+            width=4,
+            textvariable=self.parallel_var,
+        )
+        self.parallel_spinbox.pack(side=tk.LEFT)
+
+        # Rolling execution: batch size and failure limit as N or N%
+        ttk.Label(options_frame, text="Batch:").pack(side=tk.LEFT, padx=(10, 2))
+        batch_size = getattr(self.args, "batch_size", Config.ROLLOUT_BATCH_SIZE)
+        self.batch_size_var = tk.StringVar(value=batch_size or "")
+        ttk.Entry(options_frame, width=5, textvariable=self.batch_size_var).pack(
+            side=tk.LEFT
+        )
+
+        ttk.Label(options_frame, text="Pause:").pack(side=tk.LEFT, padx=(5, 2))
+        self.batch_pause_var = tk.IntVar(
+            value=int(getattr(self.args, "batch_pause", Config.ROLLOUT_BATCH_PAUSE))
+        )
+        ttk.Spinbox(
+            options_frame,
+            from_=0,
+            to=3600,
+            width=5,
+            textvariable=self.batch_pause_var,
+        ).pack(side=tk.LEFT)
+
+        ttk.Label(options_frame, text="Max fail:").pack(side=tk.LEFT, padx=(5, 2))
+        max_failures = getattr(self.args, "max_failures", Config.ROLLOUT_MAX_FAILURES)
+        self.max_failures_var = tk.StringVar(value=max_failures or "")
+        ttk.Entry(options_frame, width=5, textvariable=self.max_failures_var).pack(
+            side=tk.LEFT
+        )
+
         # Command input field frame
         cmd_input_frame = ttk.Frame(command_frame)
         cmd_input_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -616,7 +700,7 @@ class CommandExecutorApp:
         # Create a new window
         info_window = tk.Toplevel(self.root)
         info_window.title(f"Host information: {hostname}")
-        info_window.geometry("400x300")
+        info_window.geometry("500x480")
         info_window.resizable(True, True)
 
         # Frame with host details
@@ -644,6 +728,38 @@ class CommandExecutorApp:
 
         info_text.config(state=tk.DISABLED)
 
+        # Facts from the on-disk cache; stale ones are refreshed in background
+        facts_text = scrolledtext.ScrolledText(
+            info_frame, wrap=tk.WORD, font=("Consolas", 10), height=12
+        )
+        facts_text.pack(fill=tk.X, pady=(0, 10))
+
+        def show_facts(values, note=""):
+            if not facts_text.winfo_exists():
+                return  # Dialog closed before the refresh finished
+            facts_text.config(state=tk.NORMAL)
+            facts_text.delete("1.0", tk.END)
+            facts_text.insert(tk.END, f"Facts{note}\n")
+            for key, value in values.items():
+                value = value.replace("\n", "\n" + " " * 17)
+                facts_text.insert(tk.END, f"{key:15s}: {value}\n")
+            facts_text.config(state=tk.DISABLED)
+
+        values, stale = self.facts_cache.lookup(hostname)
+        if stale:
+            note = " (refreshing...)" if values else " (gathering...)"
+            self.facts_refresher.refresh(
+                self.ssh_executor,
+                [hostname],
+                stale,
+                on_update=lambda alias, fresh: self.root.after(
+                    0, lambda: show_facts(fresh)
+                ),
+            )
+        else:
+            note = ""
+        show_facts(values, note)
+
         # Buttons
         button_frame = ttk.Frame(info_frame)
         button_frame.pack(fill=tk.X)
@@ -729,56 +845,75 @@ class CommandExecutorApp:
                     self.show_host_info_dialog(hostname)
 
     def context_test_connection(self):
-        # Run quick connection test from context menu
+        # Test the clicked host, or the whole selection when it is part of it
         if self.context_item:
             tags = self.hosts_tree.item(self.context_item, "tags")
             if "host" in tags:
                 hostname = self._get_hostname_for_item(self.context_item)
-                if hostname:
-                    self.quick_test_connection(hostname)
+                if hostname in self.selected_hosts:
+                    self.test_selected_connections()
+                elif hostname:
+                    self.quick_test_connection([hostname])
 
-    def quick_test_connection(self, hostname):
-        # Quick connection test with status bar feedback
-        def _test():
+    def test_selected_connections(self):
+        if not self.selected_hosts:
+            messagebox.showwarning("Warning", "Select hosts to test")
+            return
+        self.quick_test_connection(self.config_parser.sort_hosts(self.selected_hosts))
+
+    def quick_test_connection(self, hostnames):
+        # Test hosts through the executor's bounded pool in one background
+        # thread; results stream into the results pane, progress and the
+        # summary go to the status bar
+        if self.connection_test_thread and self.connection_test_thread.is_alive():
+            self.status_label.config(
+                text="Connection test already running", foreground="orange"
+            )
+            return
+
+        def set_status(text, color):
             self.root.after(
-                0,
-                lambda: self.status_label.config(
-                    text=f"Testing {hostname}...", foreground="orange"
-                ),
+                0, lambda: self.status_label.config(text=text, foreground=color)
             )
 
+        def _test():
+            total = len(hostnames)
+            summary = ConnectionTestSummary()
+            set_status(f"Testing {total} hosts...", "orange")
+            self.append_result(f"\nTesting connection to {total} hosts\n")
             try:
-                result = self.ssh_executor.test_connection(hostname)
-
-                if result["success"]:
-                    self.root.after(
-                        0,
-                        lambda: self.status_label.config(
-                            text=f"{hostname} reachable", foreground="green"
-                        ),
-                    )
-                else:
-                    self.root.after(
-                        0,
-                        lambda: self.status_label.config(
-                            text=f"{hostname} unreachable", foreground="red"
-                        ),
+                results = self.ssh_executor.iter_connection_tests(
+                    hostnames, max_workers=self.parallel_var.get()
+                )
+                for completed, result in enumerate(results, 1):
+                    status = summary.add(result)
+                    symbol = "success" if status == REACHABLE else "error"
+                    self.append_result(
+                        f"[{completed}/{total}] {Config.get_gui_symbol(symbol)} "
+                        f"{format_connection_result(result)}\n"
                     )
+                    set_status(f"Testing {completed}/{total} hosts...", "orange")
+                self.append_result(summary.format() + "\n")
+                reachable = len(summary.hosts[REACHABLE])
+                set_status(
+                    f"{reachable}/{total} hosts reachable",
+                    "green" if reachable == total else "red",
+                )
+            except Exception as exc:
+                self.append_result(f"Connection test error: {exc}\n")
+                set_status("Error testing connections", "red")
 
-                # return status to default after 3 seconds
-                self.root.after(3000, lambda: self.update_selection_info())
+            # return status to default after 3 seconds
+            self.root.after(3000, lambda: self.update_selection_info())
+            self.root.after(0, _finished)
 
-            except Exception:
-                self.root.after(
-                    0,
-                    lambda: self.status_label.config(
-                        text=f"Error testing {hostname}", foreground="red"
-                    ),
-                )
-                self.root.after(3000, lambda: self.update_selection_info())
+        def _finished():
+            # The thread is on its way out; wait so it no longer counts as running
+            thread.join()
+            self.replace_outdated_executor()
 
-        thread = threading.Thread(target=_test)
-        thread.daemon = True
+        thread = threading.Thread(target=_test, daemon=True)
+        self.connection_test_thread = thread
         thread.start()
 
     def select_all_hosts(self):
@@ -817,13 +952,44 @@ class CommandExecutorApp:
 
         self.update_selection_info()
 
+    def create_executor(self):
+        return self.executor_class(
+            self.ssh_config_path,
+            multiplex=self.multiplex,
+            log_format=self.log_format,
+            connect_rate=getattr(self.args, "connect_rate", Config.SSH_CONNECT_RATE),
+            connect_burst=getattr(self.args, "connect_burst", Config.SSH_CONNECT_BURST),
+            rate_per_jump=getattr(
+                self.args, "rate_per_jump", Config.SSH_CONNECT_RATE_PER_JUMP
+            ),
+            retries=getattr(self.args, "retries", Config.SSH_RETRIES),
+            retry_backoff=getattr(self.args, "retry_backoff", Config.SSH_RETRY_BACKOFF),
+            preflight=getattr(self.args, "preflight", Config.SSH_PREFLIGHT),
+            preflight_timeout=getattr(
+                self.args, "preflight_timeout", Config.SSH_PREFLIGHT_TIMEOUT
+            ),
+        )
+
     def refresh_hosts(self):
         self.selected_hosts.clear()
-        self.config_parser = SSHConfigParser(self.ssh_config_path)
-        self.ssh_executor = SSHExecutor(self.ssh_config_path)
+        # Reparse only when the config file changed on disk
+        if self.config_parser.refresh():
+            # Master connections were set up with the old config
+            self.executor_outdated = True
+            self.replace_outdated_executor()
         self.load_hosts()
         self.update_selection_info()
 
+    def replace_outdated_executor(self):
+        # A running batch or connection test still uses the old executor's
+        # master connections; it is replaced once that work is done
+        testing = self.connection_test_thread and self.connection_test_thread.is_alive()
+        if not self.executor_outdated or self.is_executing or testing:
+            return
+        self.ssh_executor.close()
+        self.ssh_executor = self.create_executor()
+        self.executor_outdated = False
+
     def clear_prefix(self):
         self.prefix_var.set("")
         self.load_hosts()
@@ -857,6 +1023,14 @@ class CommandExecutorApp:
         else:
             self.execute_button.config(state=tk.DISABLED)
 
+    @staticmethod
+    def _format_findings(findings, limit=10):
+        # Security findings as dialog lines; long lists are cut at limit
+        lines = [format_finding(finding) for finding in findings[:limit]]
+        if len(findings) > limit:
+            lines.append(f"... and {len(findings) - limit} more")
+        return "\n".join(lines)
+
     def execute_command(self):
         # Execute command on selected hosts
         base_command = self.command_text.get("1.0", tk.END).strip()
@@ -871,6 +1045,21 @@ class CommandExecutorApp:
         # Sudo
         sudo_enabled = self.sudo_var.get()
         verbose_enabled = self.verbose_var.get()
+        live_output = self.live_output_var.get()
+        group_output = self.group_output_var.get()
+
+        try:
+            rollout = self._make_rollout()
+        except (ValueError, tk.TclError) as exc:
+            messagebox.showwarning(
+                "Warning", f"Invalid rolling execution setting: {exc}"
+            )
+            return
+        if rollout is not None and rollout.batch_size and self.delay_var.get() > 0:
+            messagebox.showwarning(
+                "Warning", "Delay cannot be combined with a batch size; set one of them"
+            )
+            return
 
         command = base_command
         if sudo_enabled:
@@ -883,15 +1072,18 @@ class CommandExecutorApp:
             messagebox.showerror(
                 "Dangerous command!",
                 f"Command blocked as potentially dangerous:\n\n{command}\n\n"
-                f"Reason: {dangerous_result['reason']}\n\n"
+                f"Reason: {dangerous_result['reason']}\n"
+                f"{self._format_findings(dangerous_result['findings'])}\n\n"
                 "Executing dangerous commands is disabled for safety.",
             )
             return
 
         if Config.requires_confirmation(command):
+            findings = self._format_findings(Config.analyze_command(command))
             confirm = messagebox.askyesno(
                 "Confirmation required",
                 f"Command requires confirmation:\n\n{command}\n\n"
+                f"{findings}\n\n"
                 f"Hosts: {', '.join(self.selected_hosts)}\n\n"
                 "Execute this command?",
                 icon="warning",
@@ -911,14 +1103,25 @@ class CommandExecutorApp:
             target=self._execute_command_thread,
             args=(
                 command,
-                sorted(self.selected_hosts, key=natural_sort_key),
+                self.config_parser.sort_hosts(self.selected_hosts),
                 sudo_enabled,
                 verbose_enabled,
+                live_output,
+                group_output,
+                rollout,
             ),
         )
         thread.daemon = True
         thread.start()
 
+    def _make_rollout(self):
+        # Rollout from the Batch / Pause / Max fail fields; None when unused
+        batch_size = self.batch_size_var.get().strip() or None
+        max_failures = self.max_failures_var.get().strip() or None
+        if batch_size is None and max_failures is None:
+            return None
+        return Rollout(batch_size, self.batch_pause_var.get(), max_failures)
+
     def stop_execution_command(self):
         """Stop command execution on remaining hosts"""
         if self.is_executing:
@@ -927,18 +1130,41 @@ class CommandExecutorApp:
             self.status_label.config(text="Stopping execution...", foreground="red")
             self.stop_button.config(state=tk.DISABLED)
 
+    def _append_stream_line(self, event):
+        # on_line callback: host-tagged line straight into the results pane
+        tag = f"[{event['hostname']}]"
+        if event["stream"] == "stderr":
+            tag += "[stderr]"
+        self.append_result(f"{tag} {event['line']}\n")
+
+    def _append_batch_header(self, number, count, hosts):
+        # on_batch callback of a rolling run
+        if count > 1:
+            self.append_result(
+                f"\n--- Batch {number}/{count} ({len(hosts)} hosts) ---\n"
+            )
+
     def _execute_command_thread(
-        self, command, hosts, sudo_enabled: bool, verbose_enabled: bool
+        self,
+        command,
+        hosts,
+        sudo_enabled: bool,
+        verbose_enabled: bool,
+        live_output: bool = False,
+        group_output: bool = False,
+        rollout=None,
     ):
         # Statistics tracking
         success_count = 0
         error_count = 0
         error_hosts = []
+        grouper = ResultGrouper() if group_output else None
 
         try:
             sudo_info = " (sudo)" if sudo_enabled else ""
             verbose_info = " (detailed output)" if verbose_enabled else ""
             delay = self.delay_var.get()
+            parallel = self.ssh_executor.resolve_max_workers(self.parallel_var.get())
 
             self.append_result(
                 f"\nExecuting command: {command}{sudo_info}{verbose_info}\n"
@@ -946,85 +1172,117 @@ class CommandExecutorApp:
             self.append_result(f"On hosts: {', '.join(hosts)}\n")
             if delay > 0:
                 self.append_result(f"Delay between hosts: {delay} sec\n")
+            elif parallel > 1 and len(hosts) > 1:
+                self.append_result(f"Parallel hosts: {min(parallel, len(hosts))}\n")
+            if rollout is not None:
+                self.append_result(
+                    f"Rolling execution: {rollout.describe(len(hosts))}\n"
+                )
             self.append_result("=" * 60 + "\n")
 
-            # Execute command on each host
+            # Execute command on hosts; results arrive as each host completes
             executed_count = 0
-            for idx, host in enumerate(hosts):
-                # Check if stop was requested
-                if self.stop_execution.is_set():
-                    self.append_result("\nStop requested by user...\n")
-                    self.append_result(
-                        f"Executed on {executed_count}/{len(hosts)} hosts\n"
-                    )
-                    break
-
-                if verbose_enabled:
-                    self.append_result(f"\nHost: {host}\n")
-                else:
-                    self.append_result(f"\n{host}: ")
-
-                try:
-                    result = self.ssh_executor.execute_command(host, command)
+            if rollout is not None:
+                results = rollout.run(
+                    self.ssh_executor,
+                    hosts,
+                    command,
+                    max_workers=parallel,
+                    delay=delay,
+                    stop_event=self.stop_execution,
+                    on_line=self._append_stream_line if live_output else None,
+                    on_batch=self._append_batch_header,
+                )
+            else:
+                results = self.ssh_executor.iter_command_batch(
+                    hosts,
+                    command,
+                    max_workers=parallel,
+                    delay=delay,
+                    stop_event=self.stop_execution,
+                    on_line=self._append_stream_line if live_output else None,
+                )
+            for result in results:
+                host = result["hostname"]
+                if grouper is not None:
+                    # Each distinct result is shown once in the summary
+                    grouper.add(result)
                     if result["success"]:
                         success_count += 1
-                        if verbose_enabled:
-                            self.append_result(f"Success:\n{result['output']}\n")
-                            if result["error"]:
-                                self.append_result(f"Warnings:\n{result['error']}\n")
-                        else:
-                            # Short summary
-                            output = (
-                                result["output"][:100] + "..."
-                                if len(result["output"]) > 100
-                                else result["output"]
-                            )
-                            self.append_result(f"{output.replace(chr(10), ' ')}\n")
                     else:
                         error_count += 1
                         error_hosts.append(host)
-                        if verbose_enabled:
-                            self.append_result(f"Error:\n{result['error']}\n")
-                        else:
-                            error = (
-                                result["error"][:100] + "..."
-                                if len(result["error"]) > 100
-                                else result["error"]
-                            )
-                            self.append_result(f"{error.replace(chr(10), ' ')}\n")
-
-                except Exception as exc:
-                    error_count += 1
-                    error_hosts.append(host)
-                    if verbose_enabled:
-                        self.append_result(f"Exception: {exc}\n")
+                elif live_output:
+                    # Output was already shown line by line; report status only
+                    if result["success"]:
+                        success_count += 1
+                        self.append_result(
+                            f"{host}: Success (RC 0){describe_failure(result)}\n"
+                        )
                     else:
-                        self.append_result(f"Error: {str(exc)[:50]}...\n")
-
-                if verbose_enabled:
+                        error_count += 1
+                        error_hosts.append(host)
+                        self.append_result(
+                            f"{host}: Error (RC {result['return_code']})"
+                            f"{describe_failure(result)}\n"
+                        )
+                        # Local failures (timeout, missing ssh) were not streamed
+                        if result["return_code"] == -1 and result["error"]:
+                            self.append_result(f"{result['error']}\n")
+                elif verbose_enabled:
+                    self.append_result(f"\nHost: {host}{describe_failure(result)}\n")
+                    if result["success"]:
+                        success_count += 1
+                        self.append_result(f"Success:\n{result['output']}\n")
+                        if result["error"]:
+                            self.append_result(f"Warnings:\n{result['error']}\n")
+                    else:
+                        error_count += 1
+                        error_hosts.append(host)
+                        self.append_result(f"Error:\n{result['error']}\n")
                     self.append_result("-" * 40 + "\n")
+                else:
+                    # Short summary
+                    if result["success"]:
+                        success_count += 1
+                        text = result["output"]
+                    else:
+                        error_count += 1
+                        error_hosts.append(host)
+                        text = result["error"]
+                    text = text[:100] + "..." if len(text) > 100 else text
+                    self.append_result(f"\n{host}: {text.replace(chr(10), ' ')}\n")
 
                 executed_count += 1
 
-                # Add delay between hosts (but not after the last host)
-                if (
-                    delay > 0
-                    and idx < len(hosts) - 1
-                    and not self.stop_execution.is_set()
-                ):
-                    time.sleep(delay)
+            aborted = rollout is not None and rollout.aborted
+            if self.stop_execution.is_set() or aborted:
+                self.append_result(f"Executed on {executed_count}/{len(hosts)} hosts\n")
 
             # Summary report
             self.append_result("\n" + "=" * 60 + "\n")
             if self.stop_execution.is_set():
                 self.append_result("EXECUTION SUMMARY (Stopped by user)\n")
+            elif aborted:
+                self.append_result("EXECUTION SUMMARY (Aborted)\n")
             else:
                 self.append_result("EXECUTION SUMMARY\n")
             self.append_result("=" * 60 + "\n")
             self.append_result(f"Successful: {success_count}/{executed_count}\n")
             self.append_result(f"Failed: {error_count}/{executed_count}\n")
+            if aborted:
+                self.append_result(
+                    f"\nAborted: more than "
+                    f"{rollout.failure_limit(len(hosts)):g} hosts failed\n"
+                )
+                if rollout.skipped:
+                    self.append_result(
+                        f"Not started: {fold_host_range(rollout.skipped)}\n"
+                    )
 
-            if error_hosts:
+            if grouper is not None:
+                self.append_result(self._format_result_groups(grouper))
+            elif error_hosts:
                 self.append_result("\nHosts with errors:\n")
                 for host in error_hosts:
                     self.append_result(f"  - {host}\n")
@@ -1039,7 +1297,23 @@ class CommandExecutorApp:
             self.is_executing = False
             self.root.after(0, self._reset_execute_button)
 
+    @staticmethod
+    def _format_result_groups(grouper):
+        # Distinct results with the hosts that produced them, as one block
+        lines = [f"\nDistinct results: {len(grouper)}"]
+        for group in grouper.groups():
+            lines.append("-" * 40)
+            status = "Success" if group["success"] else "Error"
+            lines.append(f"{status}: {format_group_header(group)}")
+            if group["output"]:
+                lines.append(group["output"].rstrip("\n"))
+            if group["error"]:
+                lines.append("Warnings:" if group["success"] else "Error:")
+                lines.append(group["error"].rstrip("\n"))
+        return "\n".join(lines) + "\n"
+
     def _reset_execute_button(self):
+        self.replace_outdated_executor()
         self.execute_button.config(state=tk.NORMAL, text="Execute Command (Ctrl+Enter)")
         self.stop_button.config(state=tk.DISABLED)
         self.status_label.config(
@@ -1113,6 +1387,11 @@ class CommandExecutorApp:
         def _append():
             self.results_text.config(state=tk.NORMAL)
             self.results_text.insert(tk.END, text)
+            # Drop the oldest lines so the widget does not grow without bound
+            line_count = int(self.results_text.index("end-1c").split(".")[0])
+            excess = line_count - Config.GUI_RESULTS_MAX_LINES
+            if excess > 0:
+                self.results_text.delete("1.0", f"{excess + 1}.0")
             self.results_text.see(tk.END)
             self.results_text.config(state=tk.DISABLED)
 
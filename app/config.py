@@ -2,6 +2,8 @@
 
 import os
 
+import command_analyzer
+
 
 class Config:
     # Main settings
@@ -17,6 +19,50 @@ class Config:
     SSH_COMMAND_TIMEOUT = 30
     SSH_BATCH_MODE = True
     SSH_STRICT_HOST_KEY_CHECKING = False
+    SSH_CONFIG_CACHE_DIR = os.path.expanduser("~/.ssh/command_executor_cache")
+    SSH_CONFIG_DISK_CACHE = True  # Persist parsed config between runs
+    SSH_CONFIG_MAX_INCLUDE_DEPTH = 16  # Nested Include limit (as in OpenSSH)
+    SSH_PARALLEL_WORKERS = 10  # Hosts processed concurrently (see VALIDATION)
+    SSH_EXECUTION_BACKEND = "thread"  # "thread" (pool) or "async" (asyncio)
+    SSH_CONNECT_RATE = None  # New ssh connections per second; None = unlimited
+    SSH_CONNECT_BURST = 10  # Connections that may start at once before throttling
+    SSH_CONNECT_RATE_PER_JUMP = False  # Separate budget per ProxyJump bastion
+
+    # Retries of transport failures (see retry_policy.FAILURE_CLASSES)
+    SSH_RETRIES = 0  # Extra attempts per host
+    SSH_RETRY_BACKOFF = 1.0  # Base seconds; doubles per retry, with jitter
+    SSH_RETRY_MAX_BACKOFF = 30.0  # Upper bound of a single wait
+    SSH_RETRY_ON = ("connect_timeout", "transport")  # Never "command" or "auth"
+
+    # Pre-flight TCP probe of every host's HostName:Port before ssh is spawned
+    SSH_PREFLIGHT = False
+    SSH_PREFLIGHT_TIMEOUT = 3  # Seconds; never more than the connect timeout
+    SSH_PREFLIGHT_CONCURRENCY = 256  # Probes (sockets) open at once
+
+    # Host facts cache (see facts_cache): one JSON file per alias + target
+    FACTS_CACHE_DIR = os.path.join(SSH_CONFIG_CACHE_DIR, "facts")
+    FACTS_CACHE_DEFAULT_TTL = 3600  # Seconds, for facts not listed below
+    FACTS_CACHE_TTL = {
+        "uptime": 300,
+        "disk": 900,
+        "hostname": 86400,
+        "whoami": 86400,
+        "os": 86400,
+        "kernel": 86400,
+        "distro": 7 * 86400,
+        "cpus": 7 * 86400,
+        "memory": 7 * 86400,
+    }
+
+    # Rolling execution (--batch-size, --batch-pause, --max-failures)
+    ROLLOUT_BATCH_SIZE = None  # Hosts per batch, "N" or "N%"; None = one batch
+    ROLLOUT_BATCH_PAUSE = 0  # Seconds to wait between batches
+    ROLLOUT_MAX_FAILURES = None  # Abort once failures exceed "N" or "N%"
+
+    # Connection multiplexing (OpenSSH ControlMaster)
+    SSH_MULTIPLEX = False
+    SSH_CONTROL_PERSIST = 300  # Seconds an idle master connection stays up
+    SSH_CONTROL_DIR_PREFIX = "cmdexec-cm-"  # Private socket dir under $TMPDIR
 
     # Logging settings
     LOG_DIR = os.path.expanduser("~/.ssh/command_executor_logs")
@@ -24,6 +70,27 @@ class Config:
     LOG_DATE_FORMAT = "%Y-%m-%d"
     LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
     LOG_ENABLED = True
+    LOG_FLUSH_INTERVAL = 0.5  # Seconds audit entries are batched before writing
+    LOG_FORMAT = "text"  # "text", "jsonl" (one JSON object per line) or "both"
+    LOG_FORMATS = ("text", "jsonl", "both")
+    LOG_INDEX_FILE = "audit_index.sqlite3"  # --query-logs index, inside LOG_DIR
+    # JSONL: split connect/exec time. Off by default: it runs ssh with
+    # -o PermitLocalCommand=yes -o LocalCommand="touch <marker>", i.e. a local
+    # command on every connection, replacing any LocalCommand set for the host
+    # (hosts whose config sets LocalCommand or PermitLocalCommand are skipped)
+    AUDIT_CONNECT_TIMING = False
+
+    # Command output settings
+    SSH_OUTPUT_MEMORY_LIMIT = 256 * 1024  # Bytes per host/stream kept in memory
+    # Overflow files; None = <tempdir>/command_executor_output-<uid>. Must be a
+    # 0700 directory owned by the user, else a private mkdtemp dir is used.
+    OUTPUT_SPILL_DIR = None
+    OUTPUT_SPILL_RETENTION_HOURS = 24  # Older spill files are removed
+    OUTPUT_PREVIEW_LINES = 10  # Head/tail lines shown for spilled output
+    OUTPUT_PREVIEW_BYTES = 4096  # Bytes read from each end for previews
+    OUTPUT_FORMAT = "text"  # Per-host results: "text", "jsonl" or "csv" records
+    OUTPUT_FORMATS = ("text", "jsonl", "csv")
+    GROUP_OUTPUT = False  # Show each distinct result once with its host list
 
     # Security settings
     SECURITY = {
@@ -54,6 +121,13 @@ class Config:
             "chmod 777",
             "chmod +x",
         ],
+        # Redirection targets that never trigger the "> /dev/" pattern
+        "safe_redirect_targets": [
+            "/dev/null",
+            "/dev/stdout",
+            "/dev/stderr",
+            "/dev/tty",
+        ],
     }
 
     # GUI settings
@@ -61,6 +135,7 @@ class Config:
     GUI_WINDOW_GEOMETRY = "1000x700"
     GUI_WINDOW_MIN_WIDTH = 800
     GUI_WINDOW_MIN_HEIGHT = 600
+    GUI_RESULTS_MAX_LINES = 20000  # Older lines are dropped from the results pane
 
     # Host tree column sizes
     GUI_TREE_HOST_COLUMN_WIDTH = 250
@@ -172,6 +247,7 @@ class Config:
         "max_command_length": 1000,
         "max_hostname_length": 253,  # RFC standard
         "max_concurrent_connections": 50,
+        "max_async_connections": 500,  # asyncio backend has no thread per host
     }
 
     # Host grouping
@@ -247,14 +323,14 @@ class Config:
         return cls.GUI_COLORS.get(name, "black")
 
     @classmethod
-    def get_log_file_path(cls, date_str=None):
-        # Path to log file for specified date
+    def get_log_file_path(cls, date_str=None, extension="log"):
+        # Path to log file for specified date ("jsonl" for the JSON Lines log)
         import datetime
 
         if date_str is None:
             date_str = datetime.datetime.now().strftime(cls.LOG_DATE_FORMAT)
 
-        filename = f"{cls.LOG_FILE_PREFIX}_{date_str}.log"
+        filename = f"{cls.LOG_FILE_PREFIX}_{date_str}.{extension}"
         return os.path.join(cls.LOG_DIR, filename)
 
     @classmethod
@@ -262,33 +338,32 @@ class Config:
         # Create log directory if it doesn't exist
         os.makedirs(cls.LOG_DIR, exist_ok=True)
 
+    @classmethod
+    def analyze_command(cls, command):
+        # Structured findings (segment, rule, pattern) for command
+        return command_analyzer.analyze_command(command, cls.SECURITY)
+
     @classmethod
     def check_dangerous_command(cls, command):
         # Check if command is potentially dangerous
-        command_lower = command.lower().strip()
-
-        for dangerous_pattern in cls.SECURITY["dangerous_commands"]:
-            if dangerous_pattern.lower() in command_lower:
-                return {
-                    "is_dangerous": True,
-                    "reason": f"Command contains potentially dangerous pattern: '{dangerous_pattern}'",
-                }
+        findings = [
+            finding
+            for finding in cls.analyze_command(command)
+            if finding["rule"] == "dangerous_commands"
+        ]
+        if findings:
+            return {
+                "is_dangerous": True,
+                "reason": f"Command contains potentially dangerous pattern: '{findings[0]['pattern']}'",
+                "findings": findings,
+            }
 
-        return {"is_dangerous": False, "reason": ""}
+        return {"is_dangerous": False, "reason": "", "findings": []}
 
     @classmethod
     def requires_confirmation(cls, command):
         # Check if command requires confirmation
-        command_lower = command.lower().strip()
-
-        for confirm_pattern in cls.SECURITY["require_confirmation"]:
-            pattern_lower = confirm_pattern.lower()
-            # Check both command start and content
-            if (
-                command_lower.startswith(pattern_lower)
-                or f" {pattern_lower}" in command_lower
-                or pattern_lower in command_lower
-            ):
-                return True
-
-        return False
+        return any(
+            finding["rule"] == "require_confirmation"
+            for finding in cls.analyze_command(command)
+        )
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Bulk connection testing: test_connection over any number of hosts through
+# the executor's bounded batch loop (see SSHExecutor.iter_connection_tests),
+# with a latency per host and a reachable / unreachable / auth failed summary.
+
+from typing import Any, Dict, List, Optional
+
+from retry_policy import AUTH, COMMAND, classify_failure
+from ssh_config_parser import fold_host_range
+
+REACHABLE = "reachable"
+UNREACHABLE = "unreachable"
+AUTH_FAILED = "auth failed"
+CONNECTION_STATUSES = (REACHABLE, UNREACHABLE, AUTH_FAILED)
+
+
+def connection_status(result: Dict[str, Any]) -> str:
+    # A failing remote shell (exit code != 255) still means ssh got in
+    failure_class = result.get("failure_class") or classify_failure(result)
+    if failure_class is None or failure_class == COMMAND:
+        return REACHABLE
+    if failure_class == AUTH:
+        return AUTH_FAILED
+    return UNREACHABLE
+
+
+def connection_latency(result: Dict[str, Any]) -> Optional[float]:
+    # Seconds until ssh was connected when measured, else the whole round trip
+    if result.get("connect_time") is not None:
+        return result["connect_time"]
+    return result.get("duration")
+
+
+def format_connection_result(result: Dict[str, Any]) -> str:
+    # "web-1: reachable (42 ms)"; failures add the first line of the error
+    latency = connection_latency(result)
+    line = f"{result['hostname']}: {connection_status(result)}"
+    if latency is not None:
+        line += f" ({latency * 1000:.0f} ms)"
+    if not result["success"] and result.get("error"):
+        line += f" - {result['error'].strip().splitlines()[0]}"
+    return line
+
+
+class ConnectionTestSummary:
+    # Tally of connection test results by status
+
+    def __init__(self):
+        self.hosts: Dict[str, List[str]] = {
+            status: [] for status in CONNECTION_STATUSES
+        }
+
+    def add(self, result: Dict[str, Any]) -> str:
+        # Count a result and return its status
+        status = connection_status(result)
+        self.hosts[status].append(result["hostname"])
+        return status
+
+    def __len__(self) -> int:
+        return sum(len(hosts) for hosts in self.hosts.values())
+
+    def format(self) -> str:
+        # "Reachable: 297/300, unreachable: 2/300, auth failed: 1/300" plus
+        # the folded host list of every failing status
+        total = len(self)
+        lines = [
+            ", ".join(
+                f"{status}: {len(self.hosts[status])}/{total}"
+                for status in CONNECTION_STATUSES
+            ).capitalize()
+        ]
+        for status in (UNREACHABLE, AUTH_FAILED):
+            if self.hosts[status]:
+                lines.append(
+                    f"{status.capitalize()}: {fold_host_range(self.hosts[status])}"
+                )
+        return "\n".join(lines)
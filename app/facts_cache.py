@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# On-disk cache of host facts (see host_facts): one small JSON file per host
+# under FACTS_CACHE_DIR, with a timestamp per fact so every fact has its own
+# TTL (uptime goes stale in minutes, the CPU count in days). Lookups read one
+# file; stale facts are refreshed by FactsRefresher in the background.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from host_facts import HOST_FACTS
+from ssh_config_parser import SSHConfigParser
+
+FACTS_CACHE_VERSION = 2
+
+FactValues = Dict[str, str]
+
+
+def fact_ttl(fact: str) -> float:
+    # Seconds a cached value of fact stays fresh
+    return Config.FACTS_CACHE_TTL.get(fact, Config.FACTS_CACHE_DEFAULT_TTL)
+
+
+class HostFactsCache:
+    # Cached facts per host, keyed by the alias together with the HostName,
+    # Port and User it resolves to in the ssh config: pointing an alias at
+    # another machine (or account) starts from an empty entry instead of
+    # showing the old machine's facts.
+    #
+    # Files are replaced atomically, so several app instances can share the
+    # cache. Failed facts ("Error: ...") are never stored: the last good
+    # value is kept and the fact stays stale until a refresh succeeds.
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        ssh_config_path: Optional[str] = None,
+    ):
+        self.cache_dir = cache_dir or Config.FACTS_CACHE_DIR
+        self._clock = clock
+        self._parser = SSHConfigParser(ssh_config_path)
+        self._parser_lock = threading.Lock()
+        # Serializes read-modify-write of a host's file within this process
+        self._lock = threading.Lock()
+
+    def _target(self, alias: str) -> str:
+        # Cache key: alias, HostName, Port and User (reparsed if the config
+        # changed); just the alias when there is no config
+        if not self._parser.config_path.exists():
+            return alias
+        with self._parser_lock:
+            self._parser.refresh()
+            info = self._parser.get_host_info(alias) or {}
+        return " ".join(
+            [
+                alias,
+                info.get("hostname", alias),
+                info.get("port", "22"),
+                info.get("user", ""),
+            ]
+        )
+
+    def _path(self, target: str) -> str:
+        digest = hashlib.sha1(target.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, target: str) -> Dict[str, Dict[str, object]]:
+        # {fact: {"value": ..., "at": ...}}; empty when missing or unreadable
+        try:
+            with open(self._path(target), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != FACTS_CACHE_VERSION or data.get("target") != target:
+            return {}
+        return data.get("facts", {})
+
+    def lookup(
+        self, alias: str, facts: Optional[Iterable[str]] = None
+    ) -> Tuple[FactValues, List[str]]:
+        # (cached values, facts that are missing or past their TTL)
+        facts = list(facts if facts is not None else HOST_FACTS)
+        cached = self._load(self._target(alias))
+        now = self._clock()
+        values = {}
+        stale = []
+        for fact in facts:
+            entry = cached.get(fact)
+            if entry is None:
+                stale.append(fact)
+                continue
+            values[fact] = entry["value"]
+            if now - entry["at"] > fact_ttl(fact):
+                stale.append(fact)
+        return values, stale
+
+    def store(self, alias: str, values: FactValues) -> None:
+        # Merge freshly gathered values into the host's entry
+        now = self._clock()
+        good = {
+            fact: {"value": value, "at": now}
+            for fact, value in values.items()
+            if not value.startswith("Error: ")
+        }
+        if not good:
+            return
+        target = self._target(alias)
+        cache_file = self._path(target)
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            facts = self._load(target)
+            facts.update(good)
+            try:
+                os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "version": FACTS_CACHE_VERSION,
+                            "target": target,
+                            "facts": facts,
+                        },
+                        f,
+                        separators=(",", ":"),
+                    )
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                try:
+                    os.unlink(tmp_file)
+                except OSError:
+                    pass
+
+
+class FactsRefresher:
+    # Gathers facts into a HostFactsCache, in one parallel pass per call.
+    # refresh() runs in a background thread and skips hosts whose refresh
+    # is already under way, so repeated lookups do not pile up ssh sessions.
+
+    def __init__(self, cache: HostFactsCache):
+        self.cache = cache
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def fetch(
+        self,
+        executor,
+        aliases: List[str],
+        facts: Optional[Iterable[str]] = None,
+        on_update: Optional[Callable[[str, FactValues], None]] = None,
+    ) -> Dict[str, FactValues]:
+        # Gather, store and return facts now; on_update(alias, values) is
+        # called as each host completes. Values are the host's whole cached
+        # set: a fact that failed keeps its last good value if it has one.
+        results = {}
+        for alias, values in executor.iter_host_facts(aliases, facts):
+            self.cache.store(alias, values)
+            cached, _ = self.cache.lookup(alias)
+            merged = {
+                fact: cached.get(fact, values.get(fact))
+                for fact in dict.fromkeys([*HOST_FACTS, *values])
+                if fact in cached or fact in values
+            }
+            results[alias] = merged
+            if on_update is not None:
+                on_update(alias, merged)
+        return results
+
+    def refresh(
+        self,
+        executor,
+        aliases: List[str],
+        facts: Optional[Iterable[str]] = None,
+        on_update: Optional[Callable[[str, FactValues], None]] = None,
+    ) -> Optional[threading.Thread]:
+        # Start a background fetch; None when every host is already pending
+        with self._lock:
+            aliases = [alias for alias in aliases if alias not in self._pending]
+            self._pending.update(aliases)
+        if not aliases:
+            return None
+        facts = list(facts) if facts is not None else None
+
+        def _run():
+            try:
+                self.fetch(executor, aliases, facts, on_update)
+            except Exception:
+                pass  # Stale values stay in place; the next lookup retries
+            finally:
+                with self._lock:
+                    self._pending.difference_update(aliases)
+
+        thread = threading.Thread(target=_run, name="facts-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def is_pending(self, alias: str) -> bool:
+        with self._lock:
+            return alias in self._pending
@@ -85,6 +85,34 @@ def list_hosts(config_path, prefix=""):
         print(f"{Config.get_symbol('error')} Error getting host list: {e}")
 
 
+def query_logs(args):
+    # Search the audit logs; returns True if anything matched
+    from audit_query import AuditLogIndex, iter_query_lines
+
+    status = {"success": True, "failed": False}.get(args.query_status)
+    try:
+        index = AuditLogIndex()
+        try:
+            entries = index.query(
+                host=args.query_host,
+                since=args.since,
+                until=args.until,
+                command=args.query_command,
+                success=status,
+                limit=args.query_limit,
+            )
+        finally:
+            index.close()
+    except Exception as e:
+        print(f"{Config.get_symbol('error')} Audit log search failed: {e}")
+        return False
+
+    for line in iter_query_lines(entries):
+        print(line)
+    print(f"\n{Config.get_symbol('search')} {len(entries)} matching entries")
+    return bool(entries)
+
+
 def start_gui(args):
     # Start GUI interface
     try:
@@ -142,6 +170,14 @@ def main():
         list_hosts(args.config, args.prefix)
         sys.exit(0)
 
+    if args.query_logs:
+        sys.exit(0 if query_logs(args) else 1)
+
+    if args.run is not None:
+        from command_executor_cli_app import run_batch
+
+        sys.exit(run_batch(args))
+
     # Interface selection
     if args.gui:
         start_gui(args)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# Per-host output capture with a memory cap; overflow is kept in spill files.
+
+import getpass
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+_cleanup_lock = threading.Lock()
+_cleanup_done = False
+# Private directory used when the spill path is unusable (see get_spill_dir)
+_fallback_dir: Optional[str] = None
+_fallback_lock = threading.Lock()
+
+
+def _default_spill_dir() -> str:
+    # Per-user name: users sharing a host never share (or fight over) it
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"command_executor_output-{user}")
+
+
+def _is_private_dir(path: str) -> bool:
+    # A real directory (not a symlink) owned by the current user, mode 0700.
+    # An own directory with a wider mode is tightened on the way.
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if not hasattr(os, "getuid"):
+        return True  # Windows: the temp dir is per-user already
+    if st.st_uid != os.getuid():
+        return False
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        try:
+            os.chmod(path, 0o700)
+        except OSError:
+            return False
+    return True
+
+
+def get_spill_dir() -> str:
+    # Directory holding spilled output (private to the current user).
+    # If the configured/default path is not ours (created by another user,
+    # a symlink, ...), a fresh mkdtemp directory is used for this process.
+    global _fallback_dir
+    path = Config.OUTPUT_SPILL_DIR or _default_spill_dir()
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    except OSError:
+        pass
+    if _is_private_dir(path):
+        return path
+    with _fallback_lock:
+        if _fallback_dir is None or not _is_private_dir(_fallback_dir):
+            _fallback_dir = tempfile.mkdtemp(prefix="command_executor_output-")
+        return _fallback_dir
+
+
+def cleanup_spill_dir(max_age_seconds: Optional[float] = None) -> int:
+    # Remove spill files older than OUTPUT_SPILL_RETENTION_HOURS
+    if max_age_seconds is None:
+        max_age_seconds = Config.OUTPUT_SPILL_RETENTION_HOURS * 3600
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        with os.scandir(get_spill_dir()) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return removed
+
+
+def _cleanup_once() -> None:
+    global _cleanup_done
+    with _cleanup_lock:
+        if _cleanup_done:
+            return
+        _cleanup_done = True
+    cleanup_spill_dir()
+
+
+def open_capture_file(hostname: str, stream_name: str) -> Tuple[IO[bytes], str]:
+    # Open a file that a child process can write its stdout/stderr into
+    _cleanup_once()
+    safe_host = re.sub(r"[^A-Za-z0-9._-]", "_", hostname)[:64]
+    fd, path = tempfile.mkstemp(
+        prefix=f"{safe_host}_{stream_name}_", suffix=".log", dir=get_spill_dir()
+    )
+    return os.fdopen(fd, "w+b"), path
+
+
+def discard_capture_file(fileobj: IO[bytes], path: str) -> None:
+    try:
+        fileobj.close()
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def make_preview(
+    head_lines: List[str], tail_lines: List[str], total_bytes: int, path: str
+) -> str:
+    # Head and tail lines around a marker pointing at the full output
+    lines = Config.OUTPUT_PREVIEW_LINES
+    marker = f"... [{total_bytes} bytes total, full output: {path}] ..."
+    return "\n".join(head_lines[:lines] + [marker] + tail_lines[-lines:])
+
+
+def collect_capture_file(
+    fileobj: IO[bytes], path: str, limit: Optional[int] = None
+) -> Dict[str, Any]:
+    # Load captured output once the process has finished.
+    # Returns {"text", "path", "bytes"}: output within the limit is read into
+    # memory and the file removed; larger output stays on disk ("path") and
+    # "text" holds only a head/tail preview.
+    if limit is None:
+        limit = Config.SSH_OUTPUT_MEMORY_LIMIT
+    size = fileobj.seek(0, os.SEEK_END)
+
+    if size <= limit:
+        fileobj.seek(0)
+        text = fileobj.read().decode("utf-8", errors="replace")
+        discard_capture_file(fileobj, path)
+        return {"text": text.strip(), "path": None, "bytes": size}
+
+    preview_bytes = Config.OUTPUT_PREVIEW_BYTES
+    fileobj.seek(0)
+    if size <= 2 * preview_bytes:
+        lines = fileobj.read().decode("utf-8", errors="replace").splitlines()
+        head_lines = lines[: Config.OUTPUT_PREVIEW_LINES]
+        tail_lines = lines[Config.OUTPUT_PREVIEW_LINES :]
+    else:
+        # Only the two ends are read; lines cut by the byte window are dropped
+        head = fileobj.read(preview_bytes).decode("utf-8", errors="replace")
+        fileobj.seek(size - preview_bytes)
+        tail = fileobj.read().decode("utf-8", errors="replace")
+        head_lines = head.splitlines()[:-1]
+        tail_lines = tail.splitlines()[1:]
+    fileobj.close()
+    return {
+        "text": make_preview(head_lines, tail_lines, size, path),
+        "path": path,
+        "bytes": size,
+    }
+
+
+class OutputSpool:
+    # Incremental capture for streamed output: chunks stay in memory until
+    # the limit is crossed, then everything moves to a spill file.
+
+    def __init__(self, hostname: str, stream_name: str, limit: Optional[int] = None):
+        self.hostname = hostname
+        self.stream_name = stream_name
+        self.limit = limit if limit is not None else Config.SSH_OUTPUT_MEMORY_LIMIT
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._file: Optional[IO[bytes]] = None
+        self.path: Optional[str] = None
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8", errors="replace")
+        self._size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+            return
+
+        self._chunks.append(data)
+        if self._size > self.limit:
+            self._file, self.path = open_capture_file(self.hostname, self.stream_name)
+            self._file.write(b"".join(self._chunks))
+            self._chunks = []
+
+    def finish(self) -> Dict[str, Any]:
+        # Same shape as collect_capture_file
+        if self._file is None:
+            text = b"".join(self._chunks).decode("utf-8", errors="replace")
+            self._chunks = []
+            return {"text": text.strip(), "path": None, "bytes": self._size}
+        self._file.flush()
+        return collect_capture_file(self._file, self.path, self.limit)
+
+    def discard(self) -> None:
+        self._chunks = []
+        if self._file is not None:
+            discard_capture_file(self._file, self.path)
+            self._file = None
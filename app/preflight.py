@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Pre-flight reachability probe: a plain TCP connect to every host's
+# HostName:Port, all at once on one event loop, so dead hosts fail within
+# the probe timeout instead of each costing a full ssh ConnectTimeout.
+# Hosts behind ProxyJump/ProxyCommand are not probed: only the jump host
+# knows whether they are reachable.
+
+import asyncio
+import os
+import socket
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from ssh_config_parser import SSHConfigParser
+
+DEFAULT_PORT = 22
+
+
+class ReachabilityProbe:
+    # probe(hostnames) -> {hostname: error} for the hosts that did not accept
+    # a connection. Errors read like ssh's own ("connect to host ... port 22:
+    # Connection refused"), so classify_failure sorts them the same way.
+
+    def __init__(
+        self,
+        ssh_config_path: Optional[str] = None,
+        timeout: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.timeout = timeout if timeout is not None else Config.SSH_PREFLIGHT_TIMEOUT
+        self.concurrency = max(1, concurrency or Config.SSH_PREFLIGHT_CONCURRENCY)
+        # Parsed once here instead of from the batch threads
+        self._parser = SSHConfigParser(ssh_config_path)
+        self._parser.parse_config()
+
+    def target(self, hostname: str) -> Optional[Tuple[str, int]]:
+        # (address, port) ssh would connect to; None when it goes via a proxy
+        info = self._parser.get_host_info(hostname) or {}
+        for option in ("proxyjump", "proxycommand"):
+            value = info.get(option, "").strip()
+            if value and value.lower() != "none":
+                return None
+        address = info.get("hostname", hostname).replace("%h", hostname)
+        try:
+            port = int(info.get("port", DEFAULT_PORT))
+        except ValueError:
+            port = DEFAULT_PORT
+        return address, port
+
+    async def _connect(
+        self, address: str, port: int, slots: asyncio.Semaphore
+    ) -> Optional[str]:
+        # None when the port accepted a connection, else the error
+        async with slots:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(address, port), self.timeout
+                )
+            except asyncio.TimeoutError:
+                return f"connect to host {address} port {port}: Connection timed out"
+            except socket.gaierror as e:
+                return f"Could not resolve hostname {address}: {e.strerror or e}"
+            except OSError as e:
+                # asyncio words it "Connect call failed"; ssh uses strerror
+                reason = os.strerror(e.errno) if e.errno else str(e)
+                return f"connect to host {address} port {port}: {reason}"
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+            return None
+
+    async def probe_async(self, hostnames: List[str]) -> Dict[str, str]:
+        # Probe every distinct address once; hosts sharing it share the answer
+        targets = {hostname: self.target(hostname) for hostname in hostnames}
+        distinct = list({t for t in targets.values() if t is not None})
+        slots = asyncio.Semaphore(self.concurrency)
+        errors = await asyncio.gather(
+            *(self._connect(address, port, slots) for address, port in distinct)
+        )
+        failed = {t: error for t, error in zip(distinct, errors) if error}
+        return {
+            hostname: f"Pre-flight: {failed[t]}"
+            for hostname, t in targets.items()
+            if t in failed
+        }
+
+    def probe(self, hostnames: List[str]) -> Dict[str, str]:
+        # Blocking variant for the thread pool backend
+        if not hostnames:
+            return {}
+        return asyncio.run(self.probe_async(hostnames))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Connection start rate limiting: a token bucket per target (one global
+# bucket, or one per ProxyJump bastion) so a wide fan-out does not open
+# hundreds of handshakes at once and trip sshd's MaxStartups.
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import Config
+from ssh_config_parser import SSHConfigParser
+
+DIRECT = "direct"  # Bucket key for hosts reached without a jump host
+
+
+class TokenBucket:
+    # `rate` tokens per second, at most `burst` saved up.
+    #
+    # reserve() hands out tokens in arrival order and returns how long the
+    # caller must wait for its token; the balance may go negative, which
+    # queues later callers behind earlier ones without a lock held while
+    # waiting. Works for threads (sleep) and coroutines (asyncio.sleep).
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Take one token; seconds to wait before using it
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class ConnectionRateLimiter:
+    # Token buckets keyed by the first ProxyJump hop (per_jump) or one
+    # bucket for every connection. Jump hosts are read from the effective
+    # config, so "Host *.internal / ProxyJump bastion" blocks are honoured.
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        *,
+        per_jump: bool = False,
+        ssh_config_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else Config.SSH_CONNECT_BURST
+        self.per_jump = per_jump
+        self._clock = clock
+        self._parser = None
+        if per_jump:
+            # Parsed once here instead of lazily from several worker threads
+            self._parser = SSHConfigParser(ssh_config_path)
+            self._parser.parse_config()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        # Validate the settings up front rather than on the first connection
+        TokenBucket(rate, self.burst, clock)
+
+    def key_for(self, hostname: str) -> str:
+        # Bucket key: the bastion every connection to hostname goes through
+        if self._parser is None:
+            return DIRECT
+        info = self._parser.get_host_info(hostname) or {}
+        jump = info.get("proxyjump", "").split(",")[0].strip()
+        if not jump or jump.lower() == "none":
+            return DIRECT
+        # user@bastion:port -> bastion; different users share the sshd
+        return jump.rpartition("@")[2].split(":")[0]
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(
+                    self.rate, self.burst, self._clock
+                )
+            return bucket
+
+    def reserve(self, hostname: str) -> float:
+        # Seconds to wait before starting a connection to hostname
+        return self.bucket(self.key_for(hostname)).reserve()
+
+    def wait(self, hostname: str) -> float:
+        # Block until a connection to hostname may start; returns the wait
+        delay = self.reserve(hostname)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
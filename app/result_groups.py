@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Grouping of hosts with identical results (like `dshbak -c`): each result is
+# hashed on return code, stdout and stderr, and only the first copy of every
+# distinct output is kept, so a homogeneous fleet costs one output in memory.
+# Spilled outputs are hashed from their spill file, so they group too.
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+from ssh_config_parser import fold_host_range, natural_sort_key
+
+_HASH_CHUNK = 64 * 1024
+
+
+def _update_stream(digest, text: str, path: Optional[str]) -> None:
+    # Hash the full output: the spill file when there is one (its preview
+    # names the per-host file, so hashing the preview would never match),
+    # else the in-memory text. Length-prefixed to keep stream boundaries.
+    if path:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f"file\0{os.fstat(f.fileno()).st_size}\0".encode())
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                    digest.update(chunk)
+            return
+        except OSError:
+            pass  # Spill file gone: the preview is all that is left
+    data = text.encode("utf-8", "surrogateescape")
+    digest.update(f"text\0{len(data)}\0".encode())
+    digest.update(data)
+
+
+def result_digest(result: Dict[str, Any]) -> str:
+    # Identity of a result
+    digest = hashlib.blake2b(digest_size=16)
+    for value in (
+        result["return_code"],
+        result.get("timed_out", False),
+        result.get("output_bytes", 0),
+        result.get("error_bytes", 0),
+    ):
+        digest.update(f"{value}\0".encode())
+    _update_stream(digest, result.get("output", ""), result.get("output_file"))
+    _update_stream(digest, result.get("error", ""), result.get("error_file"))
+    return digest.hexdigest()
+
+
+class ResultGrouper:
+    # Collects results as they complete; groups() lists the distinct outputs
+
+    def __init__(self):
+        self._groups: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        # Add a host result and return its group
+        key = result_digest(result)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = {
+                "digest": key,
+                "hosts": [],
+                "run_id": result.get("run_id"),
+                "command": result.get("command"),
+                "success": result["success"],
+                "return_code": result["return_code"],
+                "timed_out": result.get("timed_out", False),
+                "output": result.get("output", ""),
+                "error": result.get("error", ""),
+                "output_bytes": result.get("output_bytes", 0),
+                "error_bytes": result.get("error_bytes", 0),
+            }
+        group["hosts"].append(result["hostname"])
+        return group
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def groups(self) -> List[Dict[str, Any]]:
+        # Largest group first; failures before successes of the same size.
+        # Hosts are listed in natural order, not completion order.
+        for group in self._groups.values():
+            group["hosts"].sort(key=natural_sort_key)
+        return sorted(
+            self._groups.values(),
+            key=lambda group: (-len(group["hosts"]), group["success"]),
+        )
+
+
+def format_group_header(group: Dict[str, Any]) -> str:
+    # "3 hosts: web-[1-3] (RC 0)"
+    count = len(group["hosts"])
+    noun = "host" if count == 1 else "hosts"
+    return (
+        f"{count} {noun}: {fold_host_range(group['hosts'])} "
+        f"(RC {group['return_code']})"
+    )
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# Machine-readable per-host results (--output-format): one record is written
+# and flushed as each host completes, so nothing is held back until the end
+# of the batch.
+
+import csv
+import json
+from typing import IO, Any, Callable, Dict, Optional, Sequence
+
+from audit_log import isoformat_epoch
+from ssh_config_parser import fold_host_range
+
+RECORD_FIELDS = (
+    "run_id",
+    "host",
+    "command",
+    "success",
+    "return_code",
+    "timed_out",
+    "start",
+    "end",
+    "duration",
+    "stdout",
+    "stderr",
+    "stdout_bytes",
+    "stderr_bytes",
+    "output_file",
+    "error_file",
+    "failure_class",
+    "attempts",
+)
+
+# --group-output: one record per distinct result (see result_groups)
+GROUP_FIELDS = (
+    "run_id",
+    "digest",
+    "host_count",
+    "hosts",
+    "host_range",
+    "command",
+    "success",
+    "return_code",
+    "timed_out",
+    "stdout",
+    "stderr",
+    "stdout_bytes",
+    "stderr_bytes",
+)
+
+
+def result_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Flat record for one host result. stdout/stderr hold the captured text
+    # (a head/tail preview when the output was spilled to output_file).
+    duration = result.get("duration")
+    return {
+        "run_id": result.get("run_id"),
+        "host": result["hostname"],
+        "command": result.get("command"),
+        "success": result["success"],
+        "return_code": result["return_code"],
+        "timed_out": result.get("timed_out", False),
+        "start": isoformat_epoch(result.get("started_at")),
+        "end": isoformat_epoch(result.get("finished_at")),
+        "duration": None if duration is None else round(duration, 3),
+        "stdout": result.get("output", ""),
+        "stderr": result.get("error", ""),
+        "stdout_bytes": result.get("output_bytes", 0),
+        "stderr_bytes": result.get("error_bytes", 0),
+        "output_file": result.get("output_file"),
+        "error_file": result.get("error_file"),
+        "failure_class": result.get("failure_class"),
+        "attempts": result.get("attempts", 1),
+    }
+
+
+def group_record(group: Dict[str, Any]) -> Dict[str, Any]:
+    # Flat record for a group of hosts with identical results. hosts is a
+    # list in JSON and a comma-separated string in CSV.
+    return {
+        "run_id": group.get("run_id"),
+        "digest": group["digest"],
+        "host_count": len(group["hosts"]),
+        "hosts": group["hosts"],
+        "host_range": fold_host_range(group["hosts"]),
+        "command": group.get("command"),
+        "success": group["success"],
+        "return_code": group["return_code"],
+        "timed_out": group.get("timed_out", False),
+        "stdout": group.get("output", ""),
+        "stderr": group.get("error", ""),
+        "stdout_bytes": group.get("output_bytes", 0),
+        "stderr_bytes": group.get("error_bytes", 0),
+    }
+
+
+RecordFactory = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class JsonlResultWriter:
+    # One JSON object per line, with the given fields in order
+
+    def __init__(
+        self,
+        stream: IO[str],
+        fields: Sequence[str] = RECORD_FIELDS,
+        make_record: RecordFactory = result_record,
+    ):
+        self.stream = stream
+        self.fields = tuple(fields)
+        self.make_record = make_record
+
+    def write(self, result: Dict[str, Any]) -> None:
+        record = self.make_record(result)
+        record = {field: record.get(field) for field in self.fields}
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class CsvResultWriter:
+    # Header row of the given fields first, then one row per host; multiline
+    # output is quoted
+
+    def __init__(
+        self,
+        stream: IO[str],
+        fields: Sequence[str] = RECORD_FIELDS,
+        make_record: RecordFactory = result_record,
+    ):
+        self.stream = stream
+        self.fields = tuple(fields)
+        self.make_record = make_record
+        self._writer = csv.DictWriter(
+            stream, fieldnames=self.fields, extrasaction="ignore"
+        )
+        self._writer.writeheader()
+        self.stream.flush()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        record = self.make_record(result)
+        if isinstance(record.get("hosts"), list):
+            record["hosts"] = ",".join(record["hosts"])
+        self._writer.writerow(record)
+        self.stream.flush()
+
+
+RESULT_WRITERS = {"jsonl": JsonlResultWriter, "csv": CsvResultWriter}
+
+
+def make_result_writer(
+    output_format: str, stream: IO[str], *, grouped: bool = False
+) -> Optional[Any]:
+    # Writer for a machine-readable format; None for "text". A grouped
+    # writer takes result_groups groups instead of host results.
+    writer_class = RESULT_WRITERS.get(output_format)
+    if writer_class is None:
+        return None
+    if grouped:
+        return writer_class(stream, GROUP_FIELDS, group_record)
+    return writer_class(stream)
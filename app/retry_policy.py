@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Failure classification and retries. A failed result is sorted into one of
+# the FAILURE_CLASSES; only transport-level failures (the command never ran)
+# are retried, after a jittered exponential backoff. Retries are scheduled by
+# the batch loops (RetryQueue), so a host waiting for its next attempt does
+# not hold a worker slot.
+
+import heapq
+import itertools
+import random
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+# Failure classes, see classify_failure
+CONNECT_TIMEOUT = "connect_timeout"  # ssh could not reach the host in time
+AUTH = "auth"  # Authentication or host key verification failed
+TRANSPORT = "transport"  # ssh exit 255 with an ssh error: reset, refused, closed
+COMMAND = "command"  # The remote command ran and exited non-zero
+LOCAL_TIMEOUT = "local_timeout"  # Our own deadline (command timeout) expired
+LOCAL = "local"  # Could not start ssh at all
+FAILURE_CLASSES = (CONNECT_TIMEOUT, AUTH, TRANSPORT, COMMAND, LOCAL_TIMEOUT, LOCAL)
+
+_AUTH_RE = re.compile(
+    r"permission denied|host key verification failed"
+    r"|too many authentication failures|no supported authentication methods"
+    r"|remote host identification has changed",
+    re.IGNORECASE,
+)
+_CONNECT_TIMEOUT_RE = re.compile(
+    r"connection timed out|operation timed out|timed out during banner exchange",
+    re.IGNORECASE,
+)
+
+
+# Messages only ssh itself prints. A remote command may exit 255 too, so a
+# 255 without one of these is the command's own failure.
+_SSH_ERROR_RE = re.compile(
+    r"^ssh: |^kex_exchange_identification: |^ssh_exchange_identification: "
+    r"|^client_loop: |^packet_write_wait: |^mux_client_|connection reset"
+    r"|connection refused|connection closed|closed by remote host|broken pipe"
+    r"|could not resolve hostname|no route to host|network is unreachable"
+    r"|bad packet length|corrupted mac",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def classify_failure(result: Dict[str, Any]) -> Optional[str]:
+    # Failure class of a result; None when it succeeded.
+    # ssh exits 255 for its own errors, which it reports on stderr; any other
+    # code, or a 255 without an ssh message, is the command's.
+    if result["success"]:
+        return None
+    if result.get("timed_out"):
+        return LOCAL_TIMEOUT
+    return_code = result["return_code"]
+    if return_code == 255:
+        error = result.get("error", "")
+        if _AUTH_RE.search(error):
+            return AUTH
+        if _CONNECT_TIMEOUT_RE.search(error):
+            return CONNECT_TIMEOUT
+        if _SSH_ERROR_RE.search(error):
+            return TRANSPORT
+    elif return_code < 0:
+        return LOCAL
+    return COMMAND
+
+
+def describe_failure(result: Dict[str, Any]) -> str:
+    # " (transport, 3 attempts)" for status lines; "" for a first-try success
+    parts = []
+    failure_class = result.get("failure_class")
+    if failure_class and failure_class != COMMAND:
+        parts.append(failure_class)
+    if result.get("attempts", 1) > 1:
+        parts.append(f"{result['attempts']} attempts")
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+class RetryPolicy:
+    # How often and when to retry: up to `retries` more attempts per host;
+    # the n-th retry waits a random time up to backoff * 2**(n-1), capped at
+    # max_backoff ("full jitter", so hosts failing together spread out).
+
+    def __init__(
+        self,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        retry_on: Optional[Iterable[str]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        if retries is None:
+            retries = Config.SSH_RETRIES
+        self.attempts = 1 + max(0, retries)
+        self.backoff = backoff if backoff is not None else Config.SSH_RETRY_BACKOFF
+        self.max_backoff = (
+            max_backoff if max_backoff is not None else Config.SSH_RETRY_MAX_BACKOFF
+        )
+        self.retry_on = frozenset(
+            retry_on if retry_on is not None else Config.SSH_RETRY_ON
+        )
+        self._rng = rng or random.Random()
+
+    def should_retry(self, result: Dict[str, Any], attempt: int) -> bool:
+        return (
+            attempt < self.attempts
+            and (result.get("failure_class") or classify_failure(result))
+            in self.retry_on
+        )
+
+    def delay(self, attempt: int) -> float:
+        # Wait before attempt + 1
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return self._rng.uniform(0, ceiling)
+
+
+class RetryQueue:
+    # Hosts waiting for their next attempt, ordered by when it is due.
+    # The failed result is kept so it can still be reported if the run stops
+    # before the retry starts.
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.policy = policy
+        self._clock = clock
+        self._heap: List[Tuple[float, int, str, int, Dict[str, Any]]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, hostname: str, attempt: int, result: Dict[str, Any]) -> bool:
+        # Queue another attempt if the policy allows one; False = final result
+        if self.policy is None or not self.policy.should_retry(result, attempt):
+            return False
+        due = self._clock() + self.policy.delay(attempt)
+        heapq.heappush(
+            self._heap, (due, next(self._order), hostname, attempt + 1, result)
+        )
+        return True
+
+    def pop_ready(self) -> Optional[Tuple[str, int]]:
+        # (hostname, attempt) of a retry that is due, if any
+        if self._heap and self._heap[0][0] <= self._clock():
+            _, _, hostname, attempt, _ = heapq.heappop(self._heap)
+            return hostname, attempt
+        return None
+
+    def next_delay(self) -> Optional[float]:
+        # Seconds until the earliest retry is due; None when nothing waits
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._clock())
+
+    def drain(self) -> List[Dict[str, Any]]:
+        # Last results of hosts whose retry never started
+        results = [entry[4] for entry in sorted(self._heap)]
+        self._heap = []
+        return results
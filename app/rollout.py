@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# Rolling execution: hosts run in batches of N (or N% of the selection), with
+# a pause between batches, and the run is aborted once failures exceed a
+# threshold. Works on top of any backend's iter_command_batch.
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from audit_log import new_run_id
+
+
+def parse_count(value: Optional[str], name: str = "value") -> Optional[str]:
+    # Validate "N" or "N%" (as given to --batch-size / --max-failures) and
+    # return it normalized; None passes through. Raises ValueError.
+    if value is None:
+        return None
+    text = str(value).strip()
+    number = text[:-1] if text.endswith("%") else text
+    try:
+        amount = float(number) if text.endswith("%") else int(number)
+    except ValueError:
+        raise ValueError(f"{name} must be a number or a percentage, got {value!r}")
+    if amount < 0 or (text.endswith("%") and amount > 100):
+        raise ValueError(f"{name} out of range: {value!r}")
+    return text
+
+
+def resolve_count(spec: str, total: int) -> float:
+    # "10" -> 10, "25%" of 40 hosts -> 10.0
+    if spec.endswith("%"):
+        return total * float(spec[:-1]) / 100
+    return int(spec)
+
+
+class _EitherEvent:
+    # Stop signal for the executor: set once either event is. wait() polls
+    # both in short slices, so a user stop also cuts a delay or retry
+    # backoff short instead of waiting for the next result.
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, first: threading.Event, second: threading.Event):
+        self._first = first
+        self._second = second
+
+    def is_set(self) -> bool:
+        return self._first.is_set() or self._second.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            step = self.POLL_INTERVAL
+            if deadline is not None:
+                step = min(step, deadline - time.monotonic())
+                if step <= 0:
+                    break
+            self._first.wait(step)
+        return self.is_set()
+
+
+class Rollout:
+    # Batch plan and failure threshold for one run.
+    #
+    # batch_size / max_failures are "N" or "N%" (None: one batch / never
+    # abort); invalid values raise ValueError. After run(): failures,
+    # aborted (threshold exceeded) and skipped (hosts never started).
+
+    def __init__(
+        self,
+        batch_size: Optional[str] = None,
+        pause: float = 0,
+        max_failures: Optional[str] = None,
+    ):
+        self.batch_size = parse_count(batch_size, "Batch size")
+        if self.batch_size is not None and resolve_count(self.batch_size, 1) <= 0:
+            raise ValueError("Batch size must be greater than 0")
+        self.pause = max(0, pause or 0)
+        self.max_failures = parse_count(max_failures, "Max failures")
+        self.failures = 0
+        self.aborted = False
+        self.skipped: List[str] = []
+
+    def plan(self, hostnames: List[str]) -> List[List[str]]:
+        # Split hosts into batches; percentages round up, never below 1 host
+        if self.batch_size is None or not hostnames:
+            return [list(hostnames)] if hostnames else []
+        size = max(1, math.ceil(resolve_count(self.batch_size, len(hostnames))))
+        return [hostnames[i : i + size] for i in range(0, len(hostnames), size)]
+
+    def failure_limit(self, total: int) -> Optional[float]:
+        # Failures allowed before the run is aborted
+        if self.max_failures is None:
+            return None
+        return resolve_count(self.max_failures, total)
+
+    def describe(self, total: int) -> str:
+        # One-line summary of the plan for the run header
+        parts = []
+        batches = self.plan(list(range(total)))
+        if self.batch_size is not None:
+            parts.append(f"{len(batches)} batches of up to {len(batches[0])} hosts")
+            if self.pause:
+                parts.append(f"{self.pause:g}s pause between batches")
+        limit = self.failure_limit(total)
+        if limit is not None:
+            parts.append(f"abort after more than {limit:g} failed hosts")
+        return ", ".join(parts)
+
+    def run(
+        self,
+        executor,
+        hostnames: List[str],
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_workers: Optional[int] = None,
+        delay: int = 0,
+        stop_event: Optional[threading.Event] = None,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_batch: Optional[Callable[[int, int, List[str]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        # Yield results in completion order like iter_command_batch.
+        # Each batch runs to completion before the next one starts; once the
+        # failure limit is exceeded no new host is started (running ones
+        # finish). on_batch(number, count, hosts) is called as a batch starts.
+        # delay only applies without batches: the pause replaces it.
+        hostnames = list(hostnames)
+        batches = self.plan(hostnames)
+        limit = self.failure_limit(len(hostnames))
+        run_id = run_id or new_run_id()
+        workers = executor.max_workers if max_workers is None else max_workers
+        # Set on abort or user stop; stops the current batch from starting hosts
+        halt = threading.Event()
+        # What the executor watches: halt, or the user's stop without delay
+        batch_stop = _EitherEvent(halt, stop_event) if stop_event is not None else halt
+        self.failures, self.aborted, self.skipped = 0, False, []
+        started = set()
+
+        try:
+            for number, batch_hosts in enumerate(batches, 1):
+                if number > 1 and self.pause:
+                    if stop_event is not None:
+                        if stop_event.wait(self.pause):
+                            break
+                    else:
+                        time.sleep(self.pause)
+                if halt.is_set() or (stop_event is not None and stop_event.is_set()):
+                    break
+                if on_batch is not None:
+                    on_batch(number, len(batches), batch_hosts)
+
+                results = executor.iter_command_batch(
+                    batch_hosts,
+                    command,
+                    timeout,
+                    max_workers=min(workers, len(batch_hosts)),
+                    delay=delay if self.batch_size is None else 0,
+                    stop_event=batch_stop,
+                    on_line=on_line,
+                    run_id=run_id,
+                )
+                try:
+                    for result in results:
+                        started.add(result["hostname"])
+                        if not result["success"]:
+                            self.failures += 1
+                            if limit is not None and self.failures > limit:
+                                self.aborted = True
+                                halt.set()
+                        if stop_event is not None and stop_event.is_set():
+                            halt.set()
+                        yield result
+                finally:
+                    results.close()
+                if batch_stop.is_set():
+                    break
+        finally:
+            self.skipped = [host for host in hostnames if host not in started]
@@ -1,11 +1,153 @@
 #!/usr/bin/env python3
 
+import bisect
+import glob
+import hashlib
+import json
+import os
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from config import Config
 
+# Bump when the parsed structure changes so stale disk caches are ignored
+PARSE_CACHE_VERSION = 3
+# Disk cache file name -> config path, read when pruning (see _prune_disk_cache)
+DISK_CACHE_INDEX = "sources.index"
+
+# Type aliases for the parse caches
+Signatures = Dict[str, List[int]]  # file path -> [mtime_ns, size]
+IncludeGlobs = Dict[str, List[str]]  # Include pattern -> matched paths
+# ("host", aliases) | ("match", criteria) | ("include", patterns)
+# | ("option", (key, value))
+Entry = Tuple[str, Any]
+# Host block in file order: (patterns, [(key, value), ...])
+Block = Tuple[List[str], List[Tuple[str, str]]]
+
+# In-process parse caches shared by all parser instances:
+# resolved config path -> ParsedConfig
+_parse_cache: Dict[str, "ParsedConfig"] = {}
+# single file path -> (signature, directives), so an Include tree only
+# rereads the files that changed
+_file_cache: Dict[str, Tuple[List[int], List[Entry]]] = {}
+_parse_cache_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    # (mtime_ns, size) identifies a file version without reading it
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _expand_include(pattern: str) -> List[str]:
+    # Files matched by an Include pattern, in glob order like OpenSSH
+    return sorted(glob.glob(pattern))
+
+
+def _dependencies_match(signatures: Signatures, include_globs: IncludeGlobs) -> bool:
+    # Every parsed file is unchanged and no Include glob gained or lost a match
+    if not all(_file_signature(path) == list(sig) for path, sig in signatures.items()):
+        return False
+    return all(
+        _expand_include(pattern) == list(matches)
+        for pattern, matches in include_globs.items()
+    )
+
+
+def _disk_cache_path(config_path: str) -> str:
+    digest = hashlib.sha1(config_path.encode("utf-8")).hexdigest()
+    return os.path.join(Config.SSH_CONFIG_CACHE_DIR, f"{digest}.json")
+
+
+def _load_disk_cache(config_path: str) -> Optional["ParsedConfig"]:
+    try:
+        with open(_disk_cache_path(config_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != PARSE_CACHE_VERSION or data.get("path") != config_path:
+        return None
+    signatures = data.get("files", {})
+    include_globs = data.get("globs", {})
+    if not signatures or not _dependencies_match(signatures, include_globs):
+        return None
+    return ParsedConfig(signatures, include_globs, data["hosts"], data["blocks"])
+
+
+def _write_json_atomic(path: str, data: Any) -> bool:
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(Config.SSH_CONFIG_CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        # Atomic replace so concurrent readers never see a partial file
+        os.replace(tmp_file, path)
+    except OSError:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _store_disk_cache(config_path: str, parsed: "ParsedConfig") -> None:
+    cache_file = _disk_cache_path(config_path)
+    stored = _write_json_atomic(
+        cache_file,
+        {
+            "version": PARSE_CACHE_VERSION,
+            "path": config_path,
+            "files": parsed.signatures,
+            "globs": parsed.include_globs,
+            "hosts": parsed.hosts,
+            "blocks": parsed.blocks,
+        },
+    )
+    if stored:
+        _prune_disk_cache(cache_file, config_path)
+
+
+def _prune_disk_cache(cache_file: str, config_path: str) -> None:
+    # Drop cache files of configs that no longer exist (temporary or moved
+    # configs would otherwise accumulate one file each). A small index maps
+    # cache file names to their configs, so the cached payloads are never read.
+    index_file = os.path.join(Config.SSH_CONFIG_CACHE_DIR, DISK_CACHE_INDEX)
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            sources = json.load(f)
+    except (OSError, ValueError):
+        sources = None
+    if not isinstance(sources, dict):
+        sources = {}
+    name = os.path.basename(cache_file)
+    changed = sources.get(name) != config_path
+    sources[name] = config_path
+    for other, path in list(sources.items()):
+        if isinstance(path, str) and os.path.exists(path):
+            continue
+        try:
+            os.unlink(os.path.join(Config.SSH_CONFIG_CACHE_DIR, other))
+        except OSError:
+            pass
+        del sources[other]
+        changed = True
+    if changed:
+        _write_json_atomic(index_file, sources)
+
+
+def clear_parse_cache() -> None:
+    # Drop the in-process cache (the disk cache revalidates itself)
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        _file_cache.clear()
+
 
 def _is_pattern_host(alias: str) -> bool:
     if not alias:
@@ -17,39 +159,35 @@ def _is_pattern_host(alias: str) -> bool:
     return any(char in alias for char in "*?")
 
 
+_NATURAL_SPLIT_RE = re.compile(r"(\d+)")
+
+
+def host_group(hostname: str) -> str:
+    # Group name for a host: its first letter, or the numeric/special group
+    first_char = hostname[0].lower()
+    if first_char.isdigit():
+        return Config.GROUPING.get("numeric_group_name", "other")
+    if first_char.isalpha():
+        return first_char
+    return Config.GROUPING.get("special_chars_group_name", "zzz")
+
+
+@lru_cache(maxsize=1 << 16)
 def natural_sort_key(hostname: str) -> tuple:
-    # Create key for natural host sorting with grouping
+    # Create key for natural host sorting with grouping (memoized)
     # Args:
     #   hostname: Host alias
     # Returns:
     #   Tuple for sorting (group, natural_key)
     if not hostname:
-        return ("zzz", "")
-
-    first_char = hostname[0].lower()
-
-    numeric_group = Config.GROUPING.get("numeric_group_name", "other")
-    special_group = Config.GROUPING.get("special_chars_group_name", "zzz")
-
-    # Determine group by first character
-    if first_char.isdigit():
-        group = numeric_group
-    elif first_char.isalpha():
-        group = first_char
-    else:
-        group = special_group
+        return ("zzz", ())
 
     # Build key for sorting within the group
-    parts = re.split(r"(\d+)", hostname.lower())
-    natural_key = []
-
-    for part in parts:
-        if part.isdigit():
-            natural_key.append(int(part))
-        else:
-            natural_key.append(part)
-
-    return (group, natural_key)
+    natural_key = tuple(
+        int(part) if part.isdigit() else part
+        for part in _NATURAL_SPLIT_RE.split(hostname.lower())
+    )
+    return (host_group(hostname), natural_key)
 
 
 def group_hosts_by_first_char(hosts: List[str]) -> Dict[str, List[str]]:
@@ -58,24 +196,12 @@ def group_hosts_by_first_char(hosts: List[str]) -> Dict[str, List[str]]:
     #   hosts: List of host aliases
     # Returns:
     #   Dictionary of groups {group: [hosts]}
-    groups = {}
+    groups: Dict[str, List[str]] = {}
 
     for host in hosts:
         if not host:
             continue
-
-        first_char = host[0].lower()
-
-        if first_char.isdigit():
-            group_name = Config.GROUPING.get("numeric_group_name", "other")
-        elif first_char.isalpha():
-            group_name = first_char
-        else:
-            group_name = Config.GROUPING.get("special_chars_group_name", "zzz")
-
-        if group_name not in groups:
-            groups[group_name] = []
-        groups[group_name].append(host)
+        groups.setdefault(host_group(host), []).append(host)
 
     # Sort hosts inside each group
     for group_name in groups:
@@ -84,6 +210,233 @@ def group_hosts_by_first_char(hosts: List[str]) -> Dict[str, List[str]]:
     return groups
 
 
+class HostIndex:
+    # Lookup structure built once per parsed config.
+    #
+    # Pattern hosts are dropped, hosts are kept in natural order, and a
+    # lowercased, lexicographically sorted copy lets a prefix be found with
+    # two binary searches. Matches are returned in natural order by sorting
+    # their positions instead of re-sorting names by natural_sort_key, and
+    # each host's group is looked up rather than recomputed.
+
+    def __init__(self, hosts: Dict[str, Dict[str, str]]):
+        self.hosts = hosts
+        self.sorted_hosts = sorted(
+            (alias for alias in hosts if not _is_pattern_host(alias)),
+            key=natural_sort_key,
+        )
+        self._rank = {alias: rank for rank, alias in enumerate(self.sorted_hosts)}
+        self.groups = {alias: host_group(alias) for alias in self.sorted_hosts}
+        lowered = sorted(
+            (alias.lower(), rank) for rank, alias in enumerate(self.sorted_hosts)
+        )
+        self._lowered = [name for name, _ in lowered]
+        self._ranks = [rank for _, rank in lowered]
+
+    def with_prefix(self, prefix: str = "") -> List[str]:
+        # Hosts starting with prefix (case-insensitive), naturally sorted
+        if not prefix:
+            return list(self.sorted_hosts)
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._lowered, prefix)
+        # Every string with this prefix sorts below prefix + U+10FFFF
+        end = bisect.bisect_left(self._lowered, prefix + "\U0010ffff", start)
+        return [self.sorted_hosts[rank] for rank in sorted(self._ranks[start:end])]
+
+    def group(self, sorted_hosts: List[str]) -> Dict[str, List[str]]:
+        # Same result as group_hosts_by_first_char for naturally sorted input
+        groups: Dict[str, List[str]] = {}
+        for host in sorted_hosts:
+            group_name = self.groups.get(host) or host_group(host)
+            groups.setdefault(group_name, []).append(host)
+        return groups
+
+    def sort(self, hosts: Iterable[str]) -> List[str]:
+        # Natural order by precomputed rank; unknown hosts fall back to the key
+        hosts = list(hosts)
+        if all(host in self._rank for host in hosts):
+            return sorted(hosts, key=self._rank.__getitem__)
+        return sorted(hosts, key=natural_sort_key)
+
+
+_HOST_RANGE_RE = re.compile(r"\[([\d,\s-]+)\]")
+
+
+def split_host_list(spec: str) -> List[str]:
+    # "web-1,web-[2-4,7]" -> ["web-1", "web-[2-4,7]"]: commas inside
+    # brackets belong to the range
+    items, depth, current = [], 0, []
+    for char in spec:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth = max(depth - 1, 0)
+        if char == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current).strip())
+    return [item for item in items if item]
+
+
+def expand_host_range(pattern: str) -> List[str]:
+    # Expand numeric ranges: "web-[1-3]" -> web-1, web-2, web-3,
+    # "db-[01-02,7]" -> db-01, db-02, db-7 (zero padding follows the range
+    # start). Raises ValueError for a malformed range.
+    match = _HOST_RANGE_RE.search(pattern)
+    if match is None:
+        return [pattern]
+    numbers: List[str] = []
+    for part in match.group(1).split(","):
+        part = part.strip()
+        start, _, end = part.partition("-")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f"Invalid host range: [{match.group(1)}]")
+        if not end:
+            numbers.append(start)
+            continue
+        width = len(start) if start.startswith("0") else 0
+        low, high = sorted((int(start), int(end)))
+        numbers.extend(str(number).zfill(width) for number in range(low, high + 1))
+    head, tail = pattern[: match.start()], pattern[match.end() :]
+    return [
+        f"{head}{number}{rest}"
+        for number in numbers
+        for rest in expand_host_range(tail)
+    ]
+
+
+_LAST_NUMBER_RE = re.compile(r"^(.*?)(\d+)(\D*)$")
+
+
+def fold_host_range(hosts: Iterable[str]) -> str:
+    # Inverse of expand_host_range: web-1, web-2, web-3, web-7, db-1 ->
+    # "db-1,web-[1-3,7]". Only the last number of a name is folded; zero
+    # padded numbers are kept apart so the result expands back exactly.
+    ranges: Dict[Tuple[str, str, int], List[int]] = {}
+    plain: List[str] = []
+    for host in hosts:
+        match = _LAST_NUMBER_RE.match(host)
+        if match is None:
+            plain.append(host)
+            continue
+        head, digits, tail = match.groups()
+        width = len(digits) if digits.startswith("0") and len(digits) > 1 else 0
+        ranges.setdefault((head, tail, width), []).append(int(digits))
+
+    items = [(natural_sort_key(host), host) for host in plain]
+    for (head, tail, width), numbers in ranges.items():
+        numbers = sorted(set(numbers))
+        first = f"{head}{str(numbers[0]).zfill(width)}{tail}"
+        if len(numbers) == 1:
+            items.append((natural_sort_key(first), first))
+            continue
+        parts, start = [], numbers[0]
+        for previous, number in zip(numbers, numbers[1:] + [None]):
+            if number is None or number != previous + 1:
+                low, high = str(start).zfill(width), str(previous).zfill(width)
+                parts.append(low if start == previous else f"{low}-{high}")
+                start = number
+        items.append((natural_sort_key(first), f"{head}[{','.join(parts)}]{tail}"))
+    return ",".join(item for _, item in sorted(items))
+
+
+def _compile_host_patterns(patterns: List[str]) -> Optional["re.Pattern[str]"]:
+    # One regex for a list of ssh Host patterns ("*" and "?" wildcards)
+    if not patterns:
+        return None
+    alternatives = [
+        re.escape(pattern.lower()).replace("\\*", ".*").replace("\\?", ".")
+        for pattern in patterns
+    ]
+    return re.compile(f"(?:{'|'.join(alternatives)})\\Z")
+
+
+class HostResolver:
+    # Effective options per host with OpenSSH semantics: Host blocks are
+    # scanned in file order, a block applies when one of its patterns
+    # matches and none of its negated (!) patterns do, and the first value
+    # seen for an option wins. Blocks naming hosts literally are indexed by
+    # alias, so only wildcard blocks are matched against every host.
+    # Results are memoized; a reparse builds a new resolver.
+
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+        self._literal: Dict[str, List[int]] = {}
+        self._wildcard: List[Tuple[int, Any, Any]] = []
+        self._resolved: Dict[str, Dict[str, str]] = {}
+
+        for number, (patterns, options) in enumerate(blocks):
+            if not options:
+                continue
+            if not any(_is_pattern_host(pattern) for pattern in patterns):
+                for pattern in patterns:
+                    self._literal.setdefault(pattern.lower(), []).append(number)
+                continue
+            positive = [p for p in patterns if not p.startswith("!")]
+            negative = [p[1:] for p in patterns if p.startswith("!")]
+            self._wildcard.append(
+                (
+                    number,
+                    _compile_host_patterns(positive),
+                    _compile_host_patterns(negative),
+                )
+            )
+
+    def resolve(self, alias: str) -> Dict[str, str]:
+        # Effective options for alias (shared dict, must not be modified)
+        resolved = self._resolved.get(alias)
+        if resolved is not None:
+            return resolved
+
+        name = alias.lower()
+        numbers = list(self._literal.get(name, ()))
+        for number, positive, negative in self._wildcard:
+            if positive is None or not positive.match(name):
+                continue
+            if negative is not None and negative.match(name):
+                continue
+            numbers.append(number)
+        numbers.sort()
+
+        resolved = {"Host": alias}
+        for number in numbers:
+            for key, value in self.blocks[number][1]:
+                resolved.setdefault(key, value)
+        if "hostname" in resolved:
+            # %h in HostName is the alias being connected to
+            resolved["hostname"] = re.sub(
+                r"%([%h])",
+                lambda m: alias if m.group(1) == "h" else "%",
+                resolved["hostname"],
+            )
+
+        self._resolved[alias] = resolved
+        return resolved
+
+
+class ParsedConfig:
+    # One parse of a config tree, shared between parser instances
+
+    def __init__(
+        self,
+        signatures: Signatures,
+        include_globs: IncludeGlobs,
+        hosts: Dict[str, Dict[str, str]],
+        blocks: List[Block],
+    ):
+        self.signatures = signatures
+        self.include_globs = include_globs
+        self.hosts = hosts
+        self.blocks = blocks
+        self.index = HostIndex(hosts)
+        self.resolver = HostResolver(blocks)
+
+    def is_current(self) -> bool:
+        return _dependencies_match(self.signatures, self.include_globs)
+
+
 class SSHConfigParser:
     def __init__(self, config_path: Optional[str] = None):
         if config_path is None:
@@ -93,25 +446,102 @@ class SSHConfigParser:
 
         self.config_path = Path(config_path)
         self.hosts = {}
+        self._signatures: Signatures = {}
+        self._include_globs: IncludeGlobs = {}
+        self._parsed: Optional[ParsedConfig] = None
+        self._index: Optional[HostIndex] = None
 
     def parse_config(self) -> Dict[str, Dict[str, str]]:
+        # Parsed hosts are cached per path and revalidated by mtime + size of
+        # every file in the Include tree, so unchanged configs load without
+        # being read. The returned dicts are shared between parser instances
+        # and must not be modified.
         if not self.config_path.exists():
             print(f"SSH config file not found: {self.config_path}")
             return {}
 
+        cache_key = str(self.config_path.resolve())
+
+        with _parse_cache_lock:
+            parsed = _parse_cache.get(cache_key)
+        if parsed is not None and parsed.is_current():
+            return self._use(parsed)
+
+        if Config.SSH_CONFIG_DISK_CACHE:
+            parsed = _load_disk_cache(cache_key)
+            if parsed is not None:
+                with _parse_cache_lock:
+                    _parse_cache[cache_key] = parsed
+                return self._use(parsed)
+
+        self._signatures = {}
+        self._include_globs = {}
+        entries = self._read_entries(cache_key)
+        if entries is None:
+            return {}
+
+        hosts: Dict[str, Dict[str, str]] = {}
+        blocks: List[Block] = []
+        # Options before the first Host line apply to every host
+        self._apply_entries(entries, hosts, blocks, [], ["*"], [cache_key])
+        parsed = ParsedConfig(self._signatures, self._include_globs, hosts, blocks)
+
+        with _parse_cache_lock:
+            _parse_cache[cache_key] = parsed
+        if Config.SSH_CONFIG_DISK_CACHE:
+            _store_disk_cache(cache_key, parsed)
+
+        return self._use(parsed)
+
+    def _use(self, parsed: ParsedConfig) -> Dict[str, Dict[str, str]]:
+        self._parsed = parsed
+        self._signatures = parsed.signatures
+        self._include_globs = parsed.include_globs
+        self._index = parsed.index
+        self.hosts = parsed.hosts
+        return self.hosts
+
+    def is_stale(self) -> bool:
+        # True if the config (or a file it includes) changed since parsing
+        return not self._signatures or not _dependencies_match(
+            self._signatures, self._include_globs
+        )
+
+    def refresh(self) -> bool:
+        # Reparse only if the config changed; returns True if it did
+        if self.hosts and not self.is_stale():
+            return False
+        self.parse_config()
+        return True
+
+    def _read_entries(self, path: str) -> Optional[List[Entry]]:
+        # Directives of one file, reparsed only if its signature changed.
+        # The signature is taken before reading: a concurrent edit forces a
+        # reparse next time.
+        signature = _file_signature(path)
+        with _parse_cache_lock:
+            cached = _file_cache.get(path)
+        if signature is not None and cached is not None and cached[0] == signature:
+            self._signatures[path] = signature
+            return cached[1]
+
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
+            with open(path, "r", encoding="utf-8") as f:
                 content = f.read()
         except Exception as e:
-            print(f"Error reading file {self.config_path}: {e}")
-            return {}
+            print(f"Error reading file {path}: {e}")
+            return None
 
-        self.hosts = self._parse_content(content)
-        return self.hosts
+        entries = self._parse_content(content)
+        if signature is not None:
+            self._signatures[path] = signature
+            with _parse_cache_lock:
+                _file_cache[path] = (signature, entries)
+        return entries
 
-    def _parse_content(self, content: str) -> Dict[str, Dict[str, str]]:
-        hosts: Dict[str, Dict[str, str]] = {}
-        current_hosts: List[str] = []
+    def _parse_content(self, content: str) -> List[Entry]:
+        # Reduce one file to its Host, Include and option directives
+        entries: List[Entry] = []
 
         for line in content.split("\n"):
             line = line.strip()
@@ -120,60 +550,158 @@ class SSHConfigParser:
             if not line or line.startswith("#"):
                 continue
 
-            # Process Host directives
-            if line.lower().startswith("host "):
-                host_names = line[5:].split()
-                current_hosts = host_names
-                for alias in host_names:
-                    hosts[alias] = {"Host": alias}
+            # Handle spaces, tabs, multiple whitespace
+            parts = line.split(None, 1)
+            if len(parts) != 2:
                 continue
-
-            # Process other directives (handle spaces, tabs, multiple whitespace)
-            if current_hosts and line:
-                parts = line.split(None, 1)
-                if len(parts) == 2:
-                    key, value = parts
-                    key_lower = key.lower()
-                    for alias in current_hosts:
-                        hosts[alias][key_lower] = value
-
-        return hosts
-
-    def get_hosts_with_prefix(self, prefix: str = "") -> List[str]:
+            key, value = parts
+            key_lower = key.lower()
+
+            if key_lower in ("host", "match", "include"):
+                entries.append((key_lower, value.split()))
+            else:
+                entries.append(("option", (key_lower, value)))
+
+        return entries
+
+    def _apply_entries(
+        self,
+        entries: List[Entry],
+        hosts: Dict[str, Dict[str, str]],
+        blocks: List[Block],
+        current_hosts: List[str],
+        block_patterns: Optional[List[str]],
+        include_stack: List[str],
+    ) -> None:
+        # Merge one file's directives into hosts (each alias's own options)
+        # and blocks (every Host block in order, for HostResolver),
+        # descending into Includes
+        block: Optional[Block] = None
+        for kind, value in entries:
+            if kind == "host":
+                current_hosts = value
+                block_patterns = value
+                block = None
+                for alias in value:
+                    hosts[alias] = {"Host": alias}
+            elif kind == "match":
+                # Match criteria are not evaluated: its options are skipped
+                current_hosts = []
+                block_patterns = None
+                block = None
+            elif kind == "include":
+                for path in self._resolve_include(value):
+                    real_path = os.path.realpath(path)
+                    if real_path in include_stack:
+                        print(f"Skipping recursive Include of {path}")
+                        continue
+                    if len(include_stack) > Config.SSH_CONFIG_MAX_INCLUDE_DEPTH:
+                        print(f"Include nested too deeply, skipping {path}")
+                        continue
+                    included = self._read_entries(real_path)
+                    if included is not None:
+                        # The Host context is restored after the Include
+                        self._apply_entries(
+                            included,
+                            hosts,
+                            blocks,
+                            current_hosts,
+                            block_patterns,
+                            include_stack + [real_path],
+                        )
+                # Later options continue the outer block after the include
+                block = None
+            else:
+                key, option_value = value
+                for alias in current_hosts:
+                    hosts[alias][key] = option_value
+                if block_patterns is not None:
+                    if block is None:
+                        block = (block_patterns, [])
+                        blocks.append(block)
+                    block[1].append((key, option_value))
+
+    def _resolve_include(self, patterns: List[str]) -> List[str]:
+        # Relative Include paths are taken from the main config's directory
+        # (~/.ssh for the default config), as OpenSSH does for user configs
+        base_dir = self.config_path.parent
+        paths: List[str] = []
+        for pattern in patterns:
+            pattern = os.path.expanduser(pattern)
+            if not os.path.isabs(pattern):
+                pattern = str(base_dir / pattern)
+            matches = _expand_include(pattern)
+            self._include_globs[pattern] = matches
+            paths.extend(m for m in matches if os.path.isfile(m))
+        return paths
+
+    def _host_index(self) -> HostIndex:
         if not self.hosts:
             self.parse_config()
+        # Rebuilt if hosts were replaced without going through parse_config
+        if self._index is None or self._index.hosts is not self.hosts:
+            self._index = HostIndex(self.hosts)
+        return self._index
 
-        if not prefix:
-            hosts = list(self.hosts.keys())
-        else:
-            hosts = [
-                host
-                for host in self.hosts.keys()
-                if host.lower().startswith(prefix.lower())
-            ]
-
-        hosts = [host for host in hosts if not _is_pattern_host(host)]
-        return sorted(hosts, key=natural_sort_key)
+    def get_hosts_with_prefix(self, prefix: str = "") -> List[str]:
+        return self._host_index().with_prefix(prefix)
 
     def get_grouped_hosts_with_prefix(self, prefix: str = "") -> Dict[str, List[str]]:
-        hosts = self.get_hosts_with_prefix(prefix)
-        return group_hosts_by_first_char(hosts)
+        index = self._host_index()
+        return index.group(index.with_prefix(prefix))
+
+    def sort_hosts(self, hosts: Iterable[str]) -> List[str]:
+        # Hosts in the same natural order used for listing
+        return self._host_index().sort(hosts)
+
+    def select_hosts(self, spec: str) -> Tuple[List[str], List[str]]:
+        # Hosts named by a comma-separated list of aliases, numeric ranges
+        # ("web-[2-9]") and wildcards ("db-*"); "!item" removes hosts again.
+        # Returns the hosts, naturally sorted, and the items that matched no
+        # configured host.
+        index = self._host_index()
+        lowered = {alias.lower(): alias for alias in index.sorted_hosts}
+        selected: Dict[str, None] = {}
+        unmatched: List[str] = []
+        for item in split_host_list(spec):
+            exclude = item.startswith("!")
+            found = []
+            for name in expand_host_range(item[1:] if exclude else item):
+                if any(char in name for char in "*?"):
+                    regex = _compile_host_patterns([name])
+                    found.extend(
+                        alias
+                        for alias in index.sorted_hosts
+                        if regex.match(alias.lower())
+                    )
+                elif name in index.groups:
+                    found.append(name)
+                elif name.lower() in lowered:
+                    found.append(lowered[name.lower()])
+            if not found:
+                unmatched.append(item)
+            elif exclude:
+                for alias in found:
+                    selected.pop(alias, None)
+            else:
+                selected.update(dict.fromkeys(found))
+        return index.sort(selected), unmatched
 
     def get_host_info(self, hostname: str) -> Optional[Dict[str, str]]:
+        # Effective options for a listed host, including those inherited
+        # from wildcard blocks such as "Host *" (first match wins)
         if not self.hosts:
             self.parse_config()
 
-        return self.hosts.get(hostname)
+        if hostname not in self.hosts:
+            return None
+        if self._parsed is None or self._parsed.hosts is not self.hosts:
+            # Hosts were set without parsing: only their own options are known
+            return self.hosts.get(hostname)
+        return self._parsed.resolver.resolve(hostname)
 
     def get_all_hosts(self) -> List[str]:
-
-        if not self.hosts:
-            self.parse_config()
-
-        return sorted(
-            [host for host in self.hosts.keys() if not _is_pattern_host(host)],
-            key=natural_sort_key,
-        )
+        return list(self._host_index().sorted_hosts)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,39 @@
 #!/usr/bin/env python3
+import datetime
+import queue
 import subprocess
-from typing import Any, Dict, Optional
-
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from audit_log import (
+    ExecutionTimer,
+    format_json_entry,
+    format_text_entry,
+    get_audit_writer,
+    new_run_id,
+)
 from config import Config
+from host_facts import HOST_FACTS, build_facts_script, new_marker, parse_facts_output
+from output_spool import (
+    OutputSpool,
+    collect_capture_file,
+    discard_capture_file,
+    open_capture_file,
+)
+from preflight import ReachabilityProbe
+from rate_limiter import ConnectionRateLimiter
+from retry_policy import RetryPolicy, RetryQueue, classify_failure
+from ssh_config_parser import SSHConfigParser
+from ssh_multiplexer import ControlMasterPool
 
 
 class SSHExecutor:
     # Class for executing SSH commands
 
+    TEST_CONNECTION_COMMAND = 'echo "SSH connection test successful"'
+
     def __init__(
         self,
         ssh_config_path: Optional[str] = None,
@@ -16,6 +42,16 @@ class SSHExecutor:
         command_timeout: Optional[int] = None,
         batch_mode: Optional[bool] = None,
         strict_host_key_checking: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        multiplex: Optional[bool] = None,
+        log_format: Optional[str] = None,
+        connect_rate: Optional[float] = None,
+        connect_burst: Optional[int] = None,
+        rate_per_jump: Optional[bool] = None,
+        retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        preflight: Optional[bool] = None,
+        preflight_timeout: Optional[float] = None,
     ):
         # Args:
         #     ssh_config_path: Path to SSH config file. Default ~/.ssh/config.
@@ -23,6 +59,16 @@ class SSHExecutor:
         #     command_timeout: Command execution timeout.
         #     batch_mode: BatchMode usage flag.
         #     strict_host_key_checking: StrictHostKeyChecking flag.
+        #     max_workers: Number of hosts processed concurrently in batches.
+        #     multiplex: Reuse one ControlMaster connection per host.
+        #     log_format: Audit log format: "text", "jsonl" or "both".
+        #     connect_rate: New connections per second (None = unlimited).
+        #     connect_burst: Connections that may start at once.
+        #     rate_per_jump: Separate connection budget per ProxyJump host.
+        #     retries: Extra attempts after a transport failure in batches.
+        #     retry_backoff: Base backoff seconds between attempts.
+        #     preflight: TCP-probe all hosts of a batch before spawning ssh.
+        #     preflight_timeout: Probe timeout (capped at connect_timeout).
 
         self.ssh_config_path = Config.get_ssh_config_path(ssh_config_path)
         self.connect_timeout = (
@@ -41,6 +87,58 @@ class SSHExecutor:
             if strict_host_key_checking is None
             else strict_host_key_checking
         )
+        self.max_workers = self.resolve_max_workers(max_workers)
+        self.log_format = log_format or Config.LOG_FORMAT
+        # Host options for the connect timing check, parsed on first use
+        self._config_parser: Optional[SSHConfigParser] = None
+
+        if multiplex is None:
+            multiplex = Config.SSH_MULTIPLEX
+        self.control_pool = (
+            ControlMasterPool(self.ssh_config_path)
+            if multiplex and ControlMasterPool.is_supported()
+            else None
+        )
+
+        if connect_rate is None:
+            connect_rate = Config.SSH_CONNECT_RATE
+        if rate_per_jump is None:
+            rate_per_jump = Config.SSH_CONNECT_RATE_PER_JUMP
+        self.rate_limiter = (
+            ConnectionRateLimiter(
+                connect_rate,
+                connect_burst,
+                per_jump=rate_per_jump,
+                ssh_config_path=self.ssh_config_path,
+            )
+            if connect_rate
+            else None
+        )
+
+        if retries is None:
+            retries = Config.SSH_RETRIES
+        self.retry_policy = RetryPolicy(retries, retry_backoff) if retries > 0 else None
+
+        if preflight is None:
+            preflight = Config.SSH_PREFLIGHT
+        if preflight_timeout is None:
+            preflight_timeout = Config.SSH_PREFLIGHT_TIMEOUT
+        self.preflight = (
+            ReachabilityProbe(
+                self.ssh_config_path,
+                timeout=min(preflight_timeout, self.connect_timeout),
+            )
+            if preflight
+            else None
+        )
+
+    @staticmethod
+    def resolve_max_workers(max_workers: Optional[int] = None) -> int:
+        # Clamp worker count to 1..VALIDATION["max_concurrent_connections"]
+        if max_workers is None:
+            max_workers = Config.SSH_PARALLEL_WORKERS
+        limit = Config.VALIDATION["max_concurrent_connections"]
+        return max(1, min(int(max_workers), limit))
 
     @staticmethod
     def prepare_command_with_eof(command: str) -> str:
@@ -59,170 +157,624 @@ class SSHExecutor:
 
         return command
 
+    def build_ssh_command(self, hostname: str, command: str) -> List[str]:
+        # Build ssh argv for running command on hostname
+        ssh_cmd = [
+            "ssh",
+            "-F",
+            self.ssh_config_path,
+            "-o",
+            f"ConnectTimeout={self.connect_timeout}",
+        ]
+
+        if self.batch_mode:
+            ssh_cmd.extend(["-o", "BatchMode=yes"])
+        else:
+            ssh_cmd.extend(["-o", "BatchMode=no"])
+
+        ssh_cmd.extend(
+            [
+                "-o",
+                f'StrictHostKeyChecking={"yes" if self.strict_host_key_checking else "no"}',
+            ]
+        )
+
+        # Route through the host's multiplexed master connection
+        if self.control_pool is not None:
+            ssh_cmd.extend(self.control_pool.ssh_options(hostname))
+
+        ssh_cmd.append(hostname)
+
+        # Command preparation with EOF support
+        prepared_command = self.prepare_command_with_eof(command)
+
+        # Handle multiline commands
+        if "\n" in prepared_command:
+            # For multiline commands use bash -c with proper escaping
+            escaped_command = prepared_command.replace(
+                "'", "'\"'\"'"
+            )  # Escape single quotes
+            bash_command = f"bash -c '{escaped_command}'"
+            ssh_cmd.append(bash_command)
+        else:
+            # For single-line commands use normal method
+            ssh_cmd.append(prepared_command)
+
+        return ssh_cmd
+
+    @staticmethod
+    def make_result(
+        hostname: str,
+        command: str,
+        *,
+        success: bool = False,
+        output: str = "",
+        error: str = "",
+        return_code: int = -1,
+        output_file: Optional[str] = None,
+        error_file: Optional[str] = None,
+        output_bytes: int = 0,
+        error_bytes: int = 0,
+        timed_out: bool = False,
+    ) -> Dict[str, Any]:
+        # Result dict shared by every execution backend.
+        # output_file/error_file point at the full text when it exceeded
+        # SSH_OUTPUT_MEMORY_LIMIT; output/error then hold head/tail previews.
+        # run_id, the timing fields (see ExecutionTimer.finish) and
+        # failure_class are filled in once the run is over; attempts counts
+        # the tries a batch made (see retry_policy).
+        return {
+            "success": success,
+            "output": output,
+            "error": error,
+            "return_code": return_code,
+            "hostname": hostname,
+            "command": command,
+            "output_file": output_file,
+            "error_file": error_file,
+            "output_bytes": output_bytes,
+            "error_bytes": error_bytes,
+            "timed_out": timed_out,
+            "run_id": None,
+            "started_at": None,
+            "finished_at": None,
+            "duration": None,
+            "connect_time": None,
+            "failure_class": None,
+            "attempts": 1,
+        }
+
+    def _start_timer(self, hostname: str) -> ExecutionTimer:
+        # Connect time is only measured when enabled and the JSONL log will
+        # record it, and never on hosts with a LocalCommand of their own (the
+        # timing marker would replace it)
+        measure = (
+            Config.LOG_ENABLED
+            and Config.AUDIT_CONNECT_TIMING
+            and self.log_format in ("jsonl", "both")
+        )
+        return ExecutionTimer(
+            measure_connect=measure and not self._uses_local_command(hostname)
+        )
+
+    def _uses_local_command(self, hostname: str) -> bool:
+        if self._config_parser is None:
+            self._config_parser = SSHConfigParser(self.ssh_config_path)
+        info = self._config_parser.get_host_info(hostname) or {}
+        return "localcommand" in info or "permitlocalcommand" in info
+
+    def _finish_result(
+        self,
+        result: Dict[str, Any],
+        timer: ExecutionTimer,
+        run_id: Optional[str],
+    ) -> Dict[str, Any]:
+        # Attach run id, timing and failure class, then write the audit entry
+        result.update(timer.finish(), run_id=run_id)
+        result["failure_class"] = classify_failure(result)
+        self._log_command(result["hostname"], result["command"], result)
+        return result
+
+    def _preflight_failures(
+        self,
+        unreachable: Dict[str, str],
+        command: str,
+        timer: ExecutionTimer,
+        run_id: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        # Results (and audit entries) for hosts the pre-flight probe could not
+        # reach; exit code 255 like ssh's own connection errors
+        return [
+            self._finish_result(
+                self.make_result(hostname, command, return_code=255, error=error),
+                timer,
+                run_id,
+            )
+            for hostname, error in unreachable.items()
+        ]
+
     def execute_command(
-        self, hostname: str, command: str, timeout: Optional[int] = None
+        self,
+        hostname: str,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        run_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         effective_timeout = timeout if timeout is not None else self.command_timeout
 
+        # Time spent waiting for a connection slot is not part of the timing
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(hostname)
+        timer = self._start_timer(hostname)
+        captures = []
         try:
-            # Build SSH command
-            ssh_cmd = [
-                "ssh",
-                "-F",
-                self.ssh_config_path,
-                "-o",
-                f"ConnectTimeout={self.connect_timeout}",
+            ssh_cmd = timer.wrap(self.build_ssh_command(hostname, command))
+
+            # Output goes to files, not pipes, so memory stays flat however
+            # much a host prints; see SSH_OUTPUT_MEMORY_LIMIT
+            captures = [
+                open_capture_file(hostname, "stdout"),
+                open_capture_file(hostname, "stderr"),
             ]
+            (stdout_file, stdout_path), (stderr_file, stderr_path) = captures
 
-            if self.batch_mode:
-                ssh_cmd.extend(["-o", "BatchMode=yes"])
-            else:
-                ssh_cmd.extend(["-o", "BatchMode=no"])
+            process = subprocess.run(
+                ssh_cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                timeout=effective_timeout,
+            )
 
-            ssh_cmd.extend(
-                [
-                    "-o",
-                    f'StrictHostKeyChecking={"yes" if self.strict_host_key_checking else "no"}',
-                    hostname,
-                ]
+            captures = []
+            output = collect_capture_file(stdout_file, stdout_path)
+            error = collect_capture_file(stderr_file, stderr_path)
+            result = self.make_result(
+                hostname,
+                command,
+                success=process.returncode == 0,
+                output=output["text"],
+                error=error["text"],
+                return_code=process.returncode,
+                output_file=output["path"],
+                error_file=error["path"],
+                output_bytes=output["bytes"],
+                error_bytes=error["bytes"],
             )
 
-            # Command preparation with EOF support
-            prepared_command = self.prepare_command_with_eof(command)
-
-            # Handle multiline commands
-            if "\n" in prepared_command:
-                # For multiline commands use bash -c with proper escaping
-                escaped_command = prepared_command.replace(
-                    "'", "'\"'\"'"
-                )  # Escape single quotes
-                bash_command = f"bash -c '{escaped_command}'"
-                ssh_cmd.append(bash_command)
-            else:
-                # For single-line commands use normal method
-                ssh_cmd.append(prepared_command)
+        except subprocess.TimeoutExpired:
+            result = self.make_result(
+                hostname,
+                command,
+                error=f"Command execution timeout ({effective_timeout}s)",
+                timed_out=True,
+            )
 
-            process = subprocess.run(
-                ssh_cmd,
-                capture_output=True,
+        except FileNotFoundError:
+            result = self.make_result(
+                hostname,
+                command,
+                error="SSH client not found. Make sure OpenSSH is installed.",
+            )
+
+        except Exception as e:
+            result = self.make_result(
+                hostname, command, error=f"Unexpected error: {str(e)}"
+            )
+
+        finally:
+            for fileobj, path in captures:
+                discard_capture_file(fileobj, path)
+
+        return self._finish_result(result, timer, run_id)
+
+    def stream_command(
+        self,
+        hostname: str,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_retained_bytes: Optional[int] = None,
+        run_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        # Execute command, yielding output lines as they arrive.
+        # Yields {"hostname", "stream": "stdout"|"stderr", "line"} events and
+        # finally {"hostname", "stream": "result", "result": <result dict>}.
+        # Up to max_retained_bytes per stream are kept in memory for the
+        # result; anything beyond that is spilled to output_file/error_file.
+        effective_timeout = timeout if timeout is not None else self.command_timeout
+
+        spools = {
+            "stdout": OutputSpool(hostname, "stdout", max_retained_bytes),
+            "stderr": OutputSpool(hostname, "stderr", max_retained_bytes),
+        }
+        timed_out = False
+        process = None
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(hostname)
+        timer = self._start_timer(hostname)
+
+        try:
+            process = subprocess.Popen(
+                timer.wrap(self.build_ssh_command(hostname, command)),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=effective_timeout,
                 encoding="utf-8",
                 errors="replace",
+                bufsize=1,
             )
 
-            result = {
-                "success": process.returncode == 0,
-                "output": process.stdout.strip() if process.stdout else "",
-                "error": process.stderr.strip() if process.stderr else "",
-                "return_code": process.returncode,
-                "hostname": hostname,
-                "command": command,
-            }
-            self._log_command(hostname, command, result)
-            return result
-
-        except subprocess.TimeoutExpired:
-            result = {
-                "success": False,
-                "output": "",
-                "error": f"Command execution timeout ({effective_timeout}s)",
-                "return_code": -1,
-                "hostname": hostname,
-                "command": command,
-            }
-            self._log_command(hostname, command, result)
-            return result
+            # One reader per pipe so neither can fill up and block ssh
+            lines: "queue.Queue" = queue.Queue()
+
+            def read_pipe(stream_name: str, pipe) -> None:
+                try:
+                    for line in pipe:
+                        lines.put((stream_name, line.rstrip("\r\n")))
+                finally:
+                    pipe.close()
+                    lines.put((stream_name, None))
+
+            for stream_name, pipe in (
+                ("stdout", process.stdout),
+                ("stderr", process.stderr),
+            ):
+                reader = threading.Thread(target=read_pipe, args=(stream_name, pipe))
+                reader.daemon = True
+                reader.start()
+
+            deadline = time.monotonic() + effective_timeout
+            open_pipes = 2
+            while open_pipes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if not timed_out:
+                        timed_out = True
+                        process.kill()
+                    elif remaining < -5:
+                        break  # A grandchild still holds the pipes; stop waiting
+                try:
+                    stream_name, line = lines.get(timeout=max(remaining, 0.1))
+                except queue.Empty:
+                    continue
+                if line is None:
+                    open_pipes -= 1
+                    continue
+
+                spools[stream_name].write(line + "\n")
+                yield {"hostname": hostname, "stream": stream_name, "line": line}
+
+            process.wait()
+
+            output = spools["stdout"].finish()
+            error = spools["stderr"].finish()
+            if timed_out:
+                # Keep what was printed before the deadline
+                result = self.make_result(
+                    hostname,
+                    command,
+                    output=output["text"],
+                    error=f"Command execution timeout ({effective_timeout}s)",
+                    output_file=output["path"],
+                    error_file=error["path"],
+                    output_bytes=output["bytes"],
+                    error_bytes=error["bytes"],
+                    timed_out=True,
+                )
+            else:
+                result = self.make_result(
+                    hostname,
+                    command,
+                    success=process.returncode == 0,
+                    output=output["text"],
+                    error=error["text"],
+                    return_code=process.returncode,
+                    output_file=output["path"],
+                    error_file=error["path"],
+                    output_bytes=output["bytes"],
+                    error_bytes=error["bytes"],
+                )
+            spools = {}
 
         except FileNotFoundError:
-            result = {
-                "success": False,
-                "output": "",
-                "error": "SSH client not found. Make sure OpenSSH is installed.",
-                "return_code": -1,
-                "hostname": hostname,
-                "command": command,
-            }
-            self._log_command(hostname, command, result)
-            return result
+            result = self.make_result(
+                hostname,
+                command,
+                error="SSH client not found. Make sure OpenSSH is installed.",
+            )
 
         except Exception as e:
-            result = {
-                "success": False,
-                "output": "",
-                "error": f"Unexpected error: {str(e)}",
-                "return_code": -1,
-                "hostname": hostname,
-                "command": command,
-            }
-            self._log_command(hostname, command, result)
-            return result
+            result = self.make_result(
+                hostname, command, error=f"Unexpected error: {str(e)}"
+            )
+
+        finally:
+            # Consumer stopped early or an error occurred: do not leave ssh behind
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+            for spool in spools.values():
+                spool.discard()
+
+        result = self._finish_result(result, timer, run_id)
+        yield {"hostname": hostname, "stream": "result", "result": result}
+
+    def execute_command_streaming(
+        self,
+        hostname: str,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_retained_bytes: Optional[int] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        # Like execute_command, but hands each output line to on_line live
+        for event in self.stream_command(
+            hostname,
+            command,
+            timeout,
+            max_retained_bytes=max_retained_bytes,
+            run_id=run_id,
+        ):
+            if event["stream"] == "result":
+                return event["result"]
+            if on_line is not None:
+                on_line(event)
+        return self.make_result(hostname, command, error="No result produced")
+
+    def close(self) -> None:
+        # Tear down multiplexed master connections, if any
+        if self.control_pool is not None:
+            self.control_pool.close_all()
 
     def _log_command(self, hostname: str, command: str, result: Dict[str, Any]) -> None:
-        # Log executed command using configuration settings
+        # Log executed command using configuration settings.
+        # Entries are handed to the background audit writer, so no file is
+        # opened on the calling thread.
         if not Config.LOG_ENABLED:
             return
-        try:
-            import datetime
-
-            # Ensure log directory exists
-            Config.ensure_log_dir()
-
-            # Resolve log file path
-            log_file = Config.get_log_file_path()
+        now = datetime.datetime.now()
+        writer = get_audit_writer()
+        if self.log_format in ("text", "both"):
+            writer.write(format_text_entry(now, hostname, command, result), now)
+        if self.log_format in ("jsonl", "both"):
+            writer.write(format_json_entry(hostname, command, result), now, "jsonl")
+
+    def iter_command_batch(
+        self,
+        hostnames: List[str],
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_workers: Optional[int] = None,
+        delay: int = 0,
+        stop_event: Optional[threading.Event] = None,
+        on_line: Optional[Callable[[Dict[str, Any]], None]] = None,
+        run_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        # Execute command on hosts, yielding each result as soon as it completes.
+        # Args:
+        #     hostnames: Host aliases to run on.
+        #     command: Command to execute.
+        #     timeout: Command timeout override.
+        #     max_workers: Concurrency override (capped by max_concurrent_connections).
+        #     delay: Pause between hosts in seconds; forces one host at a time.
+        #     stop_event: When set, no new hosts are started; running ones finish.
+        #     on_line: Receives stream_command line events live (from workers).
+        #     run_id: Audit log id shared by the batch's hosts (default: new).
+        # Transport failures are retried per self.retry_policy; each result
+        # records its number of attempts. With self.preflight, hosts that do
+        # not accept a TCP connection fail first, without spawning ssh.
+        hostnames = list(hostnames)
+        workers = (
+            self.resolve_max_workers(max_workers)
+            if max_workers is not None
+            else self.max_workers
+        )
+        run_id = run_id or new_run_id()
+
+        if self.preflight is not None and hostnames:
+            timer = ExecutionTimer()
+            unreachable = self.preflight.probe(hostnames)
+            if unreachable:
+                yield from self._preflight_failures(unreachable, command, timer, run_id)
+                hostnames = [host for host in hostnames if host not in unreachable]
+
+        def run_one(hostname: str, attempt: int = 1) -> Dict[str, Any]:
+            if on_line is not None:
+                result = self.execute_command_streaming(
+                    hostname, command, timeout, on_line=on_line, run_id=run_id
+                )
+            else:
+                result = self.execute_command(hostname, command, timeout, run_id=run_id)
+            result["attempts"] = attempt
+            return result
 
-            # Compose log entry
-            timestamp = datetime.datetime.now().strftime(Config.LOG_TIMESTAMP_FORMAT)
-            log_entry = (
-                f"[{timestamp}] HOST: {hostname} | "
-                f"CMD: {command} | "
-                f"SUCCESS: {result['success']} | "
-                f"RC: {result['return_code']}"
-            )
+        def run_serial(hostname: str, attempt: int = 1) -> Dict[str, Any]:
+            # As with future.result() below: an error running one host is
+            # that host's failed result, not the end of the batch
+            try:
+                return run_one(hostname, attempt)
+            except Exception as e:
+                return self.make_result(
+                    hostname, command, error=f"Unexpected error: {str(e)}"
+                )
 
-            # Append to log file
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
+        if delay > 0 or workers <= 1 or len(hostnames) <= 1:
+            for idx, hostname in enumerate(hostnames):
+                if stop_event is not None and stop_event.is_set():
+                    return
+                attempt = 1
+                result = run_serial(hostname)
+                # Serial anyway: retries simply wait their turn here
+                while self.retry_policy is not None and self.retry_policy.should_retry(
+                    result, attempt
+                ):
+                    backoff = self.retry_policy.delay(attempt)
+                    if stop_event is not None:
+                        if stop_event.wait(backoff):
+                            break
+                    else:
+                        time.sleep(backoff)
+                    attempt += 1
+                    result = run_serial(hostname, attempt)
+                yield result
+
+                # Add delay between hosts (but not after the last host)
+                if delay > 0 and idx < len(hostnames) - 1:
+                    if stop_event is not None:
+                        if stop_event.wait(delay):
+                            return
+                    else:
+                        time.sleep(delay)
+            return
 
-        except Exception as e:
-            # If logging fails, print the error to stderr for debugging
-            import sys
+        pool = ThreadPoolExecutor(
+            max_workers=min(workers, len(hostnames)), thread_name_prefix="ssh-exec"
+        )
+        pending_hosts = iter(hostnames)
+        in_flight = {}
+        # Hosts waiting for a retry do not occupy a worker meanwhile
+        retries = RetryQueue(self.retry_policy)
+
+        def submit_next() -> bool:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            ready = retries.pop_ready()
+            if ready is None:
+                hostname = next(pending_hosts, None)
+                if hostname is None:
+                    return False
+                ready = (hostname, 1)
+            future = pool.submit(run_one, *ready)
+            in_flight[future] = ready
+            return True
 
-            print(f"Logging failed in _log_command: {e}", file=sys.stderr)
+        try:
+            while True:
+                # Keep at most `workers` hosts in flight so a stop request
+                # takes effect
+                while len(in_flight) < workers and submit_next():
+                    pass
+                if not in_flight:
+                    if not retries:
+                        break
+                    if stop_event is not None and stop_event.is_set():
+                        # Stopped before the retries started: report the
+                        # failures they would have replaced
+                        yield from retries.drain()
+                        break
+                    if stop_event is not None:
+                        stop_event.wait(retries.next_delay())
+                    else:
+                        time.sleep(retries.next_delay())
+                    continue
+
+                done, _ = wait(
+                    in_flight, timeout=retries.next_delay(), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    hostname, attempt = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self.make_result(
+                            hostname, command, error=f"Unexpected error: {str(e)}"
+                        )
+                    if not retries.schedule(hostname, attempt, result):
+                        yield result
+                    # Refill only after the consumer has seen the result, so
+                    # a stop or abort it triggers starts no further host
+                    while len(in_flight) < workers and submit_next():
+                        pass
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
     def execute_command_batch(
-        self, hostnames: list, command: str, timeout: Optional[int] = None
+        self,
+        hostnames: list,
+        command: str,
+        timeout: Optional[int] = None,
+        *,
+        max_workers: Optional[int] = None,
     ) -> Dict[str, Dict[str, Any]]:
-        results = {}
-
-        for hostname in hostnames:
-            results[hostname] = self.execute_command(hostname, command, timeout)
+        results = {
+            result["hostname"]: result
+            for result in self.iter_command_batch(
+                hostnames, command, timeout, max_workers=max_workers
+            )
+        }
 
-        return results
+        # Preserve the requested host order
+        return {hostname: results[hostname] for hostname in hostnames}
 
     def test_connection(self, hostname: str) -> Dict[str, Any]:
         return self.execute_command(
-            hostname,
-            'echo "SSH connection test successful"',
-            timeout=self.connect_timeout,
+            hostname, self.TEST_CONNECTION_COMMAND, timeout=self.connect_timeout
         )
 
-    def get_host_info(self, hostname: str) -> Dict[str, Any]:
-        commands = {
-            "hostname": "hostname",
-            "uptime": "uptime",
-            "os": "uname -a",
-            "whoami": "whoami",
-        }
+    def iter_connection_tests(
+        self,
+        hostnames: List[str],
+        *,
+        max_workers: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        # test_connection for many hosts, through the same bounded batch loop
+        # as commands (rate limit, pre-flight and retries apply); results are
+        # yielded as they complete (see connection_test for the summary)
+        return self.iter_command_batch(
+            hostnames,
+            self.TEST_CONNECTION_COMMAND,
+            self.connect_timeout,
+            max_workers=max_workers,
+            stop_event=stop_event,
+        )
 
-        results = {}
-        for key, cmd in commands.items():
-            result = self.execute_command(hostname, cmd, timeout=self.command_timeout)
-            results[key] = (
-                result["output"] if result["success"] else f"Error: {result['error']}"
-            )
+    def get_host_info(
+        self, hostname: str, facts: Optional[Iterable[str]] = None
+    ) -> Dict[str, str]:
+        # Host facts (default: all of HOST_FACTS) in one ssh session
+        facts = list(facts if facts is not None else HOST_FACTS)
+        marker = new_marker()
+        result = self.execute_command(
+            hostname, build_facts_script(facts, marker), timeout=self.command_timeout
+        )
+        return self._parse_host_facts(result, marker, facts)
 
-        return results
+    def iter_host_facts(
+        self,
+        hostnames: List[str],
+        facts: Optional[Iterable[str]] = None,
+        *,
+        max_workers: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> Iterator[Tuple[str, Dict[str, str]]]:
+        # (hostname, facts) for many hosts in one parallel pass, in
+        # completion order
+        facts = list(facts if facts is not None else HOST_FACTS)
+        marker = new_marker()
+        for result in self.iter_command_batch(
+            hostnames,
+            build_facts_script(facts, marker),
+            max_workers=max_workers,
+            stop_event=stop_event,
+        ):
+            yield result["hostname"], self._parse_host_facts(result, marker, facts)
+
+    @staticmethod
+    def _parse_host_facts(
+        result: Dict[str, Any], marker: str, facts: List[str]
+    ) -> Dict[str, str]:
+        # No section at all means ssh itself failed: every fact gets its error
+        if marker not in result["output"]:
+            error = result["error"].strip() or f"exit code {result['return_code']}"
+            return {fact: f"Error: {error}" for fact in facts}
+        return parse_facts_output(result["output"], marker, facts)
 
 
 def test_ssh_executor():
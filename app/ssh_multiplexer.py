@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# OpenSSH ControlMaster pool: one multiplexed master connection per host.
+
+import atexit
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+
+
+class ControlMasterPool:
+    # Tracks per-host ControlMaster sockets in a private directory.
+    #
+    # The first command to a host starts a master (ControlMaster=auto) that
+    # stays up for ControlPersist seconds; later commands reuse its socket and
+    # skip the TCP/key exchange/auth handshake. Idle masters exit by
+    # themselves once ControlPersist expires (ssh counts from the last
+    # session, so a master is never closed under a running command), and
+    # every master is closed on interpreter exit.
+
+    def __init__(
+        self,
+        ssh_config_path: str,
+        *,
+        control_persist: Optional[int] = None,
+    ):
+        # Args:
+        #     ssh_config_path: SSH config passed to `ssh -O exit`.
+        #     control_persist: ControlPersist seconds for new masters.
+        self.ssh_config_path = ssh_config_path
+        self.control_persist = (
+            control_persist
+            if control_persist is not None
+            else Config.SSH_CONTROL_PERSIST
+        )
+        self._control_dir: Optional[str] = None
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    @staticmethod
+    def is_supported() -> bool:
+        # Windows OpenSSH has no ControlMaster support
+        return os.name != "nt"
+
+    @property
+    def control_path(self) -> str:
+        # %C is a hash of (local host, remote host, port, user), so socket
+        # paths stay short enough for the unix socket length limit
+        with self._lock:
+            if self._control_dir is None:
+                # mkdtemp creates the directory with mode 0700
+                self._control_dir = tempfile.mkdtemp(
+                    prefix=Config.SSH_CONTROL_DIR_PREFIX
+                )
+            return os.path.join(self._control_dir, "%C")
+
+    def ssh_options(self, hostname: str) -> List[str]:
+        # ssh -o options that route a connection through the host's master
+        control_path = self.control_path
+        with self._lock:
+            self._last_used[hostname] = time.monotonic()
+        return [
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={control_path}",
+            "-o",
+            f"ControlPersist={self.control_persist}",
+        ]
+
+    def active_hosts(self) -> List[str]:
+        with self._lock:
+            return sorted(self._last_used)
+
+    def close_host(self, hostname: str) -> None:
+        with self._lock:
+            self._last_used.pop(hostname, None)
+        self._close_hosts([hostname])
+
+    def close_all(self) -> None:
+        # Close every master and remove the private socket directory
+        with self._lock:
+            hosts = list(self._last_used)
+            self._last_used.clear()
+            control_dir = self._control_dir
+            self._control_dir = None
+        if control_dir is None:
+            return
+        self._close_hosts(hosts, control_dir)
+        shutil.rmtree(control_dir, ignore_errors=True)
+
+    def _close_hosts(self, hosts: List[str], control_dir: Optional[str] = None):
+        control_dir = control_dir or self._control_dir
+        if control_dir is None:
+            return
+        control_path = os.path.join(control_dir, "%C")
+        for hostname in hosts:
+            try:
+                # Fails harmlessly if ControlPersist already expired the master
+                subprocess.run(
+                    [
+                        "ssh",
+                        "-F",
+                        self.ssh_config_path,
+                        "-o",
+                        f"ControlPath={control_path}",
+                        "-O",
+                        "exit",
+                        hostname,
+                    ],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=5,
+                )
+            except (OSError, subprocess.SubprocessError):
+                pass
@@ -0,0 +1,110 @@
+"""
+Benchmark for the command security checks on long scripts.
+
+Not collected by the test runner; run directly:
+    python3 tests/benchmark_config_security.py [pattern_count] [script_lines]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import command_analyzer  # noqa: E402
+from config import Config  # noqa: E402
+
+WORDS = ["echo", "grep", "awk", "tar", "cp", "mv", "cat", "sed", "find", "curl"]
+
+
+def make_patterns(count: int):
+    # The stock lists plus site-specific commands
+    dangerous = list(Config.SECURITY["dangerous_commands"])
+    confirm = list(Config.SECURITY["require_confirmation"])
+    for i in range(count):
+        dangerous.append(f"site-wipe-{i} --all")
+        confirm.append(f"site-ctl-{i}")
+    return dangerous, confirm
+
+
+def make_script(lines: int) -> str:
+    # A heredoc-style payload with nothing to report
+    rng = random.Random(42)
+    body = [
+        " ".join(rng.choice(WORDS) for _ in range(8)) + f" /srv/data/file{i}"
+        for i in range(lines)
+    ]
+    return "cat > /tmp/job.sh <<'EOF'\n" + "\n".join(body) + "\nEOF"
+
+
+def substring_checks(command, dangerous, confirm):
+    # The pre-regex implementation of both checks
+    command_lower = command.lower().strip()
+    is_dangerous = any(p.lower() in command_lower for p in dangerous)
+    needs_confirm = False
+    for pattern in confirm:
+        pattern_lower = pattern.lower()
+        if (
+            command_lower.startswith(pattern_lower)
+            or f" {pattern_lower}" in command_lower
+            or pattern_lower in command_lower
+        ):
+            needs_confirm = True
+            break
+    return is_dangerous, needs_confirm
+
+
+def compiled_checks(command):
+    # Uncached: analysis results are otherwise memoized per command string
+    command_analyzer._analyze.cache_clear()
+    return (
+        Config.check_dangerous_command(command)["is_dangerous"],
+        Config.requires_confirmation(command),
+    )
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    pattern_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    script_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    dangerous, confirm = make_patterns(pattern_count)
+    Config.SECURITY = {"dangerous_commands": dangerous, "require_confirmation": confirm}
+    script = make_script(script_lines)
+    print(
+        f"{len(dangerous) + len(confirm)} patterns, "
+        f"script of {script_lines} lines ({len(script)} bytes)\n"
+    )
+
+    compile_time, _ = timed(lambda: compiled_checks(""), 1)
+    print(f"compile: {compile_time * 1000:.1f} ms")
+
+    print(f"{'command':<12}{'substring ms':>14}{'compiled ms':>14}")
+    for name, command in (
+        ("short", "sudo systemctl restart nginx"),
+        ("script", script),
+        ("script+hit", script + "\nsite-ctl-499 reload"),
+    ):
+        old_time, expected = timed(
+            lambda: substring_checks(command, dangerous, confirm), 5
+        )
+        new_time, result = timed(lambda: compiled_checks(command), 5)
+        print(f"{name:<12}{old_time * 1000:>14.2f}{new_time * 1000:>14.2f}")
+        # "su" still matches inside words for the substring version
+        if name == "short":
+            assert result == expected, name
+
+
+if __name__ == "__main__":
+    main()
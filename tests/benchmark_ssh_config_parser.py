@@ -0,0 +1,103 @@
+"""
+Benchmark for SSH config host listing on a large synthetic config.
+
+Not collected by the test runner; run directly:
+    python3 tests/benchmark_ssh_config_parser.py [host_count]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from app.ssh_config_parser import (  # noqa: E402
+    HostResolver,
+    SSHConfigParser,
+    _is_pattern_host,
+    group_hosts_by_first_char,
+    natural_sort_key,
+)
+from config import Config  # noqa: E402
+
+PREFIXES = ["web", "db", "cache", "app", "lb", "mq", "k8s-node", "gw"]
+QUERIES = ["", "w", "web", "web-12", "db-4", "k8s", "gw-999", "zzz"]
+
+
+def make_config(host_count: int) -> str:
+    rng = random.Random(42)
+    lines = ["Host *", "    User default", ""]
+    for i in range(host_count):
+        alias = f"{rng.choice(PREFIXES)}-{i}"
+        lines += [
+            f"Host {alias}",
+            f"    HostName 10.{i // 65536}.{i // 256 % 256}.{i % 256}",
+        ]
+        if i % 1000 == 0:
+            lines += [f"Host {alias}-*", "    User pattern"]
+    return "\n".join(lines) + "\n"
+
+
+def linear_scan(hosts, prefix):
+    # The pre-index implementation of get_hosts_with_prefix
+    matched = [host for host in hosts if host.lower().startswith(prefix.lower())]
+    matched = [host for host in matched if not _is_pattern_host(host)]
+    return sorted(matched, key=natural_sort_key)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    host_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    Config.SSH_CONFIG_DISK_CACHE = False
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = Path(temp_dir) / "config"
+        config_path.write_text(make_config(host_count))
+
+        parser = SSHConfigParser(str(config_path))
+        parse_time, _ = timed(parser.parse_config, 1)
+        print(f"{host_count} hosts, parse + index: {parse_time * 1000:.1f} ms\n")
+
+        print(f"{'prefix':<10}{'matches':>8}{'linear ms':>12}{'index ms':>12}")
+        for prefix in QUERIES:
+            linear_time, expected = timed(lambda: linear_scan(parser.hosts, prefix), 3)
+            index_time, result = timed(lambda: parser.get_hosts_with_prefix(prefix), 20)
+            assert result == expected, prefix
+            print(
+                f"{prefix!r:<10}{len(result):>8}"
+                f"{linear_time * 1000:>12.2f}{index_time * 1000:>12.3f}"
+            )
+
+        # Full grouped listing, as loaded by the GUI and CLI
+        linear_time, expected = timed(
+            lambda: group_hosts_by_first_char(linear_scan(parser.hosts, "")), 3
+        )
+        index_time, result = timed(lambda: parser.get_grouped_hosts_with_prefix(""), 20)
+        assert result == expected
+        print(
+            f"\ngrouped listing: linear {linear_time * 1000:.2f} ms, "
+            f"index {index_time * 1000:.3f} ms"
+        )
+
+        # Effective config for every host on a cold resolver (no memoized results)
+        hosts = parser.get_all_hosts()
+        resolver = HostResolver(parser._parsed.blocks)
+        resolve_time, _ = timed(lambda: [resolver.resolve(h) for h in hosts], 1)
+        print(f"resolve {len(hosts)} hosts: {resolve_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Executor and clock doubles shared by the test modules."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from async_ssh_executor import AsyncSSHExecutor  # noqa: E402
+from ssh_executor import SSHExecutor  # noqa: E402
+
+
+class FakeClock:
+    """Clock that only moves when a test changes `now`."""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class _LocalShell:
+    """Runs "remote" commands in a local shell and counts the sessions.
+
+    The command sees the hostname as $HOST. Results are only written to the
+    audit log when the executor is created with audit=True.
+    """
+
+    def __init__(self, ssh_config_path="/dev/null", *, audit=False, **kwargs):
+        super().__init__(ssh_config_path, **kwargs)
+        self.audit = audit
+        self.sessions = 0
+        self._sessions_lock = threading.Lock()
+
+    def build_ssh_command(self, hostname, command):
+        with self._sessions_lock:
+            self.sessions += 1
+        return ["env", f"HOST={hostname}", "sh", "-c", command]
+
+    def _log_command(self, hostname, command, result):
+        if self.audit:
+            super()._log_command(hostname, command, result)
+
+
+class LocalExecutor(_LocalShell, SSHExecutor):
+    pass
+
+
+class LocalAsyncExecutor(_LocalShell, AsyncSSHExecutor):
+    pass
+
+
+class _Recorder:
+    """Answers commands without ssh and records what was started.
+
+    calls holds (hostname, command, timeout) per started command, peak the
+    most commands running at once. Each command takes `delay` seconds, or
+    durations[hostname]. Override answer() to change the canned result.
+    """
+
+    def __init__(
+        self, ssh_config_path="/dev/null", *, delay=0.0, durations=None, **kwargs
+    ):
+        super().__init__(ssh_config_path, **kwargs)
+        self.delay = delay
+        self.durations = durations or {}
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def started(self):
+        with self._lock:
+            return [call[0] for call in self.calls]
+
+    def answer(self, hostname, command, timeout):
+        # Hosts named bad* fail
+        failed = hostname.startswith("bad")
+        return self.make_result(
+            hostname,
+            command,
+            success=not failed,
+            return_code=1 if failed else 0,
+            output="ok",
+            error="failed" if failed else "",
+        )
+
+    def _start(self, hostname, command, timeout):
+        with self._lock:
+            self.calls.append((hostname, command, timeout))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        return self.durations.get(hostname, self.delay)
+
+    def _finish(self, hostname, command, timeout, run_id):
+        with self._lock:
+            self.active -= 1
+        result = self.answer(hostname, command, timeout)
+        result["run_id"] = run_id
+        return result
+
+    def _log_command(self, hostname, command, result):
+        pass
+
+
+class FakeExecutor(_Recorder, SSHExecutor):
+    """Thread-pool executor double; also records each batch in `batches`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def iter_command_batch(self, hostnames, command, timeout=None, **kwargs):
+        self.batches.append((list(hostnames), kwargs))
+        yield from super().iter_command_batch(hostnames, command, timeout, **kwargs)
+
+    def execute_command(self, hostname, command, timeout=None, *, run_id=None):
+        time.sleep(self._start(hostname, command, timeout))
+        return self._finish(hostname, command, timeout, run_id)
+
+
+class FakeAsyncExecutor(_Recorder, AsyncSSHExecutor):
+    async def execute_command_async(
+        self, hostname, command, timeout=None, *, run_id=None
+    ):
+        await asyncio.sleep(self._start(hostname, command, timeout))
+        return self._finish(hostname, command, timeout, run_id)
@@ -0,0 +1,118 @@
+import shutil
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from async_ssh_executor import AsyncSSHExecutor  # noqa: E402
+from config import Config  # noqa: E402
+from tests.helpers import LocalAsyncExecutor  # noqa: E402
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class AsyncSSHExecutorTests(unittest.TestCase):
+    def test_result_shape_matches_execute_command(self):
+        executor = LocalAsyncExecutor(max_workers=4)
+        results = list(
+            executor.iter_command_batch(["a", "b"], "echo out; echo err >&2; exit 3")
+        )
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(set(result), set(executor.make_result("a", "c")))
+            self.assertFalse(result["success"])
+            self.assertEqual(result["output"], "out")
+            self.assertEqual(result["error"], "err")
+            self.assertEqual(result["return_code"], 3)
+            self.assertEqual(result["output_bytes"], 4)
+            self.assertIsNotNone(result["duration"])
+        self.assertEqual(results[0]["run_id"], results[1]["run_id"])
+
+    def test_hosts_run_concurrently(self):
+        executor = LocalAsyncExecutor(max_workers=10)
+        start = time.monotonic()
+        results = list(
+            executor.iter_command_batch([f"h{i}" for i in range(10)], "sleep 0.3")
+        )
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r["success"] for r in results))
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_timeout_kills_straggler(self):
+        executor = LocalAsyncExecutor(command_timeout=1, max_workers=2)
+        start = time.monotonic()
+        results = list(executor.iter_command_batch(["a", "b"], "exec sleep 10"))
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(all("timeout" in r["error"] for r in results))
+
+    def test_stop_event_prevents_new_hosts(self):
+        executor = LocalAsyncExecutor(max_workers=2)
+        stop = threading.Event()
+        seen = []
+        for result in executor.iter_command_batch(
+            [f"h{i}" for i in range(8)], "sleep 0.1", stop_event=stop
+        ):
+            seen.append(result["hostname"])
+            stop.set()
+        # Only the two hosts already running finish
+        self.assertEqual(len(seen), 2)
+
+    def test_live_output_streams_on_the_event_loop(self):
+        executor = LocalAsyncExecutor(max_workers=4)
+        events = []
+        threads = set()
+
+        def on_line(event):
+            events.append(event)
+            threads.add(threading.current_thread().name)
+
+        results = list(
+            executor.iter_command_batch(
+                [f"h{i}" for i in range(4)],
+                "echo one; echo two >&2; printf last",
+                on_line=on_line,
+            )
+        )
+        # One loop thread, no fallback worker pool
+        self.assertEqual(threads, {"ssh-async"})
+        self.assertEqual(len(events), 12)
+        self.assertEqual(
+            sorted((e["stream"], e["line"]) for e in events if e["hostname"] == "h0"),
+            [("stderr", "two"), ("stdout", "last"), ("stdout", "one")],
+        )
+        for result in results:
+            self.assertEqual(result["output"], "one\nlast")
+            self.assertEqual(result["error"], "two")
+            self.assertTrue(result["success"])
+
+    def test_live_output_handles_long_lines_and_timeouts(self):
+        executor = LocalAsyncExecutor(command_timeout=1, max_workers=2)
+        lines = []
+        results = list(
+            executor.iter_command_batch(
+                ["a", "b"],
+                "head -c 200000 /dev/zero | tr '\\0' x; echo; echo done; exec sleep 10",
+                on_line=lambda event: lines.append(event["line"]),
+            )
+        )
+        self.assertEqual(sorted(len(line) for line in lines), [4, 4, 200000, 200000])
+        for result in results:
+            self.assertTrue(result["timed_out"])
+            self.assertEqual(result["output_bytes"], 200006)
+
+    def test_concurrency_cap_is_higher_than_thread_backend(self):
+        self.assertEqual(
+            AsyncSSHExecutor.resolve_max_workers(10**6),
+            Config.VALIDATION["max_async_connections"],
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,217 @@
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from audit_log import (  # noqa: E402
+    AuditLogWriter,
+    ExecutionTimer,
+    format_json_entry,
+)
+from config import Config  # noqa: E402
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import LocalExecutor  # noqa: E402
+
+
+class AuditLogWriterTests(unittest.TestCase):
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        patcher = mock.patch.object(Config, "LOG_DIR", log_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.log_dir = Path(log_dir.name)
+
+    def _read(self, date_str):
+        return Path(Config.get_log_file_path(date_str)).read_text().splitlines()
+
+    def test_entries_are_written_on_flush(self):
+        writer = AuditLogWriter(flush_interval=10)
+        self.addCleanup(writer.close)
+        when = datetime.datetime(2025, 1, 2, 3, 4, 5)
+
+        for i in range(100):
+            writer.write(f"line {i}", when)
+        self.assertTrue(writer.flush(timeout=5))
+
+        lines = self._read("2025-01-02")
+        self.assertEqual(lines, [f"line {i}" for i in range(100)])
+
+    def test_file_is_kept_open_and_rolled_over_by_date(self):
+        writer = AuditLogWriter(flush_interval=0)
+        self.addCleanup(writer.close)
+        day1 = datetime.datetime(2025, 1, 1, 23, 59, 59)
+        day2 = datetime.datetime(2025, 1, 2, 0, 0, 1)
+
+        with mock.patch("builtins.open", wraps=open) as opened:
+            writer.write("a", day1)
+            writer.flush(timeout=5)
+            writer.write("b", day1)
+            writer.flush(timeout=5)
+            writer.write("c", day2)
+            writer.flush(timeout=5)
+
+        self.assertEqual(opened.call_count, 2)
+        self.assertEqual(self._read("2025-01-01"), ["a", "b"])
+        self.assertEqual(self._read("2025-01-02"), ["c"])
+
+    def test_close_writes_pending_entries(self):
+        writer = AuditLogWriter(flush_interval=10)
+        when = datetime.datetime(2025, 3, 1)
+        writer.write("pending", when)
+        writer.close()
+
+        self.assertEqual(self._read("2025-03-01"), ["pending"])
+        writer.write("ignored", when)
+        self.assertEqual(self._read("2025-03-01"), ["pending"])
+
+    def test_log_command_does_not_block_on_disk(self):
+        writer = AuditLogWriter(flush_interval=0)
+        self.addCleanup(writer.close)
+        executor = SSHExecutor("/dev/null")
+        result = SSHExecutor.make_result("web-1", "uptime", success=True, return_code=0)
+
+        with mock.patch("ssh_executor.get_audit_writer", return_value=writer):
+            start = time.monotonic()
+            executor._log_command("web-1", "uptime", result)
+            self.assertLess(time.monotonic() - start, 0.5)
+        writer.flush(timeout=5)
+
+        (line,) = self._read(None)
+        self.assertIn("HOST: web-1 | CMD: uptime | SUCCESS: True | RC: 0", line)
+
+
+class JsonAuditLogTests(unittest.TestCase):
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        patcher = mock.patch.object(Config, "LOG_DIR", log_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.writer = AuditLogWriter(flush_interval=0)
+        self.addCleanup(self.writer.close)
+        patcher = mock.patch("ssh_executor.get_audit_writer", return_value=self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _read(self, extension):
+        self.writer.flush(timeout=5)
+        path = Path(Config.get_log_file_path(None, extension))
+        return path.read_text().splitlines() if path.exists() else []
+
+    def test_json_entry_fields(self):
+        result = SSHExecutor.make_result(
+            "web-1", "uptime", error="boom\nmore", return_code=255
+        )
+        result.update(
+            run_id="abc",
+            started_at=1700000000.0,
+            finished_at=1700000002.5,
+            duration=2.5,
+            connect_time=0.5,
+            output_bytes=10,
+            error_bytes=9,
+        )
+        entry = json.loads(format_json_entry("web-1", "uptime", result))
+
+        self.assertEqual(entry["run_id"], "abc")
+        self.assertEqual(entry["exec_time"], 2.0)
+        self.assertEqual(entry["stdout_bytes"], 10)
+        self.assertEqual(entry["stderr_bytes"], 9)
+        self.assertFalse(entry["timed_out"])
+        self.assertEqual(entry["error"], "boom")
+        self.assertTrue(entry["start"].startswith("2023-11-"))
+
+    @unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+    def test_batch_writes_both_formats_with_shared_run_id(self):
+        executor = LocalExecutor(audit=True, log_format="both", max_workers=2)
+        list(executor.iter_command_batch(["a", "b"], "printf 12345"))
+
+        self.assertEqual(len(self._read("log")), 2)
+        entries = [json.loads(line) for line in self._read("jsonl")]
+        self.assertEqual(sorted(e["host"] for e in entries), ["a", "b"])
+        self.assertEqual(len({e["run_id"] for e in entries}), 1)
+        for entry in entries:
+            self.assertEqual(entry["stdout_bytes"], 5)
+            self.assertGreaterEqual(entry["duration"], 0)
+            self.assertIsNone(entry["connect_time"])
+
+    @unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+    def test_timeout_is_flagged(self):
+        executor = LocalExecutor(audit=True, log_format="jsonl", command_timeout=1)
+        result = executor.execute_command("a", "exec sleep 5")
+
+        self.assertTrue(result["timed_out"])
+        (line,) = self._read("jsonl")
+        self.assertTrue(json.loads(line)["timed_out"])
+        self.assertEqual(self._read("log"), [])
+
+
+@unittest.skipIf(os.name == "nt", "LocalCommand timing is POSIX only")
+class ExecutionTimerTests(unittest.TestCase):
+    def test_connect_marker_splits_duration(self):
+        timer = ExecutionTimer(measure_connect=True)
+        argv = timer.wrap(["ssh", "-F", "cfg", "web-1", "uptime"])
+
+        self.assertEqual(argv[:3], ["ssh", "-o", "PermitLocalCommand=yes"])
+        marker = argv[4].split("touch ", 1)[1].strip("'")
+        time.sleep(0.05)
+        Path(marker).touch()  # What ssh's LocalCommand does once connected
+        time.sleep(0.05)
+
+        timing = timer.finish()
+        self.assertGreater(timing["connect_time"], 0)
+        self.assertLess(timing["connect_time"], timing["duration"])
+        self.assertFalse(os.path.exists(marker))
+
+    def test_non_ssh_commands_are_not_wrapped(self):
+        timer = ExecutionTimer(measure_connect=True)
+        self.assertEqual(timer.wrap(["sh", "-c", "true"]), ["sh", "-c", "true"])
+        self.assertIsNone(timer.finish()["connect_time"])
+
+
+class ConnectTimingOptInTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = Path(tmp.name) / "config"
+        self.config.write_text(
+            "Host plain\n    HostName 10.0.0.1\n"
+            "Host notify\n    LocalCommand notify-send %h\n"
+            "Host allowed\n    PermitLocalCommand no\n"
+        )
+        patcher = mock.patch.object(Config, "SSH_CONFIG_DISK_CACHE", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def measured(self, hostname):
+        executor = SSHExecutor(str(self.config), log_format="jsonl")
+        return executor._start_timer(hostname).measure_connect
+
+    def test_off_by_default(self):
+        self.assertFalse(Config.AUDIT_CONNECT_TIMING)
+        self.assertFalse(self.measured("plain"))
+
+    @unittest.skipIf(os.name == "nt", "LocalCommand timing is POSIX only")
+    def test_hosts_with_their_own_local_command_are_skipped(self):
+        with mock.patch.object(Config, "AUDIT_CONNECT_TIMING", True):
+            self.assertTrue(self.measured("plain"))
+            self.assertFalse(self.measured("notify"))
+            self.assertFalse(self.measured("allowed"))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
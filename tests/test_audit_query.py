@@ -0,0 +1,137 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from audit_query import AuditLogIndex  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def text_entry(ts, host, command, success=True, rc=0):
+    return f"[{ts}] HOST: {host} | CMD: {command} | SUCCESS: {success} | RC: {rc}\n"
+
+
+def json_entry(host, start, end=None, command="uptime"):
+    entry = {
+        "run_id": "r1",
+        "host": host,
+        "command": command,
+        "success": True,
+        "return_code": 0,
+        "start": f"{start}.000+00:00",
+        "end": f"{end}.000+00:00" if end else None,
+    }
+    return json.dumps(entry) + "\n"
+
+
+class AuditLogIndexTests(unittest.TestCase):
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        patcher = mock.patch.object(Config, "LOG_DIR", log_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self._append(
+            "2025-01-01",
+            text_entry("2025-01-01 10:00:00", "web-1", "uptime")
+            + text_entry("2025-01-01 10:00:01", "web-2", "ps aux | grep nginx")
+            + text_entry("2025-01-01 10:00:02", "db-1", "false", False, 1),
+        )
+        self._append(
+            "2025-02-01",
+            text_entry("2025-02-01 09:00:00", "web-1", "cat <<EOF\nline\nEOF"),
+        )
+        self.index = AuditLogIndex()
+        self.addCleanup(self.index.close)
+
+    def _append(self, date, text, extension="log"):
+        path = Path(Config.get_log_file_path(date, extension))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_filters(self):
+        self.assertEqual(len(self.index.query()), 4)
+        self.assertEqual(
+            [e["command"] for e in self.index.query(host="web-1")],
+            ["uptime", "cat <<EOF\nline\nEOF"],
+        )
+        self.assertEqual(len(self.index.query(host="web-*")), 3)
+        self.assertEqual(
+            [e["host"] for e in self.index.query(command="nginx")], ["web-2"]
+        )
+        (failed,) = self.index.query(success=False)
+        self.assertEqual((failed["host"], failed["return_code"]), ("db-1", 1))
+        self.assertEqual(len(self.index.query(since="2025-01-15")), 1)
+        self.assertEqual(len(self.index.query(until="2025-01-01")), 3)
+        self.assertEqual(
+            [e["timestamp"] for e in self.index.query(limit=2)],
+            ["2025-01-01 10:00:02", "2025-02-01 09:00:00"],
+        )
+
+    def test_only_appended_data_is_parsed(self):
+        self.index.update()
+        self.assertEqual(self.index.update(), 0)
+
+        # An entry still being written is indexed once it is complete
+        entry = text_entry("2025-02-01 09:30:00", "web-3", "echo a\necho b")
+        first, rest = entry[:40], entry[40:]
+        self._append("2025-02-01", first)
+        self.assertEqual(self.index.update(), 0)
+        self._append("2025-02-01", rest)
+        self.assertEqual(self.index.update(), 1)
+        self.assertEqual(self.index.query(host="web-3")[0]["command"], "echo a\necho b")
+
+    def test_truncated_file_is_reindexed(self):
+        self.index.update()
+        Path(Config.get_log_file_path("2025-01-01")).write_text(
+            text_entry("2025-01-01 11:00:00", "new-1", "id")
+        )
+        self.assertEqual(
+            [e["host"] for e in self.index.query(until="2025-01-01")], ["new-1"]
+        )
+
+    def test_jsonl_is_indexed_next_to_text_logs(self):
+        self._append("2025-03-01", json_entry("api-1", "2025-03-01T08:00:00"), "jsonl")
+        # Switched to JSON Lines later on a day with a text log
+        self._append("2025-01-01", json_entry("api-2", "2025-01-01T12:00:00"), "jsonl")
+
+        self.assertEqual(
+            [(e["host"], e["run_id"]) for e in self.index.query(host="api-*")],
+            [("api-2", "r1"), ("api-1", "r1")],
+        )
+        self.assertEqual(
+            self.index.query(host="api-1")[0]["timestamp"], "2025-03-01 08:00:00"
+        )
+        self.assertEqual(len(self.index.query(until="2025-01-01")), 4)
+
+    def test_runs_logged_in_both_formats_are_listed_once(self):
+        # The text entry is written just after the run ends
+        self._append(
+            "2025-01-01",
+            text_entry("2025-01-01 10:00:06", "web-1", "uptime"),
+        )
+        self._append(
+            "2025-01-01",
+            json_entry("web-1", "2025-01-01T10:00:03", "2025-01-01T10:00:05"),
+            "jsonl",
+        )
+
+        entries = self.index.query(host="web-1", until="2025-01-01")
+        self.assertEqual(
+            [(e["timestamp"], e["run_id"]) for e in entries],
+            [("2025-01-01 10:00:00", None), ("2025-01-01 10:00:03", "r1")],
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
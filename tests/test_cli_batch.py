@@ -0,0 +1,194 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import command_executor_cli_app as cli_app  # noqa: E402
+from async_ssh_executor import EXECUTOR_BACKENDS  # noqa: E402
+from cli_args import parse_args  # noqa: E402
+from config import Config  # noqa: E402
+from ssh_config_parser import clear_parse_cache  # noqa: E402
+from tests.helpers import FakeExecutor  # noqa: E402
+
+
+class RunBatchTests(unittest.TestCase):
+    def setUp(self):
+        config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(config_dir.cleanup)
+        self.config_path = Path(config_dir.name) / "config"
+        self.config_path.write_text(
+            "".join(
+                f"Host {name}\n  HostName 10.0.0.{i}\n"
+                for i, name in enumerate(
+                    ["web-1", "web-2", "web-3", "db-1", "bad-1"], 1
+                )
+            )
+        )
+        self.executors = []
+        for patcher in (
+            mock.patch.object(Config, "SSH_CONFIG_DISK_CACHE", False),
+            mock.patch.dict(EXECUTOR_BACKENDS, {"thread": self.make_executor}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        clear_parse_cache()
+        self.addCleanup(clear_parse_cache)
+
+    def make_executor(self, **kwargs):
+        executor = FakeExecutor(**kwargs)
+        self.executors.append(executor)
+        return executor
+
+    def run_batch(self, *argv):
+        args = parse_args(["--config", str(self.config_path), *argv])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = cli_app.run_batch(args)
+        return status, output.getvalue()
+
+    def executed(self):
+        return sorted(self.executors[0].started)
+
+    def test_hosts_and_prefix_are_combined(self):
+        status, _ = self.run_batch(
+            "--run", "uptime", "--hosts", "web-[1-2]", "--prefix", "db", "-P", "3"
+        )
+        self.assertEqual(status, cli_app.EXIT_OK)
+        self.assertEqual(self.executed(), ["db-1", "web-1", "web-2"])
+        self.assertEqual(self.executors[0].max_workers, 3)
+
+    def test_failed_host_sets_exit_status(self):
+        status, output = self.run_batch("--run", "uptime", "--hosts", "web-1,bad-*")
+        self.assertEqual(status, cli_app.EXIT_FAILED)
+        self.assertIn("bad-1", output)
+
+    def test_unknown_hosts_are_rejected_before_running(self):
+        status, output = self.run_batch("--run", "uptime", "--hosts", "web-1,web-9")
+        self.assertEqual(status, cli_app.EXIT_USAGE)
+        self.assertIn("web-9", output)
+        self.assertEqual(self.executors, [])
+
+    def test_confirmation_requires_yes(self):
+        status, _ = self.run_batch("--run", "systemctl restart x", "--hosts", "web-1")
+        self.assertEqual(status, cli_app.EXIT_REFUSED)
+        self.assertEqual(self.executors, [])
+
+        status, _ = self.run_batch(
+            "--run", "systemctl restart x", "--hosts", "web-1", "--yes"
+        )
+        self.assertEqual(status, cli_app.EXIT_OK)
+
+    def test_dangerous_command_is_blocked_even_with_yes(self):
+        status, _ = self.run_batch("--run", "rm -rf /", "--hosts", "web-1", "--yes")
+        self.assertEqual(status, cli_app.EXIT_REFUSED)
+
+    def test_jsonl_records_go_to_stdout_and_messages_to_stderr(self):
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            status, output = self.run_batch(
+                "--run", "uptime", "--hosts", "web-*", "--output-format", "jsonl"
+            )
+        self.assertEqual(status, cli_app.EXIT_OK)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(
+            sorted(r["host"] for r in records), ["web-1", "web-2", "web-3"]
+        )
+        self.assertIn("EXECUTION SUMMARY", errors.getvalue())
+
+    def test_group_output_shows_each_distinct_result_once(self):
+        status, output = self.run_batch(
+            "--run", "uptime", "--hosts", "web-*,bad-1", "--group-output"
+        )
+        self.assertEqual(status, cli_app.EXIT_FAILED)
+        self.assertIn("Distinct results: 2", output)
+        self.assertIn("3 hosts: web-[1-3] (RC 0)", output)
+        self.assertIn("1 host: bad-1 (RC 1)", output)
+        self.assertEqual(output.count("ok\n"), 2)  # Once per group
+
+    def test_group_output_writes_one_record_per_group(self):
+        with redirect_stderr(io.StringIO()):
+            _, output = self.run_batch(
+                "--run",
+                "uptime",
+                "--hosts",
+                "web-*",
+                "--output-format",
+                "jsonl",
+                "--group-output",
+            )
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["host_count"], 3)
+
+    def test_rolling_run_aborts_on_failure_threshold(self):
+        status, output = self.run_batch(
+            "--run",
+            "uptime",
+            "--hosts",
+            "bad-1,web-*",
+            "--batch-size",
+            "1",
+            "--max-failures",
+            "0",
+        )
+        self.assertEqual(status, cli_app.EXIT_FAILED)
+        self.assertIn("EXECUTION SUMMARY (Aborted)", output)
+        self.assertIn("Not started: web-[1-3]", output)
+        self.assertEqual(self.executed(), ["bad-1"])
+
+    def test_sudo_and_command_from_stdin(self):
+        with mock.patch("sys.stdin", io.StringIO("uptime\n")):
+            status, _ = self.run_batch(
+                "--run", "-", "--hosts", "web-1", "--sudo", "--yes"
+            )
+        self.assertEqual(status, cli_app.EXIT_OK)
+        self.assertEqual(
+            [call[:2] for call in self.executors[0].calls], [("web-1", "sudo uptime")]
+        )
+
+
+class BatchArgumentTests(unittest.TestCase):
+    def assertArgumentError(self, argv):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(argv)
+
+    def test_run_needs_a_host_selection(self):
+        self.assertArgumentError(["--run", "uptime"])
+
+    def test_batch_options_need_run(self):
+        self.assertArgumentError(["--hosts", "web-1"])
+        self.assertArgumentError(["--yes"])
+
+    def test_rolling_options_are_validated(self):
+        self.assertArgumentError(["--batch-size", "0"])
+        self.assertArgumentError(["--batch-size", "200%"])
+        self.assertArgumentError(["--max-failures", "many"])
+        self.assertArgumentError(["--batch-pause", "5"])
+        self.assertArgumentError(["--batch-size", "5", "--delay", "3"])
+        args = parse_args(["--batch-size", "25%", "--max-failures", "2"])
+        self.assertEqual((args.batch_size, args.max_failures), ("25%", "2"))
+
+    def test_make_rollout_reads_the_parsed_options(self):
+        self.assertIsNone(cli_app.make_rollout(parse_args([])))
+        rollout = cli_app.make_rollout(
+            parse_args(["--batch-size", "5", "--batch-pause", "2"])
+        )
+        self.assertEqual((rollout.batch_size, rollout.pause), ("5", 2))
+
+    def test_run_cannot_use_gui(self):
+        self.assertArgumentError(["--run", "uptime", "--prefix", "web", "--gui"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
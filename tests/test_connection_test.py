@@ -0,0 +1,144 @@
+import contextlib
+import io
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import command_executor_cli_app as cli_app  # noqa: E402
+from connection_test import (  # noqa: E402
+    AUTH_FAILED,
+    REACHABLE,
+    UNREACHABLE,
+    ConnectionTestSummary,
+    connection_status,
+    format_connection_result,
+)
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import FakeExecutor  # noqa: E402
+
+ERRORS = {
+    "down": "ssh: connect to host down port 22: Connection refused",
+    "locked": "deploy@locked: Permission denied (publickey).",
+}
+
+
+class ConnectionExecutor(FakeExecutor):
+    """Answers test connections after a short sleep; see ERRORS."""
+
+    def __init__(self, **kwargs):
+        super().__init__(delay=0.05, **kwargs)
+
+    def answer(self, hostname, command, timeout):
+        prefix = hostname.split("-")[0]
+        if prefix in ERRORS:
+            result = self.make_result(
+                hostname, command, return_code=255, error=ERRORS[prefix]
+            )
+        else:
+            result = super().answer(hostname, command, timeout)
+        result["duration"] = 0.042
+        return result
+
+
+def make_result(hostname, return_code, error="", **kwargs):
+    result = SSHExecutor.make_result(
+        hostname,
+        SSHExecutor.TEST_CONNECTION_COMMAND,
+        success=return_code == 0,
+        return_code=return_code,
+        error=error,
+        **kwargs,
+    )
+    result["duration"] = 0.042
+    return result
+
+
+class ConnectionStatusTests(unittest.TestCase):
+    def test_statuses(self):
+        self.assertEqual(connection_status(make_result("a", 0)), REACHABLE)
+        # The login shell failed, but ssh did connect
+        self.assertEqual(connection_status(make_result("a", 1)), REACHABLE)
+        self.assertEqual(
+            connection_status(make_result("a", 255, ERRORS["locked"])), AUTH_FAILED
+        )
+        self.assertEqual(
+            connection_status(make_result("a", 255, ERRORS["down"])), UNREACHABLE
+        )
+        self.assertEqual(
+            connection_status(make_result("a", -1, "timeout", timed_out=True)),
+            UNREACHABLE,
+        )
+
+    def test_format_includes_latency_and_error(self):
+        self.assertEqual(
+            format_connection_result(make_result("web-1", 0)),
+            "web-1: reachable (42 ms)",
+        )
+        result = make_result("down-1", 255, ERRORS["down"] + "\nmore")
+        result["connect_time"] = 0.005
+        self.assertEqual(
+            format_connection_result(result),
+            f"down-1: unreachable (5 ms) - {ERRORS['down']}",
+        )
+
+    def test_summary(self):
+        summary = ConnectionTestSummary()
+        for result in (
+            make_result("web-1", 0),
+            make_result("web-2", 0),
+            make_result("down-1", 255, ERRORS["down"]),
+            make_result("down-2", 255, ERRORS["down"]),
+            make_result("locked-1", 255, ERRORS["locked"]),
+        ):
+            summary.add(result)
+        self.assertEqual(len(summary), 5)
+        self.assertEqual(
+            summary.format().splitlines(),
+            [
+                "Reachable: 2/5, unreachable: 2/5, auth failed: 1/5",
+                "Unreachable: down-[1-2]",
+                "Auth failed: locked-1",
+            ],
+        )
+
+
+class BulkConnectionTestTests(unittest.TestCase):
+    def test_hosts_are_tested_concurrently(self):
+        executor = ConnectionExecutor(max_workers=10)
+        hosts = [f"web-{i}" for i in range(40)]
+        started = time.monotonic()
+        results = list(executor.iter_connection_tests(hosts))
+        # 40 x 50 ms one by one would take 2 s
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(len(results), 40)
+        self.assertLessEqual(executor.peak, 10)
+        self.assertEqual(
+            {call[1:] for call in executor.calls},
+            {(SSHExecutor.TEST_CONNECTION_COMMAND, executor.connect_timeout)},
+        )
+
+    def test_cli_streams_results_and_prints_summary(self):
+        executor = ConnectionExecutor(max_workers=4)
+        host_index = dict(enumerate(["web-1", "down-1", "locked-1", "web-2"], 1))
+        output = io.StringIO()
+        with mock.patch("builtins.input", return_value="1-4"):
+            with contextlib.redirect_stdout(output):
+                cli_app.test_host_connection(host_index, executor)
+        text = output.getvalue()
+        self.assertIn("Testing 4 hosts (4 at a time)", text)
+        self.assertIn("web-1: reachable (42 ms)", text)
+        self.assertIn("down-1: unreachable (42 ms) - ssh: connect to host", text)
+        self.assertIn("Reachable: 2/4, unreachable: 1/4, auth failed: 1/4", text)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
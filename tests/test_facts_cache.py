@@ -0,0 +1,210 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import command_executor_cli_app as cli_app  # noqa: E402
+from config import Config  # noqa: E402
+from facts_cache import FactsRefresher, HostFactsCache, fact_ttl  # noqa: E402
+from host_facts import HOST_FACTS  # noqa: E402
+from ssh_config_parser import SSHConfigParser  # noqa: E402
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import FakeClock  # noqa: E402
+
+
+class FakeFactsExecutor(SSHExecutor):
+    """Returns canned facts and records each gathering pass."""
+
+    def __init__(self, **kwargs):
+        super().__init__("/dev/null", **kwargs)
+        self.passes = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def iter_host_facts(self, hostnames, facts=None, **kwargs):
+        facts = list(facts if facts is not None else HOST_FACTS)
+        self.passes.append((list(hostnames), facts))
+        self.release.wait(5)
+        for hostname in hostnames:
+            yield hostname, {
+                fact: (
+                    "Error: Connection refused"
+                    if hostname.startswith("down")
+                    else f"{fact} of {hostname}"
+                )
+                for fact in facts
+            }
+
+
+class CacheTestCase(unittest.TestCase):
+    CONFIG = "Host web-1 web-2 down-1\n  User deploy\n"
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        self.config_path = Path(config_dir) / "config"
+        self.config_path.write_text(self.CONFIG)
+        patcher = mock.patch.object(Config, "SSH_CONFIG_DISK_CACHE", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clock = FakeClock(1_000_000.0)
+        self.cache = HostFactsCache(
+            cache_dir.name, clock=self.clock, ssh_config_path=str(self.config_path)
+        )
+
+    def edit_config(self, content):
+        # Rewrite the config with a later mtime so the change is noticed
+        mtime_ns = self.config_path.stat().st_mtime_ns
+        self.config_path.write_text(content)
+        os.utime(self.config_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+class HostFactsCacheTests(CacheTestCase):
+    def test_missing_host_is_all_stale(self):
+        self.assertEqual(self.cache.lookup("web-1"), ({}, list(HOST_FACTS)))
+
+    def test_per_fact_ttl(self):
+        self.cache.store("web-1", {"uptime": "up 3 days", "cpus": "8"})
+        self.assertEqual(
+            self.cache.lookup("web-1", ["uptime", "cpus"]),
+            ({"uptime": "up 3 days", "cpus": "8"}, []),
+        )
+        self.clock.now += fact_ttl("uptime") + 1
+        values, stale = self.cache.lookup("web-1", ["uptime", "cpus"])
+        # Stale values are still returned, to be shown while refreshing
+        self.assertEqual(values["uptime"], "up 3 days")
+        self.assertEqual(stale, ["uptime"])
+
+    def test_errors_keep_last_good_value(self):
+        self.cache.store("web-1", {"kernel": "6.1"})
+        self.clock.now += fact_ttl("kernel") + 1
+        self.cache.store("web-1", {"kernel": "Error: Connection refused"})
+        self.assertEqual(
+            self.cache.lookup("web-1", ["kernel"]), ({"kernel": "6.1"}, ["kernel"])
+        )
+
+    def test_entries_survive_a_new_instance(self):
+        self.cache.store("web-1", {"cpus": "8"})
+        other = HostFactsCache(
+            self.cache.cache_dir,
+            clock=self.clock,
+            ssh_config_path=str(self.config_path),
+        )
+        self.assertEqual(other.lookup("web-1", ["cpus"]), ({"cpus": "8"}, []))
+        self.assertEqual(other.lookup("web-2", ["cpus"]), ({}, ["cpus"]))
+
+    def test_unreadable_file_is_a_miss(self):
+        self.cache.store("web-1", {"cpus": "8"})
+        Path(self.cache._path(self.cache._target("web-1"))).write_text("{not json")
+        self.assertEqual(self.cache.lookup("web-1", ["cpus"]), ({}, ["cpus"]))
+
+    def test_entry_follows_the_resolved_host(self):
+        self.cache.store("web-1", {"kernel": "6.1"})
+        # Same alias, another machine: the old facts must not be shown
+        self.edit_config("Host web-1\n  HostName 10.0.0.9\n  User deploy\n")
+        self.assertEqual(self.cache.lookup("web-1", ["kernel"]), ({}, ["kernel"]))
+        self.edit_config("Host web-1\n  User root\n")
+        self.assertEqual(self.cache.lookup("web-1", ["kernel"]), ({}, ["kernel"]))
+        # Back to the original target
+        self.edit_config(self.CONFIG)
+        self.assertEqual(
+            self.cache.lookup("web-1", ["kernel"]), ({"kernel": "6.1"}, [])
+        )
+
+
+class FactsRefresherTests(CacheTestCase):
+    def test_fetch_stores_and_merges(self):
+        self.cache.store("down-1", {"kernel": "5.10"})
+        refresher = FactsRefresher(self.cache)
+        results = refresher.fetch(
+            FakeFactsExecutor(), ["web-1", "down-1"], ["kernel", "cpus"]
+        )
+        self.assertEqual(
+            results["web-1"], {"kernel": "kernel of web-1", "cpus": "cpus of web-1"}
+        )
+        # Failed facts: last good value, else the error
+        self.assertEqual(
+            results["down-1"], {"kernel": "5.10", "cpus": "Error: Connection refused"}
+        )
+        self.assertEqual(
+            self.cache.lookup("web-1", ["cpus"])[0], {"cpus": "cpus of web-1"}
+        )
+
+    def test_refresh_runs_in_background_once_per_host(self):
+        refresher = FactsRefresher(self.cache)
+        executor = FakeFactsExecutor()
+        executor.release.clear()
+        updates = []
+        thread = refresher.refresh(
+            executor, ["web-1"], ["uptime"], lambda alias, values: updates.append(alias)
+        )
+        self.assertTrue(refresher.is_pending("web-1"))
+        # Already being refreshed: no second pass
+        self.assertIsNone(refresher.refresh(executor, ["web-1"], ["uptime"]))
+        executor.release.set()
+        thread.join(5)
+        self.assertEqual(updates, ["web-1"])
+        self.assertEqual(len(executor.passes), 1)
+        self.assertFalse(refresher.is_pending("web-1"))
+        self.assertEqual(
+            self.cache.lookup("web-1", ["uptime"]), ({"uptime": "uptime of web-1"}, [])
+        )
+
+
+class CliHostInfoTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.parser = SSHConfigParser(str(self.config_path))
+        self.host_index = {1: "web-1", 2: "web-2"}
+        self.executor = FakeFactsExecutor()
+        self.refresher = FactsRefresher(self.cache)
+
+    def show(self):
+        output = io.StringIO()
+        with mock.patch("builtins.input", return_value="1-2"):
+            with contextlib.redirect_stdout(output):
+                cli_app.show_host_info(
+                    self.host_index, self.parser, self.executor, self.refresher
+                )
+        return output.getvalue()
+
+    def test_missing_facts_are_gathered_then_read_from_cache(self):
+        text = self.show()
+        self.assertIn("Gathering facts from 2 hosts", text)
+        self.assertIn("user           : deploy", text)
+        self.assertIn("kernel         : kernel of web-2", text)
+        self.assertEqual(len(self.executor.passes), 1)
+
+        text = self.show()
+        self.assertNotIn("Gathering", text)
+        self.assertIn("kernel         : kernel of web-1", text)
+        self.assertEqual(len(self.executor.passes), 1)
+
+    def test_stale_facts_are_shown_and_refreshed_in_background(self):
+        self.show()
+        self.clock.now += fact_ttl("uptime") + 1
+        text = self.show()
+        self.assertIn("-- Facts (refreshing in background)", text)
+        for thread in threading.enumerate():
+            if thread.name == "facts-refresh":
+                thread.join(5)
+        self.assertEqual(self.executor.passes[-1], (["web-1", "web-2"], ["uptime"]))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,123 @@
+import platform
+import shlex
+import shutil
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import host_facts  # noqa: E402
+from host_facts import (  # noqa: E402
+    HOST_FACTS,
+    build_facts_script,
+    new_marker,
+    parse_facts_output,
+)
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import LocalExecutor  # noqa: E402
+
+
+class ParseFactsTests(unittest.TestCase):
+    def test_sections_and_errors(self):
+        marker = "@@m@@"
+        output = (
+            f"{marker} kernel\n6.1.0\n\n{marker} end 0\n"
+            f"{marker} distro\n.: /etc/os-release: not found\n{marker} end 2\n"
+            f"{marker} uptime\nline 1\nline 2\n\n{marker} end 0\n"
+        )
+        self.assertEqual(
+            parse_facts_output(output, marker, ["kernel", "distro", "uptime", "cpus"]),
+            {
+                "kernel": "6.1.0",
+                "distro": "Error: .: /etc/os-release: not found",
+                "uptime": "line 1\nline 2",
+                "cpus": "Error: no output",  # Script cut short
+            },
+        )
+
+    def test_unknown_fact_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_facts_script(["hostname", "nope"], new_marker())
+
+    def test_script_is_wrapped_in_sh(self):
+        # ssh hands the command to the login shell, which may not be POSIX
+        marker = new_marker()
+        argv = shlex.split(build_facts_script(["kernel", "distro"], marker))
+        self.assertEqual(argv[:2], ["sh", "-c"])
+        self.assertEqual(len(argv), 3)
+        self.assertIn(f"echo '{marker} distro'", argv[2])
+        self.assertIn(HOST_FACTS["distro"], argv[2])
+
+    def test_markers_are_unique(self):
+        self.assertNotEqual(new_marker(), new_marker())
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class LocalFactsTests(unittest.TestCase):
+    def test_script_runs_in_a_posix_shell(self):
+        marker = new_marker()
+        output = subprocess.run(
+            ["sh", "-c", build_facts_script(HOST_FACTS, marker)],
+            capture_output=True,
+            text=True,
+        ).stdout
+        facts = parse_facts_output(output, marker, HOST_FACTS)
+        self.assertEqual(facts["kernel"], platform.release())
+        self.assertTrue(facts["cpus"].isdigit())
+        self.assertNotIn(marker, "".join(facts.values()))
+
+    def test_get_host_info_uses_one_session(self):
+        executor = LocalExecutor()
+        info = executor.get_host_info("local-1")
+        self.assertEqual(executor.sessions, 1)
+        self.assertEqual(list(info), list(HOST_FACTS))
+        self.assertEqual(info["kernel"], platform.release())
+
+    def test_facts_are_extensible(self):
+        executor = LocalExecutor()
+        extra = dict(HOST_FACTS, answer="echo 42", broken="exit 3")
+        with mock.patch.object(host_facts, "HOST_FACTS", extra):
+            info = executor.get_host_info("local-1", ["answer", "broken", "whoami"])
+        self.assertEqual(info["answer"], "42")
+        self.assertEqual(info["broken"], "Error: 3")
+        self.assertEqual(executor.sessions, 1)
+
+    def test_fleet_pass(self):
+        executor = LocalExecutor(max_workers=4)
+        hosts = [f"web-{i}" for i in range(6)]
+        results = dict(executor.iter_host_facts(hosts, ["kernel"]))
+        self.assertEqual(sorted(results), hosts)
+        self.assertEqual(executor.sessions, 6)
+        self.assertTrue(
+            all(f == {"kernel": platform.release()} for f in results.values())
+        )
+
+    def test_ssh_failure_is_reported_for_every_fact(self):
+        executor = LocalExecutor()
+        with mock.patch.object(
+            executor,
+            "execute_command",
+            return_value=SSHExecutor.make_result(
+                "down-1", "x", return_code=255, error="Connection refused\n"
+            ),
+        ):
+            info = executor.get_host_info("down-1", ["kernel", "cpus"])
+        self.assertEqual(
+            info,
+            {
+                "kernel": "Error: Connection refused",
+                "cpus": "Error: Connection refused",
+            },
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
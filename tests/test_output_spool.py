@@ -0,0 +1,136 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import output_spool  # noqa: E402
+from config import Config  # noqa: E402
+from output_spool import (  # noqa: E402
+    OutputSpool,
+    cleanup_spill_dir,
+    collect_capture_file,
+    open_capture_file,
+)
+
+
+class OutputSpoolTests(unittest.TestCase):
+    def setUp(self):
+        spill_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spill_dir.cleanup)
+        self.spill_dir = spill_dir.name
+        original = Config.OUTPUT_SPILL_DIR
+        Config.OUTPUT_SPILL_DIR = self.spill_dir
+        self.addCleanup(setattr, Config, "OUTPUT_SPILL_DIR", original)
+
+    def test_small_capture_is_loaded_and_file_removed(self):
+        fileobj, path = open_capture_file("web/1", "stdout")
+        fileobj.write(b"hello\n")
+
+        captured = collect_capture_file(fileobj, path, limit=100)
+
+        self.assertEqual(captured, {"text": "hello", "path": None, "bytes": 6})
+        self.assertFalse(os.path.exists(path))
+
+    def test_large_capture_stays_on_disk_with_preview(self):
+        fileobj, path = open_capture_file("web-1", "stdout")
+        fileobj.write("".join(f"line {i}\n" for i in range(5000)).encode())
+
+        captured = collect_capture_file(fileobj, path, limit=100)
+
+        self.assertEqual(captured["path"], path)
+        self.assertTrue(os.path.exists(path))
+        lines = captured["text"].splitlines()
+        preview = Config.OUTPUT_PREVIEW_LINES
+        self.assertEqual(len(lines), preview * 2 + 1)
+        self.assertEqual(lines[0], "line 0")
+        self.assertEqual(lines[-1], "line 4999")
+        self.assertIn(path, lines[preview])
+
+    def test_spool_spills_only_after_limit(self):
+        spool = OutputSpool("web-1", "stdout", limit=10)
+        spool.write("12345\n")
+        self.assertIsNone(spool.path)
+        spool.write("67890\n")
+        self.assertIsNotNone(spool.path)
+
+        captured = spool.finish()
+        self.assertEqual(captured["bytes"], 12)
+        self.assertEqual(captured["path"], spool.path)
+
+    def test_discard_removes_spill_file(self):
+        spool = OutputSpool("web-1", "stderr", limit=1)
+        spool.write("overflow\n")
+        path = spool.path
+        spool.discard()
+        self.assertFalse(os.path.exists(path))
+
+    def test_cleanup_removes_old_files(self):
+        fileobj, path = open_capture_file("web-1", "stdout")
+        fileobj.close()
+        os.utime(path, (0, 0))
+
+        self.assertEqual(cleanup_spill_dir(), 1)
+        self.assertFalse(os.path.exists(path))
+
+
+@unittest.skipUnless(hasattr(os, "getuid"), "POSIX ownership checks")
+class SpillDirTests(unittest.TestCase):
+    def setUp(self):
+        base = tempfile.TemporaryDirectory()
+        self.addCleanup(base.cleanup)
+        self.base = base.name
+        original = Config.OUTPUT_SPILL_DIR
+        self.addCleanup(setattr, Config, "OUTPUT_SPILL_DIR", original)
+        self.addCleanup(setattr, output_spool, "_fallback_dir", None)
+        output_spool._fallback_dir = None
+
+    def assert_private_fallback(self, unusable):
+        Config.OUTPUT_SPILL_DIR = unusable
+        spill_dir = output_spool.get_spill_dir()
+        self.assertNotEqual(spill_dir, unusable)
+        info = os.lstat(spill_dir)
+        self.assertEqual(info.st_uid, os.getuid())
+        self.assertEqual(stat.S_IMODE(info.st_mode), 0o700)
+        fileobj, path = open_capture_file("web-1", "stdout")
+        fileobj.close()
+        self.assertEqual(os.path.dirname(path), spill_dir)
+        os.unlink(path)
+        os.rmdir(spill_dir)
+
+    def test_default_dir_is_per_user(self):
+        Config.OUTPUT_SPILL_DIR = None
+        self.assertTrue(output_spool._default_spill_dir().endswith(f"-{os.getuid()}"))
+
+    @unittest.skipUnless(os.geteuid() == 0, "chown needs root")
+    def test_dir_owned_by_another_user_is_not_used(self):
+        foreign = os.path.join(self.base, "foreign")
+        os.mkdir(foreign, 0o777)
+        os.chown(foreign, 65534, 65534)
+        self.assert_private_fallback(foreign)
+
+    def test_symlink_is_not_followed(self):
+        target = os.path.join(self.base, "target")
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.base, "link")
+        os.symlink(target, link)
+        self.assert_private_fallback(link)
+
+    def test_own_dir_is_tightened_to_0700(self):
+        own = os.path.join(self.base, "own")
+        os.mkdir(own, 0o755)
+        Config.OUTPUT_SPILL_DIR = own
+        self.assertEqual(output_spool.get_spill_dir(), own)
+        self.assertEqual(stat.S_IMODE(os.stat(own).st_mode), 0o700)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
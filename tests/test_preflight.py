@@ -0,0 +1,107 @@
+import asyncio
+import socket
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from config import Config  # noqa: E402
+from preflight import ReachabilityProbe  # noqa: E402
+from retry_policy import TRANSPORT  # noqa: E402
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import FakeAsyncExecutor, FakeExecutor  # noqa: E402
+
+
+def closed_port() -> int:
+    # A local port nobody listens on: bind, read the number, close
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PreflightTestCase(unittest.TestCase):
+    def setUp(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        self.addCleanup(listener.close)
+        up_port = listener.getsockname()[1]
+
+        config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(config_dir.cleanup)
+        self.config_path = str(Path(config_dir.name) / "config")
+        Path(self.config_path).write_text(
+            f"Host up-1 up-2\n  HostName 127.0.0.1\n  Port {up_port}\n"
+            f"Host down-1\n  HostName 127.0.0.1\n  Port {closed_port()}\n"
+            "Host inner-1\n  HostName 127.0.0.1\n  Port 1\n  ProxyJump bastion\n"
+        )
+        patcher = mock.patch.object(Config, "SSH_CONFIG_DISK_CACHE", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.hosts = ["up-1", "down-1", "inner-1", "up-2"]
+
+
+class ReachabilityProbeTests(PreflightTestCase):
+    def test_only_unreachable_hosts_are_reported(self):
+        probe = ReachabilityProbe(self.config_path, timeout=2)
+        unreachable = probe.probe(self.hosts)
+        self.assertEqual(list(unreachable), ["down-1"])
+        self.assertIn("Connection refused", unreachable["down-1"])
+        self.assertTrue(unreachable["down-1"].startswith("Pre-flight: "))
+
+    def test_targets(self):
+        probe = ReachabilityProbe(self.config_path)
+        self.assertEqual(probe.target("down-1")[0], "127.0.0.1")
+        self.assertIsNone(probe.target("inner-1"))  # Only the bastion knows
+        self.assertEqual(probe.target("unlisted"), ("unlisted", 22))
+
+
+class BatchPreflightTests(PreflightTestCase):
+    def check_batch(self, executor):
+        results = list(executor.iter_command_batch(self.hosts, "uptime"))
+        # The dead host is reported first and ssh is never started for it
+        self.assertEqual(results[0]["hostname"], "down-1")
+        self.assertEqual(results[0]["return_code"], 255)
+        self.assertEqual(results[0]["failure_class"], TRANSPORT)
+        self.assertEqual(len({r["run_id"] for r in results}), 1)
+        self.assertEqual(sorted(executor.started), ["inner-1", "up-1", "up-2"])
+
+    def test_thread_backend_skips_unreachable_hosts(self):
+        self.check_batch(FakeExecutor(self.config_path, preflight=True, max_workers=4))
+
+    def test_async_backend_skips_unreachable_hosts(self):
+        self.check_batch(
+            FakeAsyncExecutor(self.config_path, preflight=True, max_workers=4)
+        )
+
+    def test_serial_batch_is_probed_too(self):
+        self.check_batch(FakeExecutor(self.config_path, preflight=True, max_workers=1))
+
+    def test_probe_timeout_never_exceeds_connect_timeout(self):
+        executor = SSHExecutor(
+            self.config_path, connect_timeout=1, preflight=True, preflight_timeout=5
+        )
+        self.assertEqual(executor.preflight.timeout, 1)
+        self.assertIsNone(SSHExecutor(self.config_path).preflight)
+
+    def test_timeout_is_reported_as_connect_timeout(self):
+        probe = ReachabilityProbe(self.config_path, timeout=0.01)
+
+        async def never_connects(*args):
+            await asyncio.sleep(1)
+
+        with mock.patch("asyncio.open_connection", never_connects):
+            unreachable = probe.probe(["up-1"])
+        self.assertIn("Connection timed out", unreachable["up-1"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,90 @@
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from config import Config  # noqa: E402
+from rate_limiter import DIRECT, ConnectionRateLimiter, TokenBucket  # noqa: E402
+from tests.helpers import FakeClock, LocalAsyncExecutor  # noqa: E402
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        # Later callers queue behind each other at 1/rate intervals
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.5, 1.0, 1.5])
+
+    def test_tokens_refill_up_to_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 60
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 1.0])
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+
+class ConnectionRateLimiterTests(unittest.TestCase):
+    def setUp(self):
+        config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(config_dir.cleanup)
+        self.config_path = Path(config_dir.name) / "config"
+        self.config_path.write_text(
+            "Host web-*\n  ProxyJump admin@bastion-a:2222\n"
+            "Host db-*\n  ProxyJump bastion-b,inner\n"
+            "Host web-1 web-2 db-1 local-1\n  User deploy\n"
+        )
+        patcher = mock.patch.object(Config, "SSH_CONFIG_DISK_CACHE", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_buckets_are_keyed_by_first_jump_host(self):
+        limiter = ConnectionRateLimiter(
+            1, 1, per_jump=True, ssh_config_path=str(self.config_path)
+        )
+        self.assertEqual(limiter.key_for("web-1"), "bastion-a")
+        self.assertEqual(limiter.key_for("db-1"), "bastion-b")
+        self.assertEqual(limiter.key_for("local-1"), DIRECT)
+        # One token per bastion: the second host behind bastion-a waits
+        self.assertEqual(limiter.reserve("web-1"), 0)
+        self.assertEqual(limiter.reserve("db-1"), 0)
+        self.assertGreater(limiter.reserve("web-2"), 0)
+
+    def test_single_bucket_by_default(self):
+        limiter = ConnectionRateLimiter(1, 1, ssh_config_path=str(self.config_path))
+        self.assertEqual(limiter.key_for("web-1"), DIRECT)
+        limiter.reserve("web-1")
+        self.assertGreater(limiter.reserve("db-1"), 0)
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class ExecutorRateLimitTests(unittest.TestCase):
+    def test_connection_starts_are_spaced_out(self):
+        executor = LocalAsyncExecutor(max_workers=10, connect_rate=20, connect_burst=2)
+        start = time.monotonic()
+        results = list(executor.iter_command_batch([f"h{i}" for i in range(6)], "true"))
+        self.assertTrue(all(r["success"] for r in results))
+        # 2 at once, then 4 more at 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_unlimited_by_default(self):
+        self.assertIsNone(LocalAsyncExecutor().rate_limiter)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
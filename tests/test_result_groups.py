@@ -0,0 +1,109 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from result_groups import (  # noqa: E402
+    ResultGrouper,
+    format_group_header,
+    result_digest,
+)
+from ssh_executor import SSHExecutor  # noqa: E402
+
+
+def make_result(hostname, output="6.1.0\n", return_code=0, **kwargs):
+    return SSHExecutor.make_result(
+        hostname,
+        "uname -r",
+        success=return_code == 0,
+        output=output,
+        return_code=return_code,
+        **kwargs,
+    )
+
+
+class ResultDigestTests(unittest.TestCase):
+    def test_digest_covers_output_error_and_return_code(self):
+        base = result_digest(make_result("web-1"))
+        self.assertEqual(base, result_digest(make_result("web-2")))
+        self.assertNotEqual(base, result_digest(make_result("web-1", "6.2.0\n")))
+        self.assertNotEqual(base, result_digest(make_result("web-1", return_code=1)))
+        self.assertNotEqual(
+            base, result_digest(make_result("web-1", error="warning\n"))
+        )
+
+    def test_output_and_error_boundaries_are_kept_apart(self):
+        self.assertNotEqual(
+            result_digest(make_result("a", output="ab", error="")),
+            result_digest(make_result("a", output="a", error="b")),
+        )
+
+    def test_spilled_outputs_are_hashed_by_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name, content in (
+                ("a", "x" * 1000),
+                ("b", "x" * 1000),
+                ("c", "y" * 1000),
+            ):
+                path = Path(tmp) / name
+                path.write_text(content)
+                paths.append(path)
+            # Previews differ (they name the file); the spilled content decides
+            digests = [
+                result_digest(
+                    make_result(
+                        path.name,
+                        f"... [1000 bytes total, full output: {path}] ...",
+                        output_file=str(path),
+                        output_bytes=1000,
+                    )
+                )
+                for path in paths
+            ]
+        self.assertEqual(digests[0], digests[1])
+        self.assertNotEqual(digests[0], digests[2])
+
+
+class ResultGrouperTests(unittest.TestCase):
+    def test_identical_results_share_one_group(self):
+        grouper = ResultGrouper()
+        for i in range(1, 6):
+            grouper.add(make_result(f"web-{i}"))
+        grouper.add(make_result("web-6", "5.15.0\n"))
+        grouper.add(make_result("web-7", "", return_code=255, error="timeout"))
+
+        groups = grouper.groups()
+        self.assertEqual(len(grouper), 3)
+        self.assertEqual(groups[0]["hosts"], [f"web-{i}" for i in range(1, 6)])
+        self.assertEqual(groups[0]["output"], "6.1.0\n")
+        # Same size: the failure is listed first
+        self.assertFalse(groups[1]["success"])
+        self.assertEqual(groups[1]["hosts"], ["web-7"])
+
+    def test_hosts_are_listed_in_natural_order(self):
+        grouper = ResultGrouper()
+        for host in ("web-10", "web-2", "db-1", "web-1"):
+            grouper.add(make_result(host))
+        self.assertEqual(
+            grouper.groups()[0]["hosts"], ["db-1", "web-1", "web-2", "web-10"]
+        )
+
+    def test_group_header_folds_host_names(self):
+        grouper = ResultGrouper()
+        for host in ("web-3", "web-1", "web-2", "db-1"):
+            grouper.add(make_result(host))
+        self.assertEqual(
+            format_group_header(grouper.groups()[0]), "4 hosts: db-1,web-[1-3] (RC 0)"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
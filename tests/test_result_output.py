@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from result_groups import ResultGrouper  # noqa: E402
+from result_output import (  # noqa: E402
+    GROUP_FIELDS,
+    RECORD_FIELDS,
+    CsvResultWriter,
+    JsonlResultWriter,
+    make_result_writer,
+    result_record,
+)
+from ssh_executor import SSHExecutor  # noqa: E402
+
+
+def make_result(hostname, **kwargs):
+    result = SSHExecutor.make_result(
+        hostname,
+        "uname -r",
+        success=kwargs.pop("success", True),
+        output=kwargs.pop("output", "6.1.0\nsecond line"),
+        return_code=kwargs.pop("return_code", 0),
+    )
+    result.update(run_id="abc123", started_at=1700000000.0, duration=1.23456)
+    result["finished_at"] = result["started_at"] + result["duration"]
+    result.update(kwargs)
+    return result
+
+
+class FlushCountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+class ResultRecordTests(unittest.TestCase):
+    def test_record_fields(self):
+        record = result_record(make_result("web-1"))
+        self.assertEqual(tuple(record), RECORD_FIELDS)
+        self.assertEqual(record["host"], "web-1")
+        self.assertEqual(record["stdout"], "6.1.0\nsecond line")
+        self.assertEqual(record["duration"], 1.235)
+        self.assertTrue(record["start"].startswith("2023-11-1"))
+
+    def test_minimal_result(self):
+        record = result_record(
+            {"hostname": "h", "success": False, "return_code": 1, "error": "x"}
+        )
+        self.assertIsNone(record["start"])
+        self.assertEqual(record["stderr"], "x")
+
+
+class ResultWriterTests(unittest.TestCase):
+    def test_jsonl_writes_and_flushes_each_record(self):
+        stream = FlushCountingStream()
+        writer = JsonlResultWriter(stream)
+        writer.write(make_result("web-1"))
+        self.assertEqual(stream.flushes, 1)
+        writer.write(make_result("web-2", success=False, return_code=3))
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["return_code"], 3)
+
+    def test_csv_header_and_multiline_output(self):
+        stream = FlushCountingStream()
+        writer = CsvResultWriter(stream)
+        self.assertEqual(stream.flushes, 1)  # Header is out before any host
+        writer.write(make_result("web-1"))
+        rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["stdout"], "6.1.0\nsecond line")
+        self.assertEqual(rows[0]["success"], "True")
+
+    def test_fields_select_and_order_columns(self):
+        fields = ("host", "return_code", "stdout_bytes")
+        stream = io.StringIO()
+        JsonlResultWriter(stream, fields).write(make_result("web-1"))
+        self.assertEqual(list(json.loads(stream.getvalue())), list(fields))
+
+        stream = io.StringIO()
+        CsvResultWriter(stream, fields).write(make_result("web-1"))
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        self.assertEqual(rows[0], list(fields))
+        self.assertEqual(rows[1][:2], ["web-1", "0"])
+
+    def test_grouped_writers_take_groups(self):
+        grouper = ResultGrouper()
+        for host in ("web-1", "web-2", "web-3"):
+            grouper.add(make_result(host))
+        group = grouper.groups()[0]
+
+        stream = io.StringIO()
+        make_result_writer("jsonl", stream, grouped=True).write(group)
+        record = json.loads(stream.getvalue())
+        self.assertEqual(tuple(record), GROUP_FIELDS)
+        self.assertEqual(record["hosts"], ["web-1", "web-2", "web-3"])
+        self.assertEqual(record["host_range"], "web-[1-3]")
+        self.assertEqual(record["host_count"], 3)
+
+        stream = io.StringIO()
+        make_result_writer("csv", stream, grouped=True).write(group)
+        row = next(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(row["hosts"], "web-1,web-2,web-3")
+
+    def test_text_format_has_no_writer(self):
+        self.assertIsNone(make_result_writer("text", io.StringIO()))
+        self.assertIsInstance(make_result_writer("csv", io.StringIO()), CsvResultWriter)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
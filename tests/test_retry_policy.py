@@ -0,0 +1,192 @@
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from retry_policy import (  # noqa: E402
+    AUTH,
+    COMMAND,
+    CONNECT_TIMEOUT,
+    LOCAL,
+    LOCAL_TIMEOUT,
+    TRANSPORT,
+    RetryPolicy,
+    RetryQueue,
+    classify_failure,
+    describe_failure,
+)
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import FakeExecutor, LocalAsyncExecutor  # noqa: E402
+
+
+def failure(return_code=255, error="", **kwargs):
+    return SSHExecutor.make_result(
+        "web-1", "uptime", return_code=return_code, error=error, **kwargs
+    )
+
+
+class ClassifyFailureTests(unittest.TestCase):
+    def test_classes(self):
+        cases = [
+            (failure(error="Connection reset by peer"), TRANSPORT),
+            (
+                failure(error="kex_exchange_identification: read: Connection reset"),
+                TRANSPORT,
+            ),
+            (
+                failure(error="ssh: connect to host x port 22: Connection timed out"),
+                CONNECT_TIMEOUT,
+            ),
+            (failure(error="user@x: Permission denied (publickey)."), AUTH),
+            (failure(error="Host key verification failed."), AUTH),
+            (
+                failure(error="ssh: connect to host x port 22: Connection refused"),
+                TRANSPORT,
+            ),
+            (failure(error="Connection to x closed by remote host."), TRANSPORT),
+            (failure(error="client_loop: send disconnect: Broken pipe"), TRANSPORT),
+            (failure(return_code=1, error="No such file"), COMMAND),
+            # A remote command may exit 255 itself
+            (failure(error=""), COMMAND),
+            (failure(error="myscript: bad input"), COMMAND),
+            (failure(return_code=-1, error="timeout", timed_out=True), LOCAL_TIMEOUT),
+            (failure(return_code=-1, error="SSH client not found."), LOCAL),
+        ]
+        for result, expected in cases:
+            with self.subTest(error=result["error"]):
+                self.assertEqual(classify_failure(result), expected)
+        self.assertIsNone(classify_failure(failure(return_code=0, success=True)))
+
+    def test_describe_failure(self):
+        result = failure(error="Connection reset")
+        result.update(failure_class=TRANSPORT, attempts=3)
+        self.assertEqual(describe_failure(result), " (transport, 3 attempts)")
+        result.update(failure_class=COMMAND, attempts=1)
+        self.assertEqual(describe_failure(result), "")
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_only_transport_failures_are_retried(self):
+        policy = RetryPolicy(retries=2)
+        self.assertTrue(policy.should_retry(failure(error="Connection closed"), 1))
+        self.assertTrue(policy.should_retry(failure(error="Connection closed"), 2))
+        self.assertFalse(policy.should_retry(failure(error="Connection closed"), 3))
+        self.assertFalse(policy.should_retry(failure(return_code=1), 1))
+        self.assertFalse(policy.should_retry(failure(error="Permission denied"), 1))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(1, backoff=1, max_backoff=5, rng=random.Random(1))
+        delays = [policy.delay(attempt) for attempt in (1, 2, 3, 10) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 5 for d in delays))
+        self.assertTrue(all(d <= 1 for d in delays[:50]))
+        self.assertGreater(len(set(delays)), 100)
+
+    def test_queue_releases_retries_when_due(self):
+        now = [0.0]
+        queue = RetryQueue(RetryPolicy(1, backoff=4), clock=lambda: now[0])
+        result = failure(error="Connection reset")
+        self.assertTrue(queue.schedule("web-1", 1, result))
+        self.assertFalse(queue.schedule("web-2", 2, result))  # Out of attempts
+        self.assertLessEqual(queue.next_delay(), 4)
+        now[0] = 4
+        self.assertEqual(queue.pop_ready(), ("web-1", 2))
+        self.assertIsNone(queue.next_delay())
+
+
+class FlakyExecutor(FakeExecutor):
+    """web-* fail with a connection reset on their first try; slow-* take 0.3 s."""
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            retry_backoff=0.2, durations={"slow-1": 0.3, "slow-2": 0.3}, **kwargs
+        )
+
+    def answer(self, hostname, command, timeout):
+        if hostname.startswith("web") and self.started.count(hostname) == 1:
+            result = self.make_result(
+                hostname, command, return_code=255, error="Connection reset by peer"
+            )
+        else:
+            result = super().answer(hostname, command, timeout)
+        result["failure_class"] = classify_failure(result)
+        return result
+
+
+class BatchRetryTests(unittest.TestCase):
+    def test_transport_failures_are_retried_with_attempt_count(self):
+        executor = FlakyExecutor(max_workers=4, retries=2)
+        results = {
+            r["hostname"]: r
+            for r in executor.iter_command_batch(["web-1", "web-2", "bad-1"], "id")
+        }
+        self.assertTrue(results["web-1"]["success"])
+        self.assertEqual(results["web-1"]["attempts"], 2)
+        self.assertEqual(results["bad-1"]["attempts"], 1)  # Command failure
+        self.assertEqual(executor.started.count("bad-1"), 1)
+
+    def test_retry_wait_does_not_hold_a_worker(self):
+        # Two workers: slow-2 takes web-1's slot while web-1 waits to retry
+        executor = FlakyExecutor(max_workers=2, retries=1)
+        executor.retry_policy.delay = lambda attempt: 0.15
+        results = list(executor.iter_command_batch(["web-1", "slow-1", "slow-2"], "id"))
+        self.assertEqual(set(executor.started[:3]), {"web-1", "slow-1", "slow-2"})
+        self.assertEqual(executor.started[3], "web-1")
+        self.assertTrue(all(r["success"] for r in results))
+
+    def test_no_retries_by_default(self):
+        executor = FlakyExecutor(max_workers=2)
+        results = list(executor.iter_command_batch(["web-1", "web-2"], "id"))
+        self.assertFalse(any(r["success"] for r in results))
+        self.assertIsNone(executor.retry_policy)
+
+    def test_stop_reports_failure_of_pending_retry(self):
+        stop = threading.Event()
+        executor = FlakyExecutor(max_workers=2, retries=3)
+        executor.retry_policy.backoff = 30
+        batch = executor.iter_command_batch(["slow-1", "web-1"], "id", stop_event=stop)
+        first = next(batch)
+        stop.set()
+        rest = list(batch)
+        self.assertEqual(first["hostname"], "slow-1")
+        self.assertEqual([r["error"] for r in rest], ["Connection reset by peer"])
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class AsyncRetryTests(unittest.TestCase):
+    def test_async_backend_retries_transport_failures_only(self):
+        executor = LocalAsyncExecutor(max_workers=4, retries=1, retry_backoff=0.1)
+        with tempfile.TemporaryDirectory() as tmp:
+            # The first attempt of "flaky" fails like a dropped connection,
+            # "broken" fails as a command, "quiet" exits 255 without an ssh error
+            command = (
+                f'if [ "$HOST" = broken ]; then exit 3; fi; '
+                f'if [ "$HOST" = quiet ]; then exit 255; fi; '
+                f"if [ -e {tmp}/$HOST ]; then echo ok; "
+                f"else touch {tmp}/$HOST; echo 'Connection reset' >&2; exit 255; fi"
+            )
+            results = {
+                r["hostname"]: r
+                for r in executor.iter_command_batch(
+                    ["flaky", "broken", "quiet"], command
+                )
+            }
+        self.assertTrue(results["flaky"]["success"])
+        self.assertEqual(results["flaky"]["attempts"], 2)
+        self.assertEqual(results["broken"]["attempts"], 1)
+        self.assertEqual(results["broken"]["failure_class"], COMMAND)
+        self.assertEqual(results["quiet"]["attempts"], 1)
+        self.assertEqual(results["quiet"]["failure_class"], COMMAND)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from rollout import Rollout, parse_count  # noqa: E402
+from tests.helpers import FakeExecutor  # noqa: E402
+
+HOSTS = [f"web-{i}" for i in range(1, 11)]
+
+
+class RolloutPlanTests(unittest.TestCase):
+    def test_parse_count(self):
+        self.assertEqual(parse_count(" 10 "), "10")
+        self.assertEqual(parse_count("12.5%"), "12.5%")
+        self.assertIsNone(parse_count(None))
+        for value in ("ten", "-1", "150%", "%"):
+            with self.assertRaises(ValueError):
+                parse_count(value)
+        with self.assertRaises(ValueError):
+            Rollout("0")
+
+    def test_batches_by_count_and_percentage(self):
+        self.assertEqual([len(batch) for batch in Rollout("4").plan(HOSTS)], [4, 4, 2])
+        # Percentages round up
+        self.assertEqual(
+            [len(batch) for batch in Rollout("25%").plan(HOSTS)], [3, 3, 3, 1]
+        )
+        self.assertEqual(Rollout().plan(HOSTS), [HOSTS])
+
+    def test_failure_limit(self):
+        self.assertEqual(Rollout(max_failures="10%").failure_limit(50), 5)
+        self.assertIsNone(Rollout("5").failure_limit(50))
+
+
+class RolloutRunTests(unittest.TestCase):
+    def test_batches_run_in_order_with_one_run_id(self):
+        executor = FakeExecutor(max_workers=4)
+        started = []
+        results = list(
+            Rollout("4").run(
+                executor,
+                HOSTS,
+                "uptime",
+                on_batch=lambda number, count, hosts: started.append((number, count)),
+            )
+        )
+        self.assertEqual([b for b, _ in executor.batches], Rollout("4").plan(HOSTS))
+        self.assertEqual(started, [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(len({r["run_id"] for r in results}), 1)
+        # Concurrency is capped by the batch and by the executor's workers
+        self.assertEqual(executor.batches[2][1]["max_workers"], 2)
+        self.assertEqual(executor.batches[0][1]["max_workers"], 4)
+
+    def test_abort_once_failures_exceed_limit(self):
+        hosts = ["bad-1", "bad-2", "web-1", "web-2", "web-3", "web-4"]
+        rollout = Rollout("2", max_failures="1")
+        results = list(rollout.run(FakeExecutor(max_workers=4), hosts, "uptime"))
+        self.assertTrue(rollout.aborted)
+        self.assertEqual(rollout.failures, 2)
+        self.assertEqual([r["hostname"] for r in results], ["bad-1", "bad-2"])
+        self.assertEqual(rollout.skipped, hosts[2:])
+
+    def test_abort_starts_no_further_host(self):
+        hosts = [f"bad-{i}" for i in range(1, 11)]
+        executor = FakeExecutor(max_workers=4)
+        rollout = Rollout("10", 0, "0")
+        results = list(rollout.run(executor, hosts, "uptime", max_workers=2))
+        self.assertTrue(rollout.aborted)
+        # Only the two hosts in flight when the first failure arrived ran
+        self.assertEqual(len(executor.started), 2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(rollout.skipped, hosts[2:])
+
+    def test_failures_at_the_limit_do_not_abort(self):
+        hosts = ["bad-1", "web-1", "web-2"]
+        rollout = Rollout("1", max_failures="1")
+        self.assertEqual(
+            len(list(rollout.run(FakeExecutor(max_workers=4), hosts, "x"))), 3
+        )
+        self.assertFalse(rollout.aborted)
+
+    def test_stop_event_interrupts_the_pause(self):
+        stop = threading.Event()
+        rollout = Rollout("5", pause=60)
+        results = rollout.run(
+            FakeExecutor(max_workers=4), HOSTS, "uptime", stop_event=stop
+        )
+        for _ in range(5):
+            next(results)
+        stop.set()
+        with mock.patch("time.sleep") as sleep:
+            self.assertEqual(list(results), [])
+        sleep.assert_not_called()
+        self.assertEqual(rollout.skipped, HOSTS[5:])
+
+    def test_stop_interrupts_the_delay_between_hosts(self):
+        stop = threading.Event()
+        executor = FakeExecutor(max_workers=4)
+        results = Rollout().run(
+            executor, HOSTS[:3], "uptime", delay=30, stop_event=stop
+        )
+        next(results)
+        threading.Timer(0.1, stop.set).start()
+        start = time.monotonic()
+        self.assertEqual(list(results), [])
+        self.assertLess(time.monotonic() - start, 5)
+        # Stopped mid-delay: no further host started
+        self.assertEqual(executor.started, ["web-1"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
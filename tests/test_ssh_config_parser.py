@@ -1,7 +1,10 @@
+import json
+import os
 import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
@@ -10,10 +13,36 @@ APP_DIR = PROJECT_ROOT / "app"
 if str(APP_DIR) not in sys.path:
     sys.path.insert(0, str(APP_DIR))
 
-from app.ssh_config_parser import SSHConfigParser  # noqa: E402
+from app.ssh_config_parser import (  # noqa: E402
+    DISK_CACHE_INDEX,
+    HostIndex,
+    SSHConfigParser,
+    _is_pattern_host,
+    clear_parse_cache,
+    expand_host_range,
+    fold_host_range,
+    group_hosts_by_first_char,
+    natural_sort_key,
+    split_host_list,
+)
+from config import Config  # noqa: E402
 
 
-class SSHConfigParserFilteringTests(unittest.TestCase):
+class IsolatedCacheTestCase(unittest.TestCase):
+    """Points the parse caches at a temp directory, never ~/.ssh."""
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(Config, "SSH_CONFIG_CACHE_DIR", cache_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_dir = Path(cache_dir.name)
+        clear_parse_cache()
+        self.addCleanup(clear_parse_cache)
+
+
+class SSHConfigParserFilteringTests(IsolatedCacheTestCase):
     def _make_config(self, content: str) -> Path:
         temp = tempfile.NamedTemporaryFile("w", delete=False)
         temp.write(content)
@@ -55,5 +84,319 @@ class SSHConfigParserFilteringTests(unittest.TestCase):
         self.assertEqual(sorted(hosts), sorted(all_hosts))
 
 
+class HostIndexTests(IsolatedCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        names = [
+            "web10", "web2", "Web1", "web-*", "db01", "DB02", "db1a", "10host",
+            "2host", "_misc", "*", "!bastion", "app", "application", "apple",
+        ]  # fmt: skip
+        self.hosts = {name: {"Host": name} for name in names}
+        self.index = HostIndex(self.hosts)
+
+    def test_prefix_lookup_matches_linear_scan(self):
+        for prefix in ["", "w", "WEB", "web1", "db", "d", "app", "1", "_", "x"]:
+            with self.subTest(prefix=prefix):
+                expected = sorted(
+                    (
+                        host
+                        for host in self.hosts
+                        if host.lower().startswith(prefix.lower())
+                        and not _is_pattern_host(host)
+                    ),
+                    key=natural_sort_key,
+                )
+                self.assertEqual(self.index.with_prefix(prefix), expected)
+
+    def test_grouping_matches_group_hosts_by_first_char(self):
+        for prefix in ["", "w", "db", "1"]:
+            with self.subTest(prefix=prefix):
+                hosts = self.index.with_prefix(prefix)
+                self.assertEqual(
+                    self.index.group(hosts), group_hosts_by_first_char(hosts)
+                )
+
+    def test_sort_uses_natural_order(self):
+        self.assertEqual(
+            self.index.sort(["web10", "db01", "Web1", "web2"]),
+            ["db01", "Web1", "web2", "web10"],
+        )
+        # Hosts outside the index are still sorted naturally
+        self.assertEqual(self.index.sort(["x10", "x9", "web2"]), ["web2", "x9", "x10"])
+
+    def test_natural_sort_key_is_memoized(self):
+        self.assertIs(natural_sort_key("web-01"), natural_sort_key("web-01"))
+
+    def test_results_are_copies(self):
+        self.index.with_prefix("").clear()
+        self.assertIn("app", self.index.with_prefix(""))
+
+    def test_parser_rebuilds_index_when_hosts_are_replaced(self):
+        parser = SSHConfigParser("/nonexistent")
+        parser.hosts = {"b1": {}, "a1": {}}
+        self.assertEqual(parser.get_all_hosts(), ["a1", "b1"])
+        parser.hosts = {"c1": {}}
+        self.assertEqual(parser.get_hosts_with_prefix("c"), ["c1"])
+
+
+class HostSelectionTests(IsolatedCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.parser = SSHConfigParser("/nonexistent")
+        names = ["web-1", "web-2", "web-10", "Web-3", "db-01", "db-02", "db-*"]
+        self.parser.hosts = {name: {} for name in names}
+
+    def test_split_keeps_commas_inside_ranges(self):
+        self.assertEqual(
+            split_host_list("web-1, web-[2-4,7],,db-*"),
+            ["web-1", "web-[2-4,7]", "db-*"],
+        )
+
+    def test_expand_host_range(self):
+        self.assertEqual(expand_host_range("web-[3-1]"), ["web-1", "web-2", "web-3"])
+        self.assertEqual(expand_host_range("db-[01-02,7]"), ["db-01", "db-02", "db-7"])
+        self.assertEqual(
+            expand_host_range("r[1-2]n[1-2]"), ["r1n1", "r1n2", "r2n1", "r2n2"]
+        )
+        self.assertEqual(expand_host_range("plain"), ["plain"])
+        with self.assertRaises(ValueError):
+            expand_host_range("web-[1-2-3]")
+
+    def test_fold_host_range_round_trips(self):
+        hosts = ["web-2", "web-1", "web-3", "web-7", "db-01", "db-02", "db-10", "x"]
+        folded = fold_host_range(hosts)
+        self.assertEqual(folded, "db-[01-02],db-10,web-[1-3,7],x")
+        expanded = [
+            host for item in split_host_list(folded) for host in expand_host_range(item)
+        ]
+        self.assertEqual(sorted(expanded), sorted(hosts))
+        self.assertEqual(fold_host_range(["solo"]), "solo")
+
+    def test_select_hosts_by_alias_range_and_wildcard(self):
+        hosts, unmatched = self.parser.select_hosts("web-[2-10],db-*")
+        self.assertEqual(hosts, ["db-01", "db-02", "web-2", "Web-3", "web-10"])
+        self.assertEqual(unmatched, [])
+
+    def test_select_hosts_excludes_and_reports_unmatched(self):
+        hosts, unmatched = self.parser.select_hosts("web-*,!web-1*,nope,db-9")
+        self.assertEqual(hosts, ["web-2", "Web-3"])
+        self.assertEqual(unmatched, ["nope", "db-9"])
+
+    def test_select_hosts_is_case_insensitive(self):
+        self.assertEqual(self.parser.select_hosts("web-3,DB-01")[0], ["db-01", "Web-3"])
+
+
+class HostResolverTests(IsolatedCacheTestCase):
+    CONFIG = """
+    User nobody
+
+    Host web-1
+      HostName 10.0.0.1
+
+    Host web-* !web-legacy
+      User deploy
+      Port 2222
+
+    Host web-legacy
+      HostName old.example.com
+
+    Match host db-*
+      User matched
+
+    Host db-?
+      HostName %h.db.internal
+
+    Host db-1
+      Port 5432
+
+    Host *
+      User default
+      Port 22
+      IdentityFile ~/.ssh/id_default
+    """
+
+    def setUp(self):
+        super().setUp()
+        temp = tempfile.NamedTemporaryFile("w", delete=False)
+        temp.write(self.CONFIG)
+        temp.close()
+        self.addCleanup(lambda: Path(temp.name).unlink(missing_ok=True))
+        self.parser = SSHConfigParser(temp.name)
+        self.parser.parse_config()
+
+    def test_first_match_wins_across_wildcards(self):
+        info = self.parser.get_host_info("web-1")
+        self.assertEqual(info["hostname"], "10.0.0.1")
+        # Options before the first Host line apply to everyone
+        self.assertEqual(info["user"], "nobody")
+        self.assertEqual(info["port"], "2222")
+        self.assertEqual(info["identityfile"], "~/.ssh/id_default")
+
+    def test_negated_pattern_excludes_host(self):
+        info = self.parser.get_host_info("web-legacy")
+        self.assertEqual(info["hostname"], "old.example.com")
+        self.assertEqual(info["port"], "22")
+
+    def test_match_blocks_are_skipped_and_tokens_expanded(self):
+        info = self.parser.get_host_info("db-1")
+        self.assertEqual(info["hostname"], "db-1.db.internal")
+        self.assertEqual(info["user"], "nobody")
+        self.assertEqual(info["port"], "5432")
+
+    def test_unknown_host_returns_none(self):
+        self.assertIsNone(self.parser.get_host_info("missing"))
+
+    def test_results_are_memoized_until_reparse(self):
+        first = self.parser.get_host_info("web-1")
+        self.assertIs(self.parser.get_host_info("web-1"), first)
+        clear_parse_cache()
+        os.unlink(next(self.cache_dir.glob("*.json")))  # Force a reparse
+        SSHConfigParser(str(self.parser.config_path)).parse_config()
+        self.parser.parse_config()
+        self.assertIsNot(self.parser.get_host_info("web-1"), first)
+        self.assertEqual(self.parser.get_host_info("web-1"), first)
+
+
+class ParseCacheTestCase(IsolatedCacheTestCase):
+    """Isolated parse caches and a config in a temp directory."""
+
+    def setUp(self):
+        super().setUp()
+        config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(config_dir.cleanup)
+        self.config_path = Path(config_dir.name) / "config"
+        self.config_path.write_text("Host web1\n  HostName 10.0.0.1\n")
+
+    def _write(self, path: Path, content: str):
+        # Write and move mtime forward so the change is seen on coarse clocks
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(content)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, mtime_ns + 10**9)))
+
+    def _count_parses(self):
+        original = SSHConfigParser._parse_content
+        calls = []
+
+        def counting(parser, content):
+            calls.append(parser)
+            return original(parser, content)
+
+        patcher = mock.patch.object(SSHConfigParser, "_parse_content", counting)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+
+class SSHConfigParserCacheTests(ParseCacheTestCase):
+    def test_unchanged_config_is_parsed_once_per_process(self):
+        calls = self._count_parses()
+        first = SSHConfigParser(str(self.config_path)).get_all_hosts()
+        second = SSHConfigParser(str(self.config_path)).get_all_hosts()
+        self.assertEqual(first, ["web1"])
+        self.assertEqual(second, ["web1"])
+        self.assertEqual(len(calls), 1)
+
+    def test_disk_cache_is_used_by_a_fresh_process(self):
+        SSHConfigParser(str(self.config_path)).parse_config()
+        clear_parse_cache()  # Simulate a new process
+
+        calls = self._count_parses()
+        hosts = SSHConfigParser(str(self.config_path)).parse_config()
+        self.assertEqual(hosts["web1"]["hostname"], "10.0.0.1")
+        self.assertEqual(calls, [])
+
+    def test_changed_config_is_reparsed(self):
+        parser = SSHConfigParser(str(self.config_path))
+        parser.parse_config()
+        self.assertFalse(parser.refresh())
+
+        self._write(self.config_path, "Host web1 web2\n  HostName 10.0.0.1\n")
+
+        self.assertTrue(parser.is_stale())
+        self.assertTrue(parser.refresh())
+        self.assertEqual(parser.get_all_hosts(), ["web1", "web2"])
+        clear_parse_cache()
+        self.assertEqual(
+            SSHConfigParser(str(self.config_path)).get_all_hosts(), ["web1", "web2"]
+        )
+
+    def test_cache_files_of_deleted_configs_are_pruned(self):
+        other = self.config_path.parent / "other"
+        other.write_text("Host db1\n")
+        SSHConfigParser(str(other)).parse_config()
+        self.assertEqual(len(list(self.cache_dir.glob("*.json"))), 1)
+
+        other.unlink()
+        SSHConfigParser(str(self.config_path)).parse_config()
+        (cache_file,) = self.cache_dir.glob("*.json")
+        self.assertEqual(
+            json.loads(cache_file.read_text())["path"],
+            str(self.config_path.resolve()),
+        )
+        # Pruning goes by the index alone
+        index = json.loads((self.cache_dir / DISK_CACHE_INDEX).read_text())
+        self.assertEqual(index, {cache_file.name: str(self.config_path.resolve())})
+
+
+class SSHConfigParserIncludeTests(ParseCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conf_d = self.config_path.parent / "config.d"
+        self._write(
+            self.config_path,
+            "Include config.d/*.conf\n\nHost web1\n  HostName 10.0.0.1\n",
+        )
+        for i in range(3):
+            self._write(
+                self.conf_d / f"{i:02d}.conf",
+                f"Host db{i}\n  HostName 10.1.0.{i}\n",
+            )
+
+    def test_included_hosts_are_listed(self):
+        parser = SSHConfigParser(str(self.config_path))
+        self.assertEqual(parser.get_all_hosts(), ["db0", "db1", "db2", "web1"])
+        self.assertEqual(parser.get_host_info("db2")["hostname"], "10.1.0.2")
+
+    def test_only_changed_include_is_reparsed(self):
+        parser = SSHConfigParser(str(self.config_path))
+        parser.parse_config()
+
+        calls = self._count_parses()
+        self._write(self.conf_d / "01.conf", "Host db1 db1b\n  HostName 10.1.0.9\n")
+
+        self.assertTrue(parser.refresh())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(parser.get_host_info("db1b")["hostname"], "10.1.0.9")
+        self.assertIn("db0", parser.get_all_hosts())
+
+    def test_new_file_matching_glob_is_picked_up(self):
+        parser = SSHConfigParser(str(self.config_path))
+        parser.parse_config()
+
+        (self.conf_d / "99.conf").write_text("Host cache1\n")
+
+        self.assertTrue(parser.is_stale())
+        parser.refresh()
+        self.assertIn("cache1", parser.get_all_hosts())
+
+    def test_host_context_is_restored_after_include(self):
+        self._write(
+            self.config_path,
+            "Host web1\n  Include config.d/00.conf\n  User deploy\n",
+        )
+        hosts = SSHConfigParser(str(self.config_path)).parse_config()
+        self.assertEqual(hosts["web1"]["user"], "deploy")
+        self.assertNotIn("user", hosts["db0"])
+
+    def test_recursive_include_is_skipped(self):
+        self._write(self.conf_d / "00.conf", "Include config.d/*.conf\nHost loop\n")
+        with mock.patch("builtins.print"):
+            hosts = SSHConfigParser(str(self.config_path)).get_all_hosts()
+        self.assertIn("loop", hosts)
+        self.assertIn("db2", hosts)
+
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from config import Config  # noqa: E402
+from ssh_executor import SSHExecutor  # noqa: E402
+from tests.helpers import FakeExecutor, LocalExecutor  # noqa: E402
+
+
+class ExecuteCommandBatchTests(unittest.TestCase):
+    def test_worker_count_is_capped_by_config(self):
+        limit = Config.VALIDATION["max_concurrent_connections"]
+        self.assertEqual(SSHExecutor.resolve_max_workers(limit + 100), limit)
+        self.assertEqual(SSHExecutor.resolve_max_workers(0), 1)
+
+    def test_results_are_yielded_in_completion_order(self):
+        executor = FakeExecutor(durations={"slow": 0.3}, delay=0.01, max_workers=2)
+        order = [
+            r["hostname"] for r in executor.iter_command_batch(["slow", "fast"], "id")
+        ]
+        self.assertEqual(order, ["fast", "slow"])
+
+    def test_concurrency_never_exceeds_worker_limit(self):
+        executor = FakeExecutor(delay=0.01, max_workers=3)
+        hosts = [f"h{i}" for i in range(12)]
+        results = list(executor.iter_command_batch(hosts, "id"))
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(executor.peak, 3)
+        self.assertGreater(executor.peak, 1)
+
+    def test_batch_preserves_requested_order(self):
+        executor = FakeExecutor(durations={"a": 0.2}, delay=0.01, max_workers=4)
+        results = executor.execute_command_batch(["a", "bad", "c"], "id")
+        self.assertEqual(list(results), ["a", "bad", "c"])
+        self.assertFalse(results["bad"]["success"])
+
+    def test_delay_forces_serial_execution(self):
+        executor = FakeExecutor(delay=0.01, max_workers=5)
+        list(executor.iter_command_batch(["a", "b", "c"], "id", delay=0.01))
+        self.assertEqual(executor.peak, 1)
+        self.assertEqual(executor.started, ["a", "b", "c"])
+
+    def test_stop_event_prevents_new_hosts(self):
+        executor = FakeExecutor(delay=0.05, max_workers=2)
+        stop = threading.Event()
+        seen = []
+        for result in executor.iter_command_batch(
+            [f"h{i}" for i in range(10)], "id", stop_event=stop
+        ):
+            seen.append(result["hostname"])
+            stop.set()
+        # Only the two hosts in flight at the first result ever start
+        self.assertEqual(len(executor.started), 2)
+        self.assertEqual(len(seen), 2)
+
+    def test_error_on_one_host_does_not_stop_the_batch(self):
+        for workers in (1, 3):
+            with self.subTest(max_workers=workers):
+                executor = FakeExecutor(max_workers=workers)
+                answer = executor.answer
+
+                def broken(hostname, command, timeout):
+                    if hostname == "b":
+                        raise OSError("no such file")
+                    return answer(hostname, command, timeout)
+
+                executor.answer = broken
+                results = executor.execute_command_batch(["a", "b", "c"], "id")
+                self.assertEqual(list(results), ["a", "b", "c"])
+                self.assertEqual(
+                    results["b"]["error"], "Unexpected error: no such file"
+                )
+                self.assertFalse(results["b"]["success"])
+                self.assertTrue(results["c"]["success"])
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class StreamCommandTests(unittest.TestCase):
+    def test_lines_arrive_before_process_exits(self):
+        executor = LocalExecutor()
+        start = time.monotonic()
+        events = executor.stream_command("h1", "echo first; sleep 1; echo second")
+
+        first = next(events)
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(first, {"hostname": "h1", "stream": "stdout", "line": "first"})
+
+        rest = list(events)
+        self.assertEqual(rest[0]["line"], "second")
+        result = rest[-1]["result"]
+        self.assertTrue(result["success"])
+        self.assertEqual(result["output"], "first\nsecond")
+
+    def test_stderr_lines_are_tagged(self):
+        executor = LocalExecutor()
+        events = list(executor.stream_command("h1", "echo oops >&2; exit 2"))
+        self.assertEqual(events[0]["stream"], "stderr")
+        result = events[-1]["result"]
+        self.assertEqual(result["return_code"], 2)
+        self.assertEqual(result["error"], "oops")
+
+    def test_large_output_spills_to_disk(self):
+        executor = LocalExecutor()
+        result = executor.execute_command_streaming(
+            "h1", "seq 1 1000", max_retained_bytes=20
+        )
+        self.addCleanup(os.unlink, result["output_file"])
+        self.assertIn("full output", result["output"])
+        self.assertTrue(result["output"].startswith("1\n2\n"))
+        self.assertTrue(result["output"].endswith("999\n1000"))
+        with open(result["output_file"], encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 1000)
+
+    def test_timeout_kills_process(self):
+        executor = LocalExecutor(command_timeout=1)
+        start = time.monotonic()
+        result = executor.execute_command_streaming("h1", "exec sleep 10")
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertIn("timeout", result["error"])
+
+    def test_batch_forwards_lines_to_callback(self):
+        executor = LocalExecutor(max_workers=3)
+        lines = []
+        results = list(
+            executor.iter_command_batch(
+                ["a", "b", "c"], "echo hello", on_line=lines.append
+            )
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(e["hostname"] for e in lines), ["a", "b", "c"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
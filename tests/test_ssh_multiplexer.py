@@ -0,0 +1,89 @@
+import os
+import stat
+import sys
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+APP_DIR = PROJECT_ROOT / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from ssh_executor import SSHExecutor  # noqa: E402
+from ssh_multiplexer import ControlMasterPool  # noqa: E402
+
+
+class RecordingPool(ControlMasterPool):
+    """Pool that records closed hosts instead of running `ssh -O exit`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.closed = []
+
+    def _close_hosts(self, hosts, control_dir=None):
+        self.closed.extend(hosts)
+
+
+@unittest.skipUnless(ControlMasterPool.is_supported(), "ControlMaster not supported")
+class ControlMasterPoolTests(unittest.TestCase):
+    def test_options_use_private_control_directory(self):
+        pool = RecordingPool("/dev/null", control_persist=60)
+        self.addCleanup(pool.close_all)
+
+        options = pool.ssh_options("web-1")
+
+        self.assertIn("ControlMaster=auto", options)
+        self.assertIn("ControlPersist=60", options)
+        control_path = next(o for o in options if o.startswith("ControlPath="))
+        control_dir = os.path.dirname(control_path.split("=", 1)[1])
+        mode = stat.S_IMODE(os.stat(control_dir).st_mode)
+        self.assertEqual(mode, 0o700)
+        self.assertEqual(pool.active_hosts(), ["web-1"])
+
+    def test_close_all_closes_masters_and_removes_directory(self):
+        pool = RecordingPool("/dev/null")
+        pool.ssh_options("web-1")
+        pool.ssh_options("web-2")
+        control_dir = os.path.dirname(pool.control_path)
+
+        pool.close_all()
+
+        self.assertEqual(sorted(pool.closed), ["web-1", "web-2"])
+        self.assertFalse(os.path.exists(control_dir))
+        self.assertEqual(pool.active_hosts(), [])
+
+    def test_masters_are_left_to_control_persist(self):
+        # Reusing a host after a pause never closes its master from here;
+        # ssh expires idle masters itself
+        pool = RecordingPool("/dev/null", control_persist=1)
+        self.addCleanup(pool.close_all)
+        pool.ssh_options("web-1")
+        time.sleep(1.1)
+        pool.ssh_options("web-1")
+        pool.ssh_options("web-2")
+
+        self.assertEqual(pool.closed, [])
+        self.assertEqual(pool.active_hosts(), ["web-1", "web-2"])
+
+    def test_executor_routes_commands_through_master(self):
+        executor = SSHExecutor("/dev/null", multiplex=True)
+        self.addCleanup(executor.close)
+
+        ssh_cmd = executor.build_ssh_command("web-1", "uptime")
+
+        self.assertIn("ControlMaster=auto", ssh_cmd)
+        self.assertEqual(ssh_cmd[-2:], ["web-1", "uptime"])
+
+    def test_multiplexing_is_off_by_default(self):
+        executor = SSHExecutor("/dev/null")
+        self.assertIsNone(executor.control_pool)
+        self.assertNotIn(
+            "ControlMaster=auto", executor.build_ssh_command("web-1", "uptime")
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()